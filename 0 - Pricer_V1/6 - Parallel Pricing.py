@@ -0,0 +1,109 @@
+from sys import path
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+path.insert(0, str(ROOT))
+
+from datetime import date
+import time
+
+from B_Model_V1.bs_model import BS_Model, UnderlyingParams, PortfolioParams
+from B_Model_V1.timegrid import Calendar
+
+from A_Underlying_V1.database import Database
+from C_Vanilla_V1.Option import Option_Call
+from C_Vanilla_V1.Barrier import Barrier_Feature
+from C_Vanilla_V1.Parallel import Parallel_Pricer
+
+# Same D&I call as "5 - Price Option with Barrier.py", priced on every core
+# the __main__ guard is required: workers re-import this script on spawn platforms (Windows / macOS)
+
+if __name__ == "__main__":
+
+    date_start = date(2010, 1, 1)
+    date_end = date(2011, 1, 1)
+    mid_date = date_start + (date_end - date_start) / 2
+
+    basket_method = "uniform"
+    steps = 5
+    n_paths = 1_000_000
+
+    Equity_1 = UnderlyingParams(
+        isin="FR0000131104",
+        spot=50.0,
+        vol=0.20,
+        rate=0.01,
+        div=0.03
+    )
+
+    Portfolio = PortfolioParams(
+        underlyings={Equity_1.isin: Equity_1}
+    )
+
+    DB = Database()
+    db_path = ROOT / "0 - Pricer_V1" / "database.csv"
+    DB.start_connection(str(db_path))
+    Eq1 = DB.get_underlying("FR0000131104")
+    DB.end_connection()
+
+    Calendar_Config = Calendar(
+        start_date=date_start,
+        end_date=date_end,
+        n_steps=steps,
+        trading_days=365.0
+    )
+
+    BS = BS_Model(
+        underlyings=Portfolio.underlyings,
+        calendar=Calendar_Config,
+        n_paths=n_paths,
+        seed=42,
+        antithetic=True,
+        chunk_size=100_000
+    )
+
+    Call = Option_Call(
+        start_date=date_start,
+        end_date=date_end,
+        option_type="EU",
+        strike_price=50.0,
+        value_method="absolute",
+        underlyings=[Eq1],
+        basket_method=basket_method,
+        rebate=0.0,
+        levier=1.0
+    )
+
+    Barrier = Barrier_Feature(
+        start_date=date_start,
+        end_date=date_end,
+        barrier_mecanism='D&I',
+        barrier_exercise='EU',
+        barrier_level=50.0,
+        spot_price=Equity_1.spot,
+        value_method="absolute",
+        observation_dates=[mid_date],
+        calendar=Calendar_Config
+    )
+
+    Pricer = Parallel_Pricer(
+        model=BS,
+        option=Call,
+        strikes_dates=[mid_date, date_end],
+        basket_method=basket_method,
+        barrier_feature=Barrier,
+        barrier_method="Last",
+        rebate_if_not_activated=True
+    )
+
+    start_time = time.time()
+
+    pricing = Pricer.price(spot=Equity_1.spot)
+
+    end_time = time.time()
+
+    print(f"Pricing on {Pricer.n_workers} workers took {end_time - start_time} seconds")
+
+    print("Pricing results:")
+    for k, v in pricing.items():
+        print(f"  Date: {k}, Price: {v['price']:.4f}, Std: {v['std']:.4f}")
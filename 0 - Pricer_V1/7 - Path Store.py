@@ -0,0 +1,91 @@
+from sys import path
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+path.insert(0, str(ROOT))
+
+from datetime import date
+import time
+
+from B_Model_V1.bs_model import BS_Model, UnderlyingParams, PortfolioParams
+from B_Model_V1.timegrid import Calendar
+from B_Model_V1.base import BasketModel
+from B_Model_V1.store import PathStore
+
+from C_Vanilla_V1.Option import Option_Call
+from C_Vanilla_V1.Model import Vanilla_Model
+
+# Simulate once into a memory mapped file, then price from the file (any process, any number of times)
+
+date_start = date(2010, 1, 1)
+date_end = date(2011, 1, 1)
+mid_date = date_start + (date_end - date_start) / 2
+
+basket_method = "uniform"
+store_path = ROOT / "0 - Pricer_V1" / "paths_store"
+
+Equity_1 = UnderlyingParams(
+    isin="FR0000131104",
+    spot=50.0,
+    vol=0.20,
+    rate=0.01,
+    div=0.03
+)
+
+Portfolio = PortfolioParams(
+    underlyings={Equity_1.isin: Equity_1}
+)
+
+Calendar_Config = Calendar(
+    start_date=date_start,
+    end_date=date_end,
+    n_steps=252,
+    trading_days=365.0
+)
+
+BS = BS_Model(
+    underlyings=Portfolio.underlyings,
+    calendar=Calendar_Config,
+    n_paths=200_000,
+    seed=42,
+    antithetic=True,
+    chunk_size=50_000
+)
+
+start_time = time.time()
+PathStore(store_path).write(BS, kind='value')
+print(f"Simulation written to {store_path}.npy in {time.time() - start_time} seconds")
+
+# --- pricing side: only the store is needed ---
+
+Store = PathStore(store_path)
+Config = Store.config(chunk_size=50_000)
+
+Call = Option_Call(
+    start_date=date_start,
+    end_date=date_end,
+    option_type="EU",
+    strike_price=50.0,
+    value_method="absolute",
+    underlyings=[],
+    basket_method=basket_method,
+    rebate=0.0,
+    levier=1.0
+)
+
+start_time = time.time()
+
+Basket_paths = BasketModel(
+    config=Config,
+    n_underlyings=len(Store.metadata["underlyings"]),
+    basket_method=basket_method,
+    paths=Store.read()
+).apply_basket_method()
+
+pricing = Vanilla_Model(option=Call, config=Config, paths=Basket_paths, strikes_dates=[mid_date, date_end]).price()
+
+print(f"Pricing from the store took {time.time() - start_time} seconds")
+
+print("Pricing results:")
+for k, v in pricing.items():
+    print(f"  Date: {k}, Price: {v['price']:.4f}, Std: {v['std']:.4f}")
@@ -2,16 +2,70 @@ import os
 import pandas as pd
 from A_Underlying_V1.underlying_class import Underlying
 
+# writes are appended to the journal (path + journal_suffix) as upsert / delete records, readers replay it on the base file.
+# past default_journal_size bytes the journal is compacted: the replayed database is saved and the journal removed
+journal_suffix = '.journal'
+journal_columns = ['name', 'symbol', 'exchange', 'type', 'isin', 'description', 'id', 'operation']
+default_journal_size = 2 ** 24
+# path -> (base file signature, journal bytes replayed, replayed database): a load replays only the new records
+_replayed: dict[str, tuple] = {}
+
 def check_database_exists(path: str) -> bool:
     return os.path.exists(path)
 
+def journal_path(path: str) -> str:
+    return path + journal_suffix
+
+def replay_journal(df: pd.DataFrame, journal: pd.DataFrame) -> pd.DataFrame:
+    # last record of an ISIN wins, an ISIN keeps the position of its first upsert after its last delete
+    # (a deleted then added ISIN goes to the end, as after a compaction): replaying in pieces gives the same table
+    records = pd.concat([df.assign(operation='upsert'), journal], ignore_index=True)
+    last_delete = records.index.to_series().where(records['operation'] == 'delete').groupby(records['isin']).transform('max')
+    alive = records[~(records.index <= last_delete)]
+    order = pd.unique(alive['isin'])
+    last = alive.drop_duplicates('isin', keep='last').set_index('isin').reindex(order)
+    return last.drop(columns='operation').reset_index()[list(df.columns)]
+
+def read_journal(path: str, offset: int) -> pd.DataFrame:
+    # records appended after offset bytes, the header is the first line of the file
+    with open(journal_path(path)) as journal:
+        if offset == 0:
+            return pd.read_csv(journal)
+        journal.seek(offset)
+        return pd.read_csv(journal, header=None, names=journal_columns)
+
 def load_database(path: str) -> pd.DataFrame:
-    if check_database_exists(path):
-        df = pd.read_csv(path)
-        return df
-    else:
+    # the replayed database is cached per path: while the base file is unchanged, only the journal tail is read
+    if not check_database_exists(path):
         raise FileNotFoundError(f"{path} does not exist. Please create the database first.")
-        
+
+    base = os.stat(path)
+    signature = (base.st_mtime_ns, base.st_size)
+    size = os.path.getsize(journal_path(path)) if check_database_exists(journal_path(path)) else 0
+
+    key = os.path.abspath(path)
+    cached = _replayed.get(key)
+    if cached is None or cached[0] != signature or cached[1] > size:
+        cached = (signature, 0, pd.read_csv(path))
+    df = cached[2]
+    if size > cached[1]:
+        df = replay_journal(df, read_journal(path, cached[1]))
+    _replayed[key] = (signature, size, df)
+    return df.copy()
+
+def append_journal(records: pd.DataFrame, path: str, journal_size: int = default_journal_size):
+    # one sequential write for the whole batch, compaction once the journal is large enough
+    if not check_database_exists(path):
+        raise FileNotFoundError(f"{path} does not exist. Please create the database first.")
+    journal = journal_path(path)
+    records.reindex(columns=journal_columns).to_csv(journal, mode='a', header=not check_database_exists(journal), index=False)
+    if os.path.getsize(journal) > journal_size:
+        compact_database(path)
+
+def compact_database(path: str):
+    # the base file becomes the replayed database, save_database removes the journal
+    save_database(load_database(path), path)
+
 def save_database(df: pd.DataFrame, path: str):
     if not check_database_exists(path):
         try:
@@ -25,12 +79,19 @@ def save_database(df: pd.DataFrame, path: str):
             print(f"Database updated to {path}")
         except Exception as e:
             print(f"An error occurred while saving the database: {e}")
+            return
+
+    # the base file holds the whole database, the journal is already applied
+    if check_database_exists(journal_path(path)):
+        os.remove(journal_path(path))
 
 
 def delete_database(path: str):
     if check_database_exists(path):
         if input(f"Are you sure you want to delete {path}? (y/n): ").lower() == 'y':
             os.remove(path)
+            if check_database_exists(journal_path(path)):
+                os.remove(journal_path(path))
             print(f"{path} has been deleted.")
         else:
             print("Operation cancelled.")
@@ -57,41 +118,51 @@ def check_underlying_in_database(isin: str, path: str) -> bool:
     df = load_database(path)
     return isin.upper() in df['isin'].values
 
-def add_underlying_to_database(underlying: Underlying, path: str) -> None:
-    df: pd.DataFrame = load_database(path)
+def underlying_entry(underlying: Underlying) -> dict:
+    return {
+        'name': underlying.name,
+        'symbol': underlying.symbol,
+        'exchange': underlying.exchange,
+        'type': underlying.type,
+        'isin': underlying.isin,
+        'description': underlying.description,
+        'id': underlying.id
+    }
+
+def upsert_underlyings_to_database(underlyings: list[Underlying], path: str, journal_size: int = default_journal_size) -> None:
+    # added, or replaced when the ISIN exists, in one journal write
+    if len(underlyings) == 0:
+        return
+    records = pd.DataFrame([underlying_entry(underlying) for underlying in underlyings])
+    append_journal(records.assign(operation='upsert'), path, journal_size)
+    print(f"{len(underlyings)} underlyings upserted to the database.")
+
+def delete_underlyings_from_database(isins: list[str], path: str, journal_size: int = default_journal_size) -> None:
+    # unknown ISINs are ignored by the replay, in one journal write
+    if len(isins) == 0:
+        return
+    records = pd.DataFrame({'isin': [isin.upper() for isin in isins], 'operation': 'delete'})
+    append_journal(records, path, journal_size)
+    print(f"{len(isins)} underlyings deleted from the database.")
+
+def add_underlying_to_database(underlying: Underlying, path: str, journal_size: int = default_journal_size) -> None:
+    # one journal record, the base file is not rewritten
     if check_underlying_in_database(underlying.isin, path):
         print(f"Underlying with ISIN {underlying.isin} already exists in the database.")
     else:
-        new_entry = {
-            'name': underlying.name,
-            'symbol': underlying.symbol,
-            'exchange': underlying.exchange,
-            'type': underlying.type,
-            'isin': underlying.isin,
-            'description': underlying.description,
-            'id': underlying.id
-        }
-        new_df = pd.DataFrame([new_entry])
-        df = pd.concat([df, new_df], ignore_index=True)
-        save_database(df, path)
+        append_journal(pd.DataFrame([underlying_entry(underlying)]).assign(operation='upsert'), path, journal_size)
         print(f"Underlying {underlying.name} added to the database.")
 
-def remove_underlying_from_database(isin: str, path: str, force_clause:bool=False) -> None:
-    df = load_database(path)
+def remove_underlying_from_database(isin: str, path: str, force_clause:bool=False, journal_size: int = default_journal_size) -> None:
+    # one journal record, the base file is not rewritten
     isin = isin.upper()
 
     if check_underlying_in_database(isin, path):
-        if not force_clause:
-            if input(f"Are you sure you want to remove the underlying with ISIN {isin}? (y/n): ").lower() == 'y':
-                df = df[df['isin'] != isin]
-                save_database(df, path)
-                print(f"Underlying with ISIN {isin} has been removed from the database.")
-            else:
-                print("Operation cancelled.")
-        else:
-            df = df[df['isin'] != isin]
-            save_database(df, path)
+        if force_clause or input(f"Are you sure you want to remove the underlying with ISIN {isin}? (y/n): ").lower() == 'y':
+            append_journal(pd.DataFrame({'isin': [isin], 'operation': 'delete'}), path, journal_size)
             print(f"Underlying with ISIN {isin} has been removed from the database.")
+        else:
+            print("Operation cancelled.")
 
     else:
         print(f"Underlying with ISIN {isin} not found in the database.")
@@ -135,9 +206,10 @@ def number_of_underlyings_in_database(path: str) -> int:
     return len(df)
 
 class Database():
-    def __init__(self):
+    def __init__(self, journal_size: int = default_journal_size):
         self.file_name: str
         self.path: str
+        self.journal_size = journal_size # journal bytes before compaction
 
     def create_database(self, path:str):
         create_database(path)
@@ -154,8 +226,26 @@ class Database():
         self.path = ""
 
     def add_underlyings(self, underlyings: list[Underlying]) -> None:
+        # one read, existing ISINs are skipped, the new ones are appended in one journal write
+        existing = set(load_database(self.path)['isin'].values)
+        new_underlyings = []
         for underlying in underlyings:
-            add_underlying_to_database(underlying, self.path)
+            if underlying.isin in existing:
+                print(f"Underlying with ISIN {underlying.isin} already exists in the database.")
+            else:
+                existing.add(underlying.isin)
+                new_underlyings.append(underlying)
+                print(f"Underlying {underlying.name} added to the database.")
+        upsert_underlyings_to_database(new_underlyings, self.path, self.journal_size)
+
+    def upsert_underlyings(self, underlyings: list[Underlying]) -> None:
+        upsert_underlyings_to_database(underlyings, self.path, self.journal_size)
+
+    def delete_underlyings(self, isins: list[str]) -> None:
+        delete_underlyings_from_database(isins, self.path, self.journal_size)
+
+    def compact(self) -> None:
+        compact_database(self.path)
 
     def get_underlying(self, isin: str) -> Underlying:
         return get_underlying_info_from_database(isin, self.path)
@@ -171,16 +261,23 @@ class Database():
         return get_all_underlyings_from_database(self.path)
 
     def remove_underlying(self, isin: str, force_clause: bool) -> None:
-        df = load_database(self.path)
-        isin = isin.upper()
-        if check_underlying_in_database(isin, self.path):
-            remove_underlying_from_database(isin, self.path, force_clause)
-        else:
-            print(f"Underlying with ISIN {isin} not found in the database.")
+        remove_underlying_from_database(isin, self.path, force_clause, self.journal_size)
 
     def remove_underlyings(self, isins: list[str], force_clause: bool) -> None:
+        # one read, the confirmed ISINs are deleted in one journal write
+        existing = set(load_database(self.path)['isin'].values)
+        removed = []
         for isin in isins:
-            self.remove_underlying(isin, force_clause)
+            isin = isin.upper()
+            if isin not in existing:
+                print(f"Underlying with ISIN {isin} not found in the database.")
+            elif force_clause or input(f"Are you sure you want to remove the underlying with ISIN {isin}? (y/n): ").lower() == 'y':
+                existing.discard(isin)
+                removed.append(isin)
+                print(f"Underlying with ISIN {isin} has been removed from the database.")
+            else:
+                print("Operation cancelled.")
+        delete_underlyings_from_database(removed, self.path, self.journal_size)
 
     def remove_database(self) -> None:
         delete_database(self.path)
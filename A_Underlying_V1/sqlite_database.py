@@ -0,0 +1,163 @@
+import os
+import sqlite3
+from typing import Union
+import pandas as pd
+from A_Underlying_V1.underlying_class import Underlying
+from A_Underlying_V1.database import Database, check_database_exists, delete_database, load_database
+
+table_name = 'underlyings'
+columns = ['name', 'symbol', 'exchange', 'type', 'isin', 'description', 'id'] # same order as the CSV database
+
+# isin is the primary key (unique B-tree index): lookups are O(log n), the rowid keeps the insertion order of the CSV
+create_table = f"""
+CREATE TABLE IF NOT EXISTS {table_name} (
+    name TEXT,
+    symbol TEXT,
+    exchange TEXT,
+    type TEXT,
+    isin TEXT PRIMARY KEY,
+    description TEXT,
+    id TEXT
+)
+"""
+insert_row = f"INSERT OR IGNORE INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+upsert_row = insert_row.replace("INSERT OR IGNORE", "INSERT") + " ON CONFLICT(isin) DO UPDATE SET " + ", ".join(f"{c} = excluded.{c}" for c in columns if c != 'isin')
+select_row = f"SELECT {', '.join(columns)} FROM {table_name}"
+
+def underlying_row(underlying: Underlying) -> tuple:
+    return (underlying.name, underlying.symbol, underlying.exchange, underlying.type, underlying.isin, underlying.description, underlying.id)
+
+def row_underlying(row: tuple) -> Underlying:
+    name, symbol, exchange, type, isin, description, id = row
+    return Underlying(name=name, symbol=symbol, exchange=exchange, isin=isin, type=type, description=description or '', id=id)
+
+def create_sqlite_database(path: str):
+    connection = sqlite3.connect(path)
+    try:
+        with connection:
+            connection.execute(create_table)
+    finally:
+        connection.close()
+    print(f"Database created and saved to {path}")
+
+def migrate_csv_to_sqlite(csv_path: str, sqlite_path: str) -> int:
+    """
+    One-shot copy of a CSV database into a SQLite database (created if needed), in a single transaction.
+    A duplicated ISIN keeps its first row. Returns the number of underlyings added.
+    """
+    df = load_database(csv_path)
+    df['isin'] = df['isin'].astype(str).str.upper()
+    df = df.astype(object).where(df.notna(), None)
+    df['description'] = df['description'].fillna('')
+
+    if not check_database_exists(sqlite_path):
+        create_sqlite_database(sqlite_path)
+
+    connection = sqlite3.connect(sqlite_path)
+    try:
+        with connection:
+            connection.execute(create_table)
+            before = connection.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+            connection.executemany(insert_row, df[columns].itertuples(index=False, name=None))
+            added = connection.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0] - before
+    finally:
+        connection.close()
+
+    print(f"{added} underlyings migrated from {csv_path} to {sqlite_path}.")
+    return added
+
+class SQLiteDatabase(Database):
+    """
+    Database API on a SQLite file: one connection per session, indexed ISIN lookups,
+    add_underlyings / remove_underlyings run as one transaction (all or nothing).
+    """
+    def __init__(self):
+        super().__init__()
+        self.connection: Union[sqlite3.Connection, None] = None
+
+    def create_database(self, path: str):
+        create_sqlite_database(path)
+
+    def start_connection(self, path: str):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} does not exist.")
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(create_table)
+        print(f"Connection to {self.path} established.")
+
+    def end_connection(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+        print(f"Connection to {self.path} closed.")
+        self.path = ""
+
+    def connected(self) -> sqlite3.Connection:
+        if self.connection is None:
+            raise ConnectionError("No open connection, call start_connection first.")
+        return self.connection
+
+    def check_underlying(self, isin: str) -> bool:
+        return self.connected().execute(f"SELECT 1 FROM {table_name} WHERE isin = ?", (isin.upper(),)).fetchone() is not None
+
+    def add_underlyings(self, underlyings: list[Underlying]) -> None:
+        with self.connected() as connection:
+            for underlying in underlyings:
+                if connection.execute(insert_row, underlying_row(underlying)).rowcount == 0:
+                    print(f"Underlying with ISIN {underlying.isin} already exists in the database.")
+                else:
+                    print(f"Underlying {underlying.name} added to the database.")
+
+    def upsert_underlyings(self, underlyings: list[Underlying]) -> None:
+        # an existing ISIN is updated in place (keeps its rowid, so its position)
+        with self.connected() as connection:
+            connection.executemany(upsert_row, [underlying_row(underlying) for underlying in underlyings])
+        print(f"{len(underlyings)} underlyings upserted to the database.")
+
+    def delete_underlyings(self, isins: list[str]) -> None:
+        with self.connected() as connection:
+            connection.executemany(f"DELETE FROM {table_name} WHERE isin = ?", [(isin.upper(),) for isin in isins])
+        print(f"{len(isins)} underlyings deleted from the database.")
+
+    def compact(self) -> None:
+        # no journal here, the free pages of the file are reclaimed
+        self.connected().execute("VACUUM")
+
+    def get_underlying(self, isin: str) -> Underlying:
+        isin = isin.upper()
+        row = self.connected().execute(f"{select_row} WHERE isin = ?", (isin,)).fetchone()
+        if row is None:
+            raise ValueError(f"Underlying with ISIN {isin} not found in the database.")
+        return row_underlying(row)
+
+    def get_all_underlyings(self) -> list[Underlying]:
+        return [row_underlying(row) for row in self.connected().execute(f"{select_row} ORDER BY rowid")]
+
+    def remove_underlying(self, isin: str, force_clause: bool) -> None:
+        self.remove_underlyings([isin], force_clause)
+
+    def remove_underlyings(self, isins: list[str], force_clause: bool) -> None:
+        # every confirmation is asked before the transaction opens, the write lock is never held on a prompt
+        confirmed = []
+        for isin in isins:
+            isin = isin.upper()
+            if not self.check_underlying(isin):
+                print(f"Underlying with ISIN {isin} not found in the database.")
+            elif force_clause or input(f"Are you sure you want to remove the underlying with ISIN {isin}? (y/n): ").lower() == 'y':
+                confirmed.append(isin)
+            else:
+                print("Operation cancelled.")
+
+        with self.connected() as connection:
+            connection.executemany(f"DELETE FROM {table_name} WHERE isin = ?", [(isin,) for isin in confirmed])
+        for isin in confirmed:
+            print(f"Underlying with ISIN {isin} has been removed from the database.")
+
+    def remove_database(self) -> None:
+        path = self.path
+        self.end_connection()
+        delete_database(path)
+
+    def number_of_underlyings(self) -> int:
+        return self.connected().execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
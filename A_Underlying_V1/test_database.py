@@ -0,0 +1,107 @@
+import os
+import random
+
+import pandas as pd
+import pytest
+
+import A_Underlying_V1.database as csv_database
+from A_Underlying_V1.database import Database, journal_path, load_database, save_database
+from A_Underlying_V1.underlying_class import Underlying
+
+def underlying(i: int, version: int = 0) -> Underlying:
+    return Underlying(name=f"N{i}V{version}", symbol=f"S{i}", exchange="XNYS", isin=f"US{i:010d}", type="EQUITY", description=f"v{version}", id=f"{i}")
+
+def isins(path: str) -> list[str]:
+    return list(load_database(path)['isin'])
+
+@pytest.fixture
+def path(tmp_path, capsys) -> str:
+    path = str(tmp_path / "underlyings.csv")
+    Database().create_database(path)
+    capsys.readouterr()
+    return path
+
+@pytest.fixture
+def database(path) -> Database:
+    database = Database(journal_size=4096)
+    database.start_connection(path)
+    return database
+
+def test_writes_go_to_the_journal(database, path):
+    base = os.stat(path)
+    database.add_underlyings([underlying(0), underlying(1)])
+    csv_database.add_underlying_to_database(underlying(2), path)
+    database.remove_underlying("us0000000001", force_clause=True)
+
+    after = os.stat(path)
+    assert (after.st_mtime_ns, after.st_size) == (base.st_mtime_ns, base.st_size)
+    assert list(pd.read_csv(journal_path(path))['operation']) == ['upsert', 'upsert', 'upsert', 'delete']
+    assert isins(path) == ["US0000000000", "US0000000002"]
+
+def test_last_record_wins_and_deleted_isins_lose_their_place(database, path):
+    database.upsert_underlyings([underlying(i) for i in range(4)])
+    database.upsert_underlyings([underlying(1, version=1)])
+    database.delete_underlyings(["US0000000000"])
+    database.upsert_underlyings([underlying(0, version=2)])
+
+    df = load_database(path)
+    assert list(df['isin']) == ["US0000000001", "US0000000002", "US0000000003", "US0000000000"]
+    assert list(df['name']) == ["N1V1", "N2V0", "N3V0", "N0V2"]
+
+def test_compaction_keeps_the_table(database, path):
+    database.upsert_underlyings([underlying(i) for i in range(10)])
+    database.delete_underlyings(["US0000000004"])
+    before = load_database(path)
+
+    database.compact()
+    assert not os.path.exists(journal_path(path))
+    pd.testing.assert_frame_equal(load_database(path), before, check_dtype=False)
+
+def test_large_journal_is_compacted(database, path):
+    base = os.path.getsize(path)
+    for i in range(100): # well past the 4 kB journal
+        database.upsert_underlyings([underlying(i)])
+        journal = journal_path(path)
+        assert not os.path.exists(journal) or os.path.getsize(journal) <= database.journal_size
+    assert os.path.getsize(path) > base
+    assert isins(path) == [f"US{i:010d}" for i in range(100)]
+
+def test_incremental_replay_is_the_full_replay(database, path):
+    # every load replays the journal tail on the cached table, a cold load replays everything
+    rng = random.Random(1)
+    for step in range(120):
+        i = rng.randrange(15)
+        if rng.random() < 0.6:
+            database.upsert_underlyings([underlying(i, step)])
+        else:
+            database.delete_underlyings([f"US{i:010d}"])
+        warm = load_database(path)
+        csv_database._replayed.clear()
+        pd.testing.assert_frame_equal(warm, load_database(path), check_dtype=False)
+
+def test_other_writers_are_seen(database, path):
+    database.upsert_underlyings([underlying(0)])
+    load_database(path)
+
+    # another process: appends to the journal, then rewrites the base file
+    other = Database()
+    other.start_connection(path)
+    other.upsert_underlyings([underlying(1)])
+    assert isins(path) == ["US0000000000", "US0000000001"]
+
+    save_database(load_database(path).iloc[::-1], path)
+    assert isins(path) == ["US0000000001", "US0000000000"]
+
+def test_loaded_table_is_a_copy(database, path):
+    database.upsert_underlyings([underlying(0)])
+    load_database(path).drop(index=0, inplace=True)
+    assert isins(path) == ["US0000000000"]
+
+def test_cancelled_removal_writes_nothing(database, path, monkeypatch):
+    database.upsert_underlyings([underlying(0)])
+    size = os.path.getsize(journal_path(path))
+    monkeypatch.setattr("builtins.input", lambda prompt: "n")
+
+    database.remove_underlying("US0000000000", force_clause=False)
+    assert os.path.getsize(journal_path(path)) == size
+    assert isins(path) == ["US0000000000"]
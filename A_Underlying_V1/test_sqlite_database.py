@@ -0,0 +1,96 @@
+import sqlite3
+
+import pytest
+
+from A_Underlying_V1.database import Database
+from A_Underlying_V1.sqlite_database import SQLiteDatabase, migrate_csv_to_sqlite
+from A_Underlying_V1.underlying_class import Underlying
+
+def underlying(i: int, name: str = "", description: str = "") -> Underlying:
+    # description given: no yfinance lookup
+    return Underlying(name=name or f"NAME{i}", symbol=f"S{i}", exchange="XPAR", isin=f"FR{i:010d}", type="EQUITY", description=description, id=f"id-{i}")
+
+def fields(underlyings: list[Underlying]) -> list[dict]:
+    return [u.__dict__() for u in underlyings]
+
+@pytest.fixture
+def database(tmp_path, capsys):
+    path = str(tmp_path / "underlyings.db")
+    db = SQLiteDatabase()
+    db.create_database(path)
+    db.start_connection(path)
+    db.add_underlyings([underlying(i) for i in range(5)])
+    capsys.readouterr()
+    yield db
+    if db.connection is not None:
+        db.end_connection()
+
+def test_rows_round_trip_in_insertion_order(database):
+    assert database.number_of_underlyings() == 5
+    assert fields(database.get_all_underlyings()) == fields([underlying(i) for i in range(5)])
+    assert database.get_underlying("fr0000000003").__dict__() == underlying(3).__dict__()
+
+def test_existing_isin_is_not_added_twice(database, capsys):
+    database.add_underlyings([underlying(2, name="OTHER"), underlying(7)])
+    assert "already exists" in capsys.readouterr().out
+    assert database.get_underlying("FR0000000002").name == "NAME2"
+    assert database.number_of_underlyings() == 6
+
+def test_upsert_updates_in_place(database):
+    database.upsert_underlyings([underlying(1, name="RENAMED", description="new"), underlying(9)])
+    rows = database.get_all_underlyings()
+    assert [u.isin for u in rows] == [f"FR{i:010d}" for i in [0, 1, 2, 3, 4, 9]]
+    assert (rows[1].name, rows[1].description) == ("RENAMED", "new")
+
+def test_delete_and_missing_isin(database):
+    database.delete_underlyings(["fr0000000000", "FR0000000004", "XX0000000000"])
+    assert database.number_of_underlyings() == 3
+    assert not database.check_underlying("FR0000000000")
+    with pytest.raises(ValueError, match="not found"):
+        database.get_underlying("FR0000000000")
+
+def test_removal_asks_before_the_transaction(database, monkeypatch):
+    answers = iter(["y", "n"])
+    def ask(prompt: str) -> str:
+        # another connection could still write: no lock is held while the user answers
+        assert not database.connection.in_transaction
+        return next(answers)
+    monkeypatch.setattr("builtins.input", ask)
+
+    database.remove_underlyings(["FR0000000000", "FR0000000001", "XX0000000000"], force_clause=False)
+    assert [u.isin for u in database.get_all_underlyings()] == [f"FR{i:010d}" for i in [1, 2, 3, 4]]
+
+def test_a_failed_batch_adds_nothing(database):
+    with pytest.raises(AttributeError):
+        database.add_underlyings([underlying(8), None]) #type: ignore
+    assert not database.check_underlying("FR0000000008")
+
+def test_closed_connection_is_an_error(database):
+    database.end_connection()
+    with pytest.raises(ConnectionError):
+        database.number_of_underlyings()
+
+def test_csv_migration_round_trip(tmp_path, capsys):
+    csv_path, sqlite_path = str(tmp_path / "underlyings.csv"), str(tmp_path / "migrated.db")
+    csv = Database()
+    csv.create_database(csv_path)
+    csv.start_connection(csv_path)
+    csv.upsert_underlyings([underlying(i, description="text" if i % 2 else "") for i in range(6)])
+
+    assert migrate_csv_to_sqlite(csv_path, sqlite_path) == 6
+    assert migrate_csv_to_sqlite(csv_path, sqlite_path) == 0 # existing ISINs are kept
+
+    migrated = SQLiteDatabase()
+    migrated.start_connection(sqlite_path)
+    rows, originals = migrated.get_all_underlyings(), csv.get_all_underlyings()
+    assert [u.isin for u in rows] == [u.isin for u in originals]
+    for row, original in zip(rows, originals):
+        # an empty description is read back as NaN from the CSV, stored as '' in SQLite
+        expected = original.__dict__()
+        expected['description'] = expected['description'] if isinstance(expected['description'], str) else ''
+        assert row.__dict__() == expected
+    migrated.end_connection()
+
+    with sqlite3.connect(sqlite_path) as connection:
+        with pytest.raises(sqlite3.IntegrityError):
+            connection.execute("INSERT INTO underlyings (isin) VALUES ('FR0000000001')")
@@ -47,6 +47,10 @@ class Underlying:
     def __repr__(self) -> str:
         return f"Underlying(name={self.name}, symbol={self.symbol}, exchange={self.exchange}, isin={self.isin}, type={self.type}, id={self.id}, description={self.description})"
     
+    def __reduce__(self):
+        # rebuilt from its fields (no yfinance call), __dict__ being overridden below
+        return (Underlying, (self.name, self.symbol, self.exchange, self.isin, self.type, self.description, self.id))
+
     def __dict__(self) -> dict:
         return {
             'name': self.name,
@@ -0,0 +1,205 @@
+from dataclasses import dataclass, field
+from typing import Optional, Callable, Union
+
+import numpy as np
+
+@dataclass(frozen=False)
+class RunningStats:
+    """
+    Welford/Chan running mean and variance over the first axis of each batch.
+    std is the population std (ddof=0), same as numpy .std()
+    """
+
+    count: int = 0
+    mean: Optional[np.typing.NDArray[np.float64]] = field(default=None)
+    m2: Optional[np.typing.NDArray[np.float64]] = field(default=None)
+
+    def update(self, batch: np.typing.NDArray, start: int = 0) -> "RunningStats":
+        # start (index of the first path of batch) is only used by ReplicatedStats
+        n_batch = batch.shape[0]
+        if n_batch == 0:
+            return self
+
+        batch_mean = batch.mean(axis=0, dtype=np.float64)
+        batch_m2 = ((batch - batch_mean) ** 2).sum(axis=0, dtype=np.float64)
+
+        return self.merge(RunningStats(count=n_batch, mean=batch_mean, m2=batch_m2))
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count = other.count
+            self.mean = np.array(other.mean, dtype=np.float64)
+            self.m2 = np.array(other.m2, dtype=np.float64)
+            return self
+
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.count / total)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * (self.count * other.count / total)
+        self.count = total
+        return self
+
+    @property
+    def variance(self) -> np.typing.NDArray[np.float64]:
+        if self.count == 0:
+            raise ValueError("No sample accumulated yet.")
+        return self.m2 / self.count
+
+    @property
+    def std(self) -> np.typing.NDArray[np.float64]:
+        return np.sqrt(self.variance)
+
+    @property
+    def std_error(self) -> np.typing.NDArray[np.float64]:
+        return self.std / np.sqrt(self.count)
+
+@dataclass(frozen=False)
+class RunningCovariance:
+    """
+    Running mean and co-moment over the first axis, covariance between the variables of the last axis.
+    batch (n, ..., p) -> mean (..., p), covariance (..., p, p), population (ddof=0)
+    """
+
+    count: int = 0
+    mean: Optional[np.typing.NDArray[np.float64]] = field(default=None)
+    comoment: Optional[np.typing.NDArray[np.float64]] = field(default=None)
+
+    def update(self, batch: np.typing.NDArray, start: int = 0) -> "RunningCovariance":
+        n_batch = batch.shape[0]
+        if n_batch == 0:
+            return self
+
+        batch_mean = batch.mean(axis=0, dtype=np.float64)
+        centered = batch - batch_mean
+        batch_comoment = np.einsum('n...i,n...j->...ij', centered, centered, dtype=np.float64)
+
+        return self.merge(RunningCovariance(count=n_batch, mean=batch_mean, comoment=batch_comoment))
+
+    def merge(self, other: "RunningCovariance") -> "RunningCovariance":
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count = other.count
+            self.mean = np.array(other.mean, dtype=np.float64)
+            self.comoment = np.array(other.comoment, dtype=np.float64)
+            return self
+
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.count / total)
+        self.comoment = self.comoment + other.comoment + delta[..., :, None] * delta[..., None, :] * (self.count * other.count / total)
+        self.count = total
+        return self
+
+    @property
+    def covariance(self) -> np.typing.NDArray[np.float64]:
+        if self.count == 0:
+            raise ValueError("No sample accumulated yet.")
+        return self.comoment / self.count
+
+    @property
+    def variance(self) -> np.typing.NDArray[np.float64]:
+        return np.diagonal(self.covariance, axis1=-2, axis2=-1)
+
+    @property
+    def std(self) -> np.typing.NDArray[np.float64]:
+        return np.sqrt(self.variance)
+
+    @property
+    def std_error(self) -> np.typing.NDArray[np.float64]:
+        return self.std / np.sqrt(self.count)
+
+@dataclass(frozen=False)
+class ReplicatedStats:
+    """
+    RunningStats kept per block of block_size consecutive paths (QMC replications, random stream blocks).
+    std_error comes from the dispersion of the block means, valid for randomized QMC
+    """
+
+    block_size: int
+    blocks: dict[int, RunningStats] = field(default_factory=dict)
+    # statistic kept per block, RunningCovariance for control variates
+    factory: Callable[[], Union[RunningStats, RunningCovariance]] = field(default=RunningStats, repr=False)
+
+    def update(self, batch: np.typing.NDArray, start: int = 0) -> "ReplicatedStats":
+        stop = start + batch.shape[0]
+        lo = start
+        while lo < stop:
+            i_block = lo // self.block_size
+            hi = min(stop, (i_block + 1) * self.block_size)
+            self.blocks.setdefault(i_block, self.factory()).update(batch[lo - start:hi - start])
+            lo = hi
+        return self
+
+    def merge(self, other: "ReplicatedStats") -> "ReplicatedStats":
+        for i_block, stats in other.blocks.items():
+            self.blocks.setdefault(i_block, self.factory()).merge(stats)
+        return self
+
+    @property
+    def total(self) -> Union[RunningStats, RunningCovariance]:
+        total = self.factory()
+        for i_block in sorted(self.blocks):
+            total.merge(self.blocks[i_block])
+        return total
+
+    @property
+    def count(self) -> int:
+        return sum(stats.count for stats in self.blocks.values())
+
+    @property
+    def mean(self) -> np.typing.NDArray[np.float64]:
+        return self.total.mean #type: ignore
+
+    @property
+    def std(self) -> np.typing.NDArray[np.float64]:
+        return self.total.std
+
+    @property
+    def std_error(self) -> np.typing.NDArray[np.float64]:
+        means = np.array([stats.mean for stats in self.blocks.values()])
+        if len(means) < 2:
+            raise ValueError("At least two blocks are needed to estimate the error.")
+        return means.std(axis=0, ddof=1) / np.sqrt(len(means))
+
+@dataclass(frozen=False)
+class ConvergenceTrace:
+    """
+    Adaptive mode: price and std error recorded every check_size paths,
+    update() tells when every column meets the target (absolute, or relative to the price)
+    """
+
+    target: float
+    relative: bool = False
+    check_size: int = 2 ** 16
+    n_paths: list[int] = field(default_factory=list)
+    prices: list[np.typing.NDArray[np.float64]] = field(default_factory=list)
+    std_errors: list[np.typing.NDArray[np.float64]] = field(default_factory=list)
+    converged: bool = False
+
+    def __post_init__(self):
+        self.next_check = self.check_size
+
+    def record(self, stats: Union[RunningStats, ReplicatedStats]):
+        total = stats.total if isinstance(stats, ReplicatedStats) else stats
+        self.n_paths.append(total.count)
+        self.prices.append(np.array(total.mean))
+        self.std_errors.append(total.std_error)
+
+        tolerance = self.target * np.abs(total.mean) if self.relative else self.target
+        self.converged = bool(np.all(total.std_error <= tolerance))
+
+    def update(self, stats: Union[RunningStats, ReplicatedStats]) -> bool:
+        # True once the target is met, checked at the first batch boundary past each check_size paths
+        if stats.count < self.next_check:
+            return False
+        self.next_check = (stats.count // self.check_size + 1) * self.check_size
+        self.record(stats)
+        return self.converged
+
+    def finish(self, stats: Union[RunningStats, ReplicatedStats]) -> "ConvergenceTrace":
+        if len(self.n_paths) == 0 or self.n_paths[-1] != stats.count:
+            self.record(stats)
+        return self
@@ -1,12 +1,54 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from abc import ABC
-from typing import Optional, Literal
+from typing import Optional, Literal, Iterator, Iterable, Union
 
 import numpy as np
 
 from B_Model_V1.timegrid import Calendar
+from B_Model_V1.workspace import Workspace, empty
+from B_Model_V1.cache import shock_cache
+from B_Model_V1.kernels import kernel_backends
 
 accuracy_float = 6
+precision_dtypes = ['float64', 'float32']
+bit_generators = {'PCG64': np.random.PCG64, 'Philox': np.random.Philox}
+default_stream_size = 2 ** 16 # paths per random stream
+path_generators = ['pseudo', 'sobol']
+default_block_elements = 2 ** 22 # levels partitioned / sorted at once by the rank based baskets
+
+def iter_rows(array: np.typing.NDArray, chunk_size: Optional[int] = None, start: int = 0, stop: Optional[int] = None) -> Iterator[np.typing.NDArray]:
+    # row chunks of a (memory mapped) array: only the chunk being read is paged in
+    chunk_size = chunk_size or default_stream_size
+    stop = array.shape[0] if stop is None else min(stop, array.shape[0])
+    for lo in range(start, stop, chunk_size):
+        yield array[lo:min(lo + chunk_size, stop)]
+
+def path_chunks(paths: Union[np.typing.NDArray, Iterable[np.typing.NDArray]], chunk_size: Optional[int] = None) -> Iterable[np.typing.NDArray]:
+    # chunks read by the streaming pricers: a memory map by rows, an in-memory array whole, an iterable as is
+    if isinstance(paths, np.memmap):
+        return iter_rows(paths, chunk_size)
+    if isinstance(paths, np.ndarray):
+        return [paths]
+    return paths
+
+def resolve_rng(seed: Optional[int], rng: Optional[Union[np.random.Generator, np.random.BitGenerator]], bit_generator: str) -> tuple[np.random.SeedSequence, type]:
+    if rng is None:
+        # seed=None draws fresh entropy once, kept so that every pass over the block sees the same paths
+        return np.random.SeedSequence(seed), bit_generators[bit_generator]
+
+    bit_gen = rng.bit_generator if isinstance(rng, np.random.Generator) else rng
+    seed_seq = getattr(bit_gen, 'seed_seq', None) or getattr(bit_gen, '_seed_seq', None)
+    if not isinstance(seed_seq, np.random.SeedSequence):
+        raise ValueError("rng must be built from a SeedSequence (e.g. np.random.default_rng(seed)).")
+    return seed_seq, type(bit_gen)
+
+def child_sequence(seed_sequence: np.random.SeedSequence, *keys: int) -> np.random.SeedSequence:
+    # same child as seed_sequence.spawn(...)[key], without the spawn counter side effect
+    return np.random.SeedSequence(
+        entropy=seed_sequence.entropy,
+        spawn_key=tuple(seed_sequence.spawn_key) + keys,
+        pool_size=seed_sequence.pool_size,
+    )
 
 @dataclass(frozen=False)
 class SimulationConfig(ABC):
@@ -14,18 +56,105 @@ class SimulationConfig(ABC):
     n_paths: int
     seed: Optional[int] = None
     antithetic: bool = True
+    chunk_size: Optional[int] = None # streaming mode: number of paths generated at once
+    dtype: Literal['float64', 'float32'] = 'float64' # dtype of the whole path pipeline
+    rounding: Optional[int] = accuracy_float # decimals applied once to the simulated paths, None to disable
+    bit_generator: Literal['PCG64', 'Philox'] = 'PCG64'
+    rng: Optional[Union[np.random.Generator, np.random.BitGenerator]] = None # overrides seed/bit_generator
+    stream_size: int = default_stream_size # paths per random stream, part of the scenario identity
+    generator: Literal['pseudo', 'sobol'] = 'pseudo' # 'sobol': scrambled Sobol + Brownian bridge (antithetic ignored)
+    replications: int = 16 # independent Sobol scramblings, used for the QMC error estimate
+    cache: bool = False # opt-in: share the generated shocks through the process cache (seeded runs only, shock_cache budget)
+    # adaptive mode: paths are priced by batches until every strike date reaches the target std error,
+    # n_paths is then the path budget
+    target_std_error: Optional[float] = None
+    target_relative: bool = False # target_std_error as a fraction of the price
+    # compiled kernels, read by Pricing_Pipeline only (NumPy when numba is not installed):
+    # the paths, Vanilla_Model, Vanilla_Barrier_Model, Book_Pricer and the scenarios always run the NumPy code
+    kernel_backend: Literal['numpy', 'numba'] = 'numpy'
+    kernel_parallel: bool = False # paths of a chunk on all threads (numba backend of Pricing_Pipeline)
 
     def __post_init__(self):
+        self._seed_sequence: Optional[np.random.SeedSequence] = None
+
         if self.n_paths <= 0:
             raise ValueError("n_paths must be a positive integer")
         
         if self.seed is not None and not isinstance(self.seed, int):
             raise ValueError("seed must be an integer or None")
+
+        if self.chunk_size is not None and (not isinstance(self.chunk_size, int) or self.chunk_size <= 0):
+            raise ValueError("chunk_size must be a positive integer or None")
+
+        if self.dtype not in precision_dtypes:
+            raise ValueError(f"dtype must be one of {precision_dtypes}")
+
+        if self.rounding is not None and (not isinstance(self.rounding, int) or self.rounding < 0):
+            raise ValueError("rounding must be a non-negative integer or None")
+
+        if self.bit_generator not in bit_generators:
+            raise ValueError(f"bit_generator must be one of {list(bit_generators.keys())}")
+
+        if self.rng is not None and not isinstance(self.rng, (np.random.Generator, np.random.BitGenerator)):
+            raise ValueError("rng must be a numpy Generator, BitGenerator or None")
+
+        if not isinstance(self.stream_size, int) or self.stream_size <= 0:
+            raise ValueError("stream_size must be a positive integer")
+
+        if self.generator not in path_generators:
+            raise ValueError(f"generator must be one of {path_generators}")
+
+        if self.generator == 'sobol' and (self.replications < 2 or self.n_paths % self.replications != 0):
+            raise ValueError("Sobol paths need replications >= 2 dividing n_paths.")
+
+        if self.target_std_error is not None and self.target_std_error <= 0:
+            raise ValueError("target_std_error must be positive or None")
+
+        if self.kernel_backend not in kernel_backends:
+            raise ValueError(f"kernel_backend must be one of {kernel_backends}")
+
+        if self.target_std_error is not None and self.generator == 'sobol':
+            raise ValueError("Adaptive mode needs pseudo random paths, the Sobol error comes from complete replications.")
+
+    @property
+    def seed_sequence(self) -> np.random.SeedSequence:
+        # resolved once (the paths' own sequence for a BS_Model): extra streams keyed on it are reproducible
+        if self._seed_sequence is None:
+            self._seed_sequence = resolve_rng(self.seed, self.rng, self.bit_generator)[0]
+        return self._seed_sequence
+
+    @property
+    def adaptive(self) -> bool:
+        return self.target_std_error is not None
+
+    @property
+    def replication_size(self) -> Optional[int]:
+        # paths per QMC replication, None for pseudo random paths
+        return self.n_paths // self.replications if self.generator == 'sobol' else None
+
+    def on_calendar(self, calendar: Calendar) -> "SimulationConfig":
+        # same simulation settings on another grid (e.g. reduced paths), nothing is simulated
+        settings = {f.name: getattr(self, f.name) for f in fields(SimulationConfig)}
+        settings['calendar'] = calendar
+        config = SimulationConfig(**settings)
+        config._seed_sequence = self.seed_sequence
+        return config
+
+    def round_output(self, array: np.typing.NDArray) -> np.typing.NDArray:
+        # single rounding pass of the precision policy, done in place
+        if self.rounding is not None:
+            np.round(array, self.rounding, out=array)
+        return array
         
 @dataclass(frozen=False)
 class PathBlock:
     """
     paths shape: (n_sim, n_steps, d)
+    paths are drawn by blocks of stream_size paths, block i using its own stream spawned from the seed,
+    so a given seed gives the same paths whatever the chunk size or the number of workers.
+    with chunk_size set, the block is not materialized and is read through iter_chunks
+    with a workspace, the block and the chunks are drawn into its reused buffers (a chunk is overwritten by the next one)
+    with cache, a materialized block is read-only and shared with every PathBlock of the same scenario identity
     """
     
     n_sim: int
@@ -34,45 +163,192 @@ class PathBlock:
     seed: Optional[int] = None
     antithetic: bool = False
     array: Optional[np.typing.NDArray[np.float64]] = None
+    chunk_size: Optional[int] = None
+    dtype: Literal['float64', 'float32'] = 'float64'
+    bit_generator: Literal['PCG64', 'Philox'] = 'PCG64'
+    rng: Optional[Union[np.random.Generator, np.random.BitGenerator]] = None
+    stream_size: int = default_stream_size
+    workspace: Optional[Workspace] = None
+    cache: bool = False
     
     def __post_init__(self):
-        if self.seed is not None:
-            np.random.seed(self.seed)
-        
+        self.seed_sequence, self.bit_generator_class = self._resolve_rng()
+        self._cached_block: Optional[tuple[int, np.typing.NDArray]] = None
+
+        if self.chunk_size is None:
+            self.generate()
+
+    def _resolve_rng(self) -> tuple[np.random.SeedSequence, type]:
+        return resolve_rng(self.seed, self.rng, self.bit_generator)
+
+    def stream(self, i_block: int) -> np.random.Generator:
+        return np.random.Generator(self.bit_generator_class(child_sequence(self.seed_sequence, i_block)))
+
+    @property
+    def n_blocks(self) -> int:
+        return -(-self.n_sim // self.stream_size)
+
+    @property
+    def cache_key(self) -> Optional[tuple]:
+        # unseeded blocks are drawn from fresh entropy and never reused
+        if self.seed is None and self.rng is None:
+            return None
+        return ('pseudo', self.seed_sequence.entropy, tuple(self.seed_sequence.spawn_key), self.bit_generator_class.__name__,
+                self.n_sim, self.n_steps, self.d, self.antithetic, np.dtype(self.dtype).str, self.stream_size)
+
+    def _fill_block(self, i_block: int, out: np.typing.NDArray) -> np.typing.NDArray:
+        rng = self.stream(i_block)
+
         if self.antithetic:
-            half_sim = self.n_sim // 2
-            half_array = np.random.normal(loc=0.0, scale=1.0, size=(half_sim, self.n_steps, self.d))
-            self.array = np.vstack((half_array, -half_array))
-            if self.n_sim % 2 != 0:
-                extra_array = np.random.normal(loc=0.0, scale=1.0, size=(1, self.n_steps, self.d))
-                self.array = np.vstack((self.array, extra_array))
+            half_sim = out.shape[0] // 2
+            rng.standard_normal(dtype=out.dtype, out=out[:half_sim])
+            np.negative(out[:half_sim], out=out[half_sim:2 * half_sim])
+            if out.shape[0] % 2 != 0:
+                rng.standard_normal(dtype=out.dtype, out=out[2 * half_sim:])
         else:
-            self.array = np.random.normal(loc=0.0, scale=1.0, size=(self.n_sim, self.n_steps, self.d))
-        
+            rng.standard_normal(dtype=out.dtype, out=out)
+
         # Turn first row to zeros for initial spot price
-        self.array[:, 0, :] = 0.0
+        out[:, 0, :] = 0.0
+        return out
+
+    def _block_size(self, i_block: int) -> int:
+        return min(self.stream_size, self.n_sim - i_block * self.stream_size)
+
+    def fill(self, out: np.typing.NDArray, start: int = 0) -> np.typing.NDArray:
+        """
+        Writes paths [start, start + len(out)) into out
+        """
+        stop = start + out.shape[0]
 
-        self.array = np.round(self.array, accuracy_float)
+        for i_block in range(start // self.stream_size, -(-stop // self.stream_size)):
+            block_start = i_block * self.stream_size
+            block_stop = block_start + self._block_size(i_block)
+            lo, hi = max(start, block_start), min(stop, block_stop)
 
+            if lo == block_start and hi == block_stop:
+                self._fill_block(i_block, out[lo - start:hi - start])
+                continue
+
+            # block cut by the chunk boundary: draw it once aside and keep it for the next chunk
+            if self._cached_block is None or self._cached_block[0] != i_block:
+                buffer = empty(self.workspace, 'stream_block', (block_stop - block_start, self.n_steps, self.d), self.dtype)
+                self._cached_block = (i_block, self._fill_block(i_block, buffer))
+            out[lo - start:hi - start] = self._cached_block[1][lo - block_start:hi - block_start]
+
+        return out
+
+    def generate(self) -> np.typing.NDArray[np.float64]:
+        key = self.cache_key if self.cache else None
+        if key is None:
+            self.array = self.fill(empty(self.workspace, 'shocks', (self.n_sim, self.n_steps, self.d), self.dtype))
+            return self.array
+
+        self.array = shock_cache.get(key)
+        if self.array is None:
+            self.array = shock_cache.put(key, self.fill(np.empty((self.n_sim, self.n_steps, self.d), dtype=self.dtype)))
         return self.array
 
+    def iter_chunks(self, chunk_size: Optional[int] = None, start: int = 0, stop: Optional[int] = None) -> Iterator[np.typing.NDArray[np.float64]]:
+        """
+        Yields blocks of at most chunk_size paths over [start, stop), bit-identical to the materialized block.
+        """
+        chunk_size = chunk_size or self.chunk_size or self.n_sim
+        stop = self.n_sim if stop is None else min(stop, self.n_sim)
+
+        if self.array is not None:
+            for lo in range(start, stop, chunk_size):
+                yield self.array[lo:min(lo + chunk_size, stop)]
+            return
+
+        for lo in range(start, stop, chunk_size):
+            size = min(chunk_size, stop - lo)
+            yield self.fill(empty(self.workspace, 'shock_chunk', (size, self.n_steps, self.d), self.dtype), start=lo)
+        self._cached_block = None
+
 @dataclass(frozen=False)
 class BasketModel(ABC):
+    """
+    Reduction of the underlyings axis (last axis) of the paths into one basket level.
+    - uniform, worst-of, best-of
+    - weighted: weights . S
+    - kth-worst / kth-best: k-th smallest / largest level (k=1 is worst-of / best-of), np.partition
+    - rainbow: rank_weights . S sorted from the best to the worst
+    - performance: weights . S / S0 with S0 the first date of paths (n, n_steps, d), percentage paths are already performances
+    The basket is written into one preallocated array (out), no full size temporary:
+    partition, sort and the performance division work on blocks of block_elements levels at a time.
+    """
     config: SimulationConfig
     n_underlyings: int
-    basket_method: Literal['uniform', 'worst-of', 'best-of']
-    paths:np.typing.NDArray
+    basket_method: Literal['uniform', 'worst-of', 'best-of', 'weighted', 'kth-worst', 'kth-best', 'rainbow', 'performance']
+    paths: Union[np.typing.NDArray, Iterable[np.typing.NDArray]]
+    weights: Optional[np.typing.NDArray[np.float64]] = None # weighted / performance (uniform by default for performance)
+    k: Optional[int] = None # kth-worst / kth-best
+    rank_weights: Optional[np.typing.NDArray[np.float64]] = None # rainbow, best first
+    block_elements: int = default_block_elements
+
+    def __post_init__(self):
+        if self.basket_method == 'weighted' and self.weights is None:
+            raise ValueError("The weighted basket needs weights.")
+        if self.basket_method in ['kth-worst', 'kth-best'] and (self.k is None or not 1 <= self.k <= self.n_underlyings):
+            raise ValueError("k must be between 1 and the number of underlyings.")
+        if self.basket_method == 'rainbow' and self.rank_weights is None:
+            raise ValueError("The rainbow basket needs rank_weights.")
+
+        if self.basket_method == 'performance' and self.weights is None:
+            self.weights = np.full(self.n_underlyings, 1.0 / self.n_underlyings)
+        for name in ['weights', 'rank_weights']:
+            value = getattr(self, name)
+            if value is not None:
+                value = np.asarray(value, dtype=np.float64)
+                if value.shape != (self.n_underlyings,):
+                    raise ValueError(f"{name} must have one value per underlying.")
+                setattr(self, name, value)
 
     def apply_basket_method(self):
-        
-        output = np.zeros_like(self.paths)
+
+        if not isinstance(self.paths, np.ndarray) or isinstance(self.paths, np.memmap):
+            # streaming mode: reduce each chunk as it is consumed, memory mapped paths are read by row chunks
+            return (self.reduce(chunk) for chunk in path_chunks(self.paths, self.config.chunk_size))
+
+        return self.reduce(self.paths)
+
+    def reduce(self, paths: np.typing.NDArray, out: Optional[np.typing.NDArray] = None) -> np.typing.NDArray:
+        # paths (..., d) -> basket (...), written into out when given (a reused buffer: the caller owns it)
+        if out is None:
+            out = np.empty(paths.shape[:-1], dtype=paths.dtype)
 
         if self.basket_method == 'uniform':
-            output = np.mean(self.paths, axis=2)
+            np.mean(paths, axis=-1, out=out)
         elif self.basket_method == 'worst-of':
-            output = np.min(self.paths, axis=2)
+            np.min(paths, axis=-1, out=out)
         elif self.basket_method == 'best-of':
-            output = np.max(self.paths, axis=2)
+            np.max(paths, axis=-1, out=out)
+        elif self.basket_method == 'weighted':
+            np.matmul(paths, self.weights.astype(paths.dtype, copy=False), out=out) #type: ignore
+        elif self.basket_method == 'performance' and paths.ndim < 3:
+            raise ValueError("The performance basket needs the dates axis: paths (n_sim, n_steps, d).")
+        elif self.basket_method in ['kth-worst', 'kth-best', 'rainbow', 'performance']:
+            self._reduce_blocks(paths, out)
         else:
-            raise ValueError("Invalid basket_method. Choose from 'uniform', 'worst-of', or 'best-of'.")
-        return output
\ No newline at end of file
+            raise ValueError("Invalid basket_method. Choose from 'uniform', 'worst-of', 'best-of', 'weighted', 'kth-worst', 'kth-best', 'rainbow' or 'performance'.")
+        return out
+
+    def _reduce_blocks(self, paths: np.typing.NDArray, out: np.typing.NDArray):
+        # blocks along the first axis (paths), every date of a block at once: the temporaries stay at block_elements
+        rows = max(1, self.block_elements // max(1, int(np.prod(paths.shape[1:]))))
+        d = paths.shape[-1]
+        first = paths[:, :1] if self.basket_method == 'performance' else None
+
+        for lo in range(0, paths.shape[0], rows):
+            block = paths[lo:lo + rows]
+            target = out[lo:lo + rows]
+
+            if self.basket_method == 'kth-worst':
+                target[...] = np.partition(block, self.k - 1, axis=-1)[..., self.k - 1] #type: ignore
+            elif self.basket_method == 'kth-best':
+                target[...] = np.partition(block, d - self.k, axis=-1)[..., d - self.k] #type: ignore
+            elif self.basket_method == 'rainbow':
+                np.matmul(np.sort(block, axis=-1), self.rank_weights[::-1].astype(paths.dtype), out=target) #type: ignore
+            else:
+                np.matmul(block / first[lo:lo + rows], self.weights.astype(paths.dtype, copy=False), out=target) #type: ignore
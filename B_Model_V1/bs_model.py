@@ -1,10 +1,14 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
+from datetime import date
+from typing import Optional, Iterator, Union, Literal
 
 import numpy as np
 
-from B_Model_V1.base import SimulationConfig, PathBlock
-
-accuracy_float = 6
+from B_Model_V1.base import SimulationConfig, PathBlock, BasketModel
+from B_Model_V1.qmc import SobolBlock
+from B_Model_V1.correlation import CorrelationModel
+from B_Model_V1.workspace import Workspace, empty
+from B_Model_V1.path_statistics import PathStatistics, default_chunk_elements
 
 @dataclass(frozen=True)
 class UnderlyingParams:
@@ -27,26 +31,70 @@ class UnderlyingParams:
 @dataclass(frozen=False)
 class PortfolioParams:
     underlyings: dict[str, UnderlyingParams]
+    # correlation of the underlyings in dict order, matrix (d, d) or CorrelationModel (full or factor), None = independent
+    correlation: Optional[Union[np.typing.NDArray[np.float64], CorrelationModel]] = field(default=None, kw_only=True)
 
     def __post_init__(self):
         if len(self.underlyings) == 0:
             raise ValueError("Portfolio must contain at least one underlying.")
 
+        if self.correlation is not None and not isinstance(self.correlation, CorrelationModel):
+            self.correlation = CorrelationModel(matrix=np.asarray(self.correlation))
+
+        if self.correlation is not None and self.correlation.d != len(self.underlyings):
+            raise ValueError("Correlation dimension must match the number of underlyings.")
+
+    @property
+    def n_shocks(self) -> int:
+        # independent normals per step, d + k in factor mode
+        return len(self.underlyings) if self.correlation is None else self.correlation.n_shocks
+
 @dataclass(frozen=False)
 class BS_Model(SimulationConfig, PortfolioParams):
+    # reused buffers for the shocks and the paths, shared by the models of a repricing loop on the same config.
+    # paths returned while a workspace is attached are overwritten by the next call
+    workspace: Optional[Workspace] = field(default=None, kw_only=True, repr=False, compare=False)
     
     def __post_init__(self):
         SimulationConfig.__post_init__(self)
         PortfolioParams.__post_init__(self)
+        if self.generator == 'sobol':
+            self.Paths = SobolBlock(
+                n_sim=self.n_paths,
+                n_steps=self.calendar.n_steps, #type: ignore
+                d=self.n_shocks,
+                dt=self.calendar.get_time_dt,
+                seed=self.seed,
+                replications=self.replications,
+                chunk_size=self.chunk_size,
+                dtype=self.dtype,
+                workspace=self.workspace,
+                cache=self.cache
+            )
+            self._seed_sequence = self.Paths.seed_sequence
+            return
+
         self.Paths = PathBlock(
             n_sim=self.n_paths,
             n_steps=self.calendar.n_steps, #type: ignore
-            d=len(self.underlyings),
+            d=self.n_shocks,
             antithetic=self.antithetic,
-            seed=self.seed
+            seed=self.seed,
+            chunk_size=self.chunk_size,
+            dtype=self.dtype,
+            bit_generator=self.bit_generator,
+            rng=self.rng,
+            stream_size=self.stream_size,
+            workspace=self.workspace,
+            cache=self.cache
         )
+        self._seed_sequence = self.Paths.seed_sequence
 
-    def apply_bs_value(self):
+    def sparse(self, dates: list[date]) -> "BS_Model":
+        # same model simulated only at `dates` (plus the start date) with the exact GBM transition between them
+        return replace(self, calendar=self.calendar.sparse(dates))
+
+    def _bs_parameters(self):
         spots = np.array([params.spot for params in self.underlyings.values()])
         vols = np.array([params.vol for params in self.underlyings.values()])
         rates = np.array([params.rate for params in self.underlyings.values()])
@@ -57,32 +105,137 @@ class BS_Model(SimulationConfig, PortfolioParams):
         drifts = rates - divs - 0.5 * vols ** 2
         dt_array = self.calendar.get_time_dt
 
-        Z = self.Paths.array
-        Z = np.outer(dt_array, drifts) + np.outer(np.sqrt(dt_array), vols) * Z
-        
-        log_paths = log_spots + np.cumsum(Z, axis=1)
-        paths = np.exp(log_paths)
-
-        paths = np.round(paths, accuracy_float)
-
-        return paths
-    
-    def apply_bs_percentage(self):
-        spots = np.array([params.spot for params in self.underlyings.values()])
-        vols = np.array([params.vol for params in self.underlyings.values()])
+        drift_dt = np.outer(dt_array, drifts).astype(self.dtype)
+        vol_sqrt_dt = np.outer(np.sqrt(dt_array), vols).astype(self.dtype)
+
+        return log_spots.astype(self.dtype), drift_dt, vol_sqrt_dt
+
+    def _log_increments(self, Z, drift_dt, vol_sqrt_dt, out):
+        if self.correlation is not None:
+            Z = self.correlation.apply(Z, out=out) #type: ignore
+            Z *= vol_sqrt_dt
+            Z += drift_dt
+            return Z
+        np.multiply(Z, vol_sqrt_dt, out=out)
+        out += drift_dt
+        return out
+
+    def _build_paths(self, Z, drift_dt, vol_sqrt_dt, log_spots=None, name='paths'):
+        # shocks -> paths without temporaries: one buffer written by the increments, cumsum and exp in place
+        out = empty(self.workspace, name, Z.shape[:2] + (len(self.underlyings),), self.dtype)
+        paths = self._log_increments(Z, drift_dt, vol_sqrt_dt, out)
+        np.cumsum(paths, axis=1, out=paths)
+        if log_spots is not None:
+            paths += log_spots
+        np.exp(paths, out=paths)
+        return self.round_output(paths)
+
+    def apply_bs_scenarios(self, Z: np.typing.NDArray, spot_factors: np.typing.NDArray, vols: np.typing.NDArray, percentage: bool = False) -> np.typing.NDArray:
+        """
+        Paths (c, n_sim, n_steps, d) of c scenarios on the same shocks Z (common random numbers):
+        scenario k has spots * spot_factors[k] and volatilities vols[k], both of shape (c, d)
+        """
         rates = np.array([params.rate for params in self.underlyings.values()])
         divs = np.array([params.div for params in self.underlyings.values()])
+        spots = np.ones(len(self.underlyings)) if percentage else np.array([params.spot for params in self.underlyings.values()])
+        dt_array = self.calendar.get_time_dt
 
-        log_spots = np.log(spots)
+        vols = np.asarray(vols, dtype=np.float64)
+        drift_dt = (dt_array[None, :, None] * (rates - divs - 0.5 * vols ** 2)[:, None, :]).astype(self.dtype)
+        vol_sqrt_dt = (np.sqrt(dt_array)[None, :, None] * vols[:, None, :]).astype(self.dtype)
+        log_spots = np.log(spots * np.asarray(spot_factors, dtype=np.float64)).astype(self.dtype)
 
-        drifts = rates - divs - 0.5 * vols ** 2
-        dt_array = self.calendar.get_time_dt
+        if self.correlation is not None:
+            Z = self.correlation.apply(Z)
+
+        out = empty(self.workspace, 'scenario_paths', (len(vols),) + Z.shape[:2] + (len(self.underlyings),), self.dtype)
+        np.multiply(Z[None], vol_sqrt_dt[:, None], out=out)
+        out += drift_dt[:, None]
+        np.cumsum(out, axis=2, out=out)
+        out += log_spots[:, None, None, :]
+        np.exp(out, out=out)
+        return self.round_output(out)
 
-        Z = self.Paths.array
-        Z = np.outer(dt_array, drifts) + np.outer(np.sqrt(dt_array), vols) * Z
-        
-        paths = np.cumsum(Z, axis=1)
+    def apply_bs_value(self):
+        log_spots, drift_dt, vol_sqrt_dt = self._bs_parameters()
 
-        paths = np.round(paths, accuracy_float)
+        if self.Paths.array is None:
+            self.Paths.generate()
 
-        return np.exp(paths)
+        return self._build_paths(self.Paths.array, drift_dt, vol_sqrt_dt, log_spots)
+    
+    def apply_bs_percentage(self):
+        _, drift_dt, vol_sqrt_dt = self._bs_parameters()
+
+        if self.Paths.array is None:
+            self.Paths.generate()
+
+        return self._build_paths(self.Paths.array, drift_dt, vol_sqrt_dt)
+
+    def iter_bs_value(self, chunk_size: Optional[int] = None, start: int = 0, stop: Optional[int] = None) -> Iterator[np.typing.NDArray[np.float64]]:
+        # streaming version of apply_bs_value over paths [start, stop): peak memory is set by chunk_size, not n_paths
+        log_spots, drift_dt, vol_sqrt_dt = self._bs_parameters()
+
+        for Z in self.Paths.iter_chunks(chunk_size, start, stop):
+            yield self._build_paths(Z, drift_dt, vol_sqrt_dt, log_spots, name='path_chunk')
+
+    def iter_bs_percentage(self, chunk_size: Optional[int] = None, start: int = 0, stop: Optional[int] = None) -> Iterator[np.typing.NDArray[np.float64]]:
+        _, drift_dt, vol_sqrt_dt = self._bs_parameters()
+
+        for Z in self.Paths.iter_chunks(chunk_size, start, stop):
+            yield self._build_paths(Z, drift_dt, vol_sqrt_dt, name='path_chunk')
+
+    def iter_path_statistics(self, statistics: Optional[list[str]] = None, dates: Optional[list[date]] = None, levels: Optional[list[float]] = None, direction: Literal['up', 'down'] = 'up', basket_method: Optional[Literal['uniform', 'worst-of', 'best-of']] = None, percentage: bool = False, chunk_size: Optional[int] = None, start: int = 0, stop: Optional[int] = None) -> Iterator[dict[str, np.typing.NDArray]]:
+        """
+        Statistics of the paths over the observed dates (every date after the start date by default), chunk by chunk.
+        The GBM is advanced one step at a time from the shocks: only the running statistics and one date of
+        the chunk are live (with chunk_size set, the shocks are drawn by chunks too),
+        the values seen are the ones of apply_bs_value / apply_bs_percentage.
+        basket_method: statistics of the basket (n,) instead of each underlying (n, d)
+        statistics: names of path_statistic_names, max and min when None
+        chunk_size: paths per chunk, the model chunk size or about default_chunk_elements shocks when None
+        """
+        statistics = ['max', 'min'] if statistics is None else statistics
+        chunk_size = chunk_size or self.chunk_size or max(1, default_chunk_elements // (self.calendar.n_steps * self.n_shocks)) #type: ignore
+        log_spots, drift_dt, vol_sqrt_dt = self._bs_parameters()
+        if percentage:
+            log_spots = np.zeros_like(log_spots)
+
+        calendar = self.calendar
+        observed = np.zeros(calendar.n_steps, dtype=bool) #type: ignore
+        if dates is None:
+            observed[1:] = True
+        else:
+            observed[calendar.index_of(calendar.nearest_dates(dates))] = True
+
+        basket = None
+        if basket_method is not None:
+            basket = BasketModel(config=self, n_underlyings=len(self.underlyings), basket_method=basket_method, paths=np.empty((0,)))
+
+        last = int(np.flatnonzero(observed).max())
+        for Z in self.Paths.iter_chunks(chunk_size, start, stop):
+            n = Z.shape[0]
+            tracker = PathStatistics(statistics=list(statistics), levels=levels, direction=direction) #type: ignore
+            log_level = np.zeros((n, 1, len(self.underlyings)), dtype=self.dtype)
+            increment = np.empty_like(log_level)
+            level = np.empty_like(log_level)
+
+            for i in range(last + 1):
+                # same operations as _build_paths: cumulated increments, then the spots, exp and rounding
+                log_level += self._log_increments(np.ascontiguousarray(Z[:, i:i + 1]), drift_dt[i:i + 1], vol_sqrt_dt[i:i + 1], increment)
+                if not observed[i]:
+                    continue
+                np.add(log_level, log_spots, out=level)
+                np.exp(level, out=level)
+                self.round_output(level)
+                tracker.update(i, level[:, 0] if basket is None else basket.reduce(level)[:, 0])
+
+            yield tracker.result()
+
+    def path_statistics(self, statistics: Optional[list[str]] = None, dates: Optional[list[date]] = None, levels: Optional[list[float]] = None, direction: Literal['up', 'down'] = 'up', basket_method: Optional[Literal['uniform', 'worst-of', 'best-of']] = None, percentage: bool = False, chunk_size: Optional[int] = None) -> dict[str, np.typing.NDArray]:
+        """
+        iter_path_statistics over every path, O(n_paths) memory: (n_paths,) or (n_paths, d) per statistic,
+        first_hit (n_paths, [d,] n_levels)
+        """
+        chunks = list(self.iter_path_statistics(statistics, dates, levels, direction, basket_method, percentage, chunk_size))
+        return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
@@ -0,0 +1,67 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+default_cache_budget = 2 ** 30 # bytes of shock blocks kept by the process cache
+
+@dataclass(frozen=False)
+class ShockCache:
+    """
+    Process level LRU cache of generated shock blocks, keyed by the scenario identity
+    (generator, seed sequence, n_paths, n_steps, d, antithetic, dtype, stream size...).
+    Cached blocks are read-only and shared by every model built on the same scenario set.
+    """
+
+    max_bytes: int = default_cache_budget
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    blocks: "OrderedDict[tuple, np.typing.NDArray]" = field(default_factory=OrderedDict, repr=False)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(block.nbytes for block in self.blocks.values())
+
+    def get(self, key: tuple) -> Optional[np.typing.NDArray]:
+        block = self.blocks.get(key)
+        if block is None:
+            self.misses += 1
+            return None
+        self.blocks.move_to_end(key)
+        self.hits += 1
+        return block
+
+    def put(self, key: tuple, block: np.typing.NDArray) -> np.typing.NDArray:
+        block.setflags(write=False)
+        if block.nbytes > self.max_bytes:
+            # larger than the whole budget: used once, never stored
+            return block
+
+        self.blocks[key] = block
+        self.blocks.move_to_end(key)
+        self._evict()
+        return block
+
+    def _evict(self):
+        nbytes = self.nbytes
+        while nbytes > self.max_bytes and self.blocks:
+            _, block = self.blocks.popitem(last=False)
+            nbytes -= block.nbytes
+            self.evictions += 1
+
+    def set_budget(self, max_bytes: int):
+        if max_bytes < 0:
+            raise ValueError("max_bytes must be non-negative.")
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def clear(self):
+        self.blocks.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def report(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "blocks": len(self.blocks), "bytes": self.nbytes}
+
+shock_cache = ShockCache()
@@ -1,2 +1,180 @@
-# Not yet implemented
-# will probably be based on cholesky decomposition 
\ No newline at end of file
+import warnings
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+correlation_tolerance = 1e-10
+eigenvalue_floor = 1e-8 # smallest eigenvalue kept by the repair, keeps the Cholesky factor well defined
+higham_max_iter = 100
+factor_max_iter = 500
+factor_tolerance = 1e-10 # convergence of the communalities (diag(B B^T)) of the factor fit
+factor_error_tolerance = 1e-2 # largest off-diagonal error of B B^T tolerated without a warning
+
+def nearest_correlation(matrix: np.typing.NDArray[np.float64], max_iter: int = higham_max_iter, tol: float = 1e-9) -> np.typing.NDArray[np.float64]:
+    """
+    Nearest correlation matrix (Higham 2002, alternating projections with Dykstra correction)
+    """
+    Y = np.array(matrix, dtype=np.float64)
+    dS = np.zeros_like(Y)
+
+    for _ in range(max_iter):
+        R = Y - dS
+        eigval, eigvec = np.linalg.eigh(R)
+        X = (eigvec * np.maximum(eigval, correlation_tolerance)) @ eigvec.T
+        dS = X - R
+        Y_next = X.copy()
+        np.fill_diagonal(Y_next, 1.0)
+        if np.linalg.norm(Y_next - Y, 'fro') <= tol * np.linalg.norm(Y_next, 'fro'):
+            Y = Y_next
+            break
+        Y = Y_next
+
+    # last projection strictly inside the PD cone, back to a unit diagonal
+    eigval, eigvec = np.linalg.eigh((Y + Y.T) / 2)
+    Y = (eigvec * np.maximum(eigval, eigenvalue_floor)) @ eigvec.T
+    scale = 1.0 / np.sqrt(np.diag(Y))
+    Y = Y * scale[:, None] * scale[None, :]
+    return (Y + Y.T) / 2
+
+@lru_cache(maxsize=32)
+def _cached_cholesky(key: bytes, d: int) -> np.typing.NDArray[np.float64]:
+    matrix = np.frombuffer(key, dtype=np.float64).reshape(d, d)
+    try:
+        factor = np.linalg.cholesky(matrix)
+    except np.linalg.LinAlgError:
+        warnings.warn("Correlation matrix is not positive definite: repaired to the nearest correlation matrix.", RuntimeWarning)
+        factor = np.linalg.cholesky(nearest_correlation(matrix))
+    factor.setflags(write=False)
+    return factor
+
+def cholesky_factor(matrix: np.typing.NDArray[np.float64]) -> np.typing.NDArray[np.float64]:
+    # cached by matrix content, several BS_Model on the same portfolio share one factorization
+    matrix = np.ascontiguousarray(matrix, dtype=np.float64)
+    return _cached_cholesky(matrix.tobytes(), matrix.shape[0])
+
+def factor_loadings(matrix: np.typing.NDArray[np.float64], rank: int, max_iter: int = factor_max_iter, tol: float = factor_tolerance) -> tuple[np.typing.NDArray[np.float64], np.typing.NDArray[np.float64]]:
+    """
+    Factor model matrix ~ B B^T + diag(psi), psi = 1 - diag(B B^T), fitted by iterated principal factors:
+    the top `rank` eigenvectors of the matrix with the communalities diag(B B^T) on its diagonal, until they converge.
+    The fixed point minimizes the off-diagonal error ||matrix - B B^T|| (psi absorbs the diagonal),
+    where a plain truncation of the eigenvectors of the matrix overstates the correlations.
+    """
+    d = matrix.shape[0]
+    reduced = np.array(matrix, dtype=np.float64)
+    communalities = np.ones(d) # first pass: principal components
+
+    for _ in range(max_iter):
+        np.fill_diagonal(reduced, communalities)
+        eigval, eigvec = np.linalg.eigh(reduced)
+        top = np.argsort(eigval)[::-1][:rank]
+        loadings = eigvec[:, top] * np.sqrt(np.maximum(eigval[top], 0.0))
+
+        # rows of B are shrunk if they explain more than the unit variance (Heywood case)
+        norms = np.sqrt((loadings ** 2).sum(axis=1))
+        loadings = loadings / np.maximum(norms, 1.0)[:, None]
+
+        previous, communalities = communalities, (loadings ** 2).sum(axis=1)
+        if np.max(np.abs(communalities - previous)) <= tol:
+            break
+
+    residual = matrix - loadings @ loadings.T
+    np.fill_diagonal(residual, 0.0)
+    error = np.max(np.abs(residual))
+    if error > factor_error_tolerance:
+        warnings.warn(f"{rank} factors fit the correlations up to {error:.4f}, above {factor_error_tolerance}: increase the rank or use the full matrix.")
+    return loadings, 1.0 - communalities
+
+@dataclass(frozen=False)
+class CorrelationModel:
+    """
+    Correlation of the d underlyings, either full (cached Cholesky factor of matrix)
+    or low rank (k factors: loadings B of shape (d, k) and idiosyncratic variances psi).
+    The factor mode draws d + k shocks and costs O(d.k) per step instead of O(d^2).
+    """
+
+    matrix: Optional[np.typing.NDArray[np.float64]] = None
+    loadings: Optional[np.typing.NDArray[np.float64]] = None
+    rank: Optional[int] = None # builds loadings from matrix
+
+    def __post_init__(self):
+        if self.matrix is None and self.loadings is None:
+            raise ValueError("Either a correlation matrix or factor loadings must be provided.")
+
+        if self.matrix is not None:
+            self.matrix = np.array(self.matrix, dtype=np.float64)
+            self.validate_matrix(self.matrix)
+
+        if self.rank is not None:
+            if self.matrix is None:
+                raise ValueError("rank requires a correlation matrix.")
+            if not (0 < self.rank < self.matrix.shape[0]):
+                raise ValueError("rank must be between 1 and d - 1.")
+            self.loadings, self.idiosyncratic = factor_loadings(self.matrix, self.rank)
+
+        elif self.loadings is not None:
+            self.loadings = np.array(self.loadings, dtype=np.float64)
+            if self.loadings.ndim != 2:
+                raise ValueError("loadings must have shape (d, k).")
+            self.idiosyncratic = 1.0 - (self.loadings ** 2).sum(axis=1)
+            if np.any(self.idiosyncratic < -correlation_tolerance):
+                raise ValueError("Each row of the loadings must have a norm lower than 1.")
+            self.idiosyncratic = np.maximum(self.idiosyncratic, 0.0)
+
+    @staticmethod
+    def validate_matrix(matrix: np.typing.NDArray[np.float64]):
+        if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+            raise ValueError("Correlation matrix must be square.")
+        if not np.allclose(matrix, matrix.T, atol=correlation_tolerance):
+            raise ValueError("Correlation matrix must be symmetric.")
+        if not np.allclose(np.diag(matrix), 1.0, atol=correlation_tolerance):
+            raise ValueError("Correlation matrix must have a unit diagonal.")
+        if np.any(np.abs(matrix) > 1.0 + correlation_tolerance):
+            raise ValueError("Correlations must be between -1 and 1.")
+
+    @property
+    def factor_mode(self) -> bool:
+        return self.loadings is not None
+
+    @property
+    def d(self) -> int:
+        return self.loadings.shape[0] if self.loadings is not None else self.matrix.shape[0] #type: ignore
+
+    @property
+    def n_shocks(self) -> int:
+        # number of independent normals drawn per step
+        return self.d + self.loadings.shape[1] if self.loadings is not None else self.d
+
+    @property
+    def cholesky(self) -> np.typing.NDArray[np.float64]:
+        return cholesky_factor(self.matrix) #type: ignore
+
+    @property
+    def effective_matrix(self) -> np.typing.NDArray[np.float64]:
+        if self.loadings is not None:
+            return self.loadings @ self.loadings.T + np.diag(self.idiosyncratic)
+        L = self.cholesky
+        return L @ L.T
+
+    def apply(self, Z: np.typing.NDArray, out: Optional[np.typing.NDArray] = None) -> np.typing.NDArray:
+        """
+        Independent shocks (n_sim, n_steps, n_shocks) -> correlated shocks (n_sim, n_steps, d), one batched matmul
+        out: optional contiguous (n_sim, n_steps, d) buffer written in place
+        """
+        n_sim, n_steps, n_shocks = Z.shape
+        if n_shocks != self.n_shocks:
+            raise ValueError(f"Expected {self.n_shocks} shocks per step, got {n_shocks}.")
+
+        if out is None:
+            out = np.empty((n_sim, n_steps, self.d), dtype=Z.dtype)
+        flat, correlated = Z.reshape(-1, n_shocks), out.reshape(-1, self.d)
+
+        if self.loadings is None:
+            np.matmul(flat, self.cholesky.T.astype(Z.dtype, copy=False), out=correlated)
+        else:
+            d = self.d
+            np.matmul(flat[:, d:], self.loadings.T.astype(Z.dtype, copy=False), out=correlated)
+            correlated += flat[:, :d] * np.sqrt(self.idiosyncratic).astype(Z.dtype, copy=False)
+
+        return out
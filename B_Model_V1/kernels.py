@@ -0,0 +1,105 @@
+from typing import Callable
+
+import numpy as np
+
+try:
+    import numba
+except ImportError: # optional dependency, the NumPy backend is used without it
+    numba = None
+
+kernel_backends = ['numpy', 'numba']
+basket_codes = {'uniform': 0, 'worst-of': 1, 'best-of': 2}
+observe_codes = {None: -1, 'Best': 0, 'Worst': 1, 'Last': 2, 'First': 3, 'Above_Mean': 4}
+payoff_codes = {'call': 0, 'put': 1, 'digital_call': 2, 'digital_put': 3}
+
+prange = range if numba is None else numba.prange
+_compiled: dict[bool, Callable] = {}
+
+def backend_available(backend: str) -> bool:
+    return backend == 'numpy' or (backend == 'numba' and numba is not None)
+
+def fused_payoffs(shocks, vols, drift_dt, log_spots, scale, basket_code,
+                  observed, level, up, knock_in, observe_code,
+                  strikes, payoff_code, strike_value, levier, payout, rebate, rebate_if_not_activated,
+                  log_levels, baskets, out):
+    """
+    One loop per path: segment shocks (n, m - 1, d) -> levels -> rounding -> basket -> barrier observation -> payoffs (n, k).
+    Same operations, in the same order, as the NumPy pipeline (BS_Model paths, BasketModel, Barrier_Model, payoff).
+    scale: 10 ** decimals of the rounding, 0 for none, observe_code < 0: no barrier (always activated).
+    scale and the option scalars come in the path dtype: a float64 scale would promote float32 levels
+    before the rounding (numba), where np.round rounds in float32.
+    log_levels (n, d) and baskets (n, m) are scratch rows in the path dtype, nothing else is allocated.
+    """
+    n, m, d = shocks.shape[0], shocks.shape[1] + 1, shocks.shape[2]
+
+    for p in prange(n):
+        hits, count, first, last = 0, 0, -1, -1
+        for j in range(m):
+            # summed in the row, so in the path dtype as np.mean
+            baskets[p, j] = 0.0
+            for i in range(d):
+                if j == 0:
+                    log_levels[p, i] = log_spots[i]
+                else:
+                    increment = shocks[p, j - 1, i] * vols[i]
+                    increment += drift_dt[j - 1, i]
+                    log_levels[p, i] += increment
+                value = np.exp(log_levels[p, i])
+                if scale > 0:
+                    value = np.rint(value * scale) / scale
+
+                if basket_code == 0:
+                    baskets[p, j] += value
+                elif i == 0 or (basket_code == 1 and value < baskets[p, j]) or (basket_code == 2 and value > baskets[p, j]):
+                    baskets[p, j] = value
+            if basket_code == 0:
+                baskets[p, j] /= d
+            basket = baskets[p, j]
+
+            if observe_code >= 0 and observed[j]:
+                hit = basket >= level if up else basket <= level
+                # observation = 1 for a hit on a knock in barrier, 1 for no hit on a knock out barrier
+                value_observed = 1 if hit == knock_in else 0
+                hits += value_observed
+                count += 1
+                if first < 0:
+                    first = value_observed
+                last = value_observed
+
+        activated = 1.0
+        if observe_code == 0:
+            activated = 1.0 if hits > 0 else 0.0
+        elif observe_code == 1:
+            activated = 1.0 if hits == count else 0.0
+        elif observe_code == 2:
+            activated = float(last)
+        elif observe_code == 3:
+            activated = float(first)
+        elif observe_code == 4:
+            activated = 1.0 if hits >= 0.5 * count else 0.0
+
+        for k in range(strikes.shape[0]):
+            S = baskets[p, strikes[k]]
+            in_the_money = S > strike_value if payoff_code == 0 or payoff_code == 2 else S < strike_value
+            if payoff_code == 0:
+                value = levier * (S - strike_value)
+            elif payoff_code == 1:
+                value = levier * (strike_value - S)
+            else:
+                value = payout
+
+            if not in_the_money:
+                out[p, k] = rebate if rebate_if_not_activated else rebate * activated
+            elif rebate_if_not_activated:
+                out[p, k] = value * activated + rebate * (1.0 - activated)
+            else:
+                out[p, k] = value * activated
+    return out
+
+def fused_kernel(parallel: bool = False) -> Callable:
+    # compiled once per process (and cached on disk), parallel runs the paths of a chunk on all threads
+    if numba is None:
+        raise ImportError("The 'numba' kernel backend needs numba installed.")
+    if parallel not in _compiled:
+        _compiled[parallel] = numba.njit(parallel=parallel, cache=True)(fused_payoffs)
+    return _compiled[parallel]
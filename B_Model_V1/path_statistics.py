@@ -0,0 +1,74 @@
+from dataclasses import dataclass, field
+from typing import Literal, Optional
+
+import numpy as np
+
+path_statistic_names = ['max', 'min', 'mean', 'geometric_mean', 'last', 'first_hit']
+default_chunk_elements = 2 ** 20 # shocks read per chunk (paths x steps x shocks) when no chunk size is given
+
+@dataclass(frozen=False)
+class PathStatistics:
+    """
+    Running statistics of a chunk of paths, fed one observed date at a time: the paths are never stored.
+    values fed to update() are (n_sim,) basket levels or (n_sim, d) underlying levels.
+    first_hit: first observed grid index at or beyond each level ('up': >=, 'down': <=), -1 when never hit, shape (..., n_levels)
+    """
+
+    statistics: list[str]
+    levels: Optional[np.typing.NDArray[np.float64]] = None
+    direction: Literal['up', 'down'] = 'up'
+    count: int = 0
+    state: dict[str, np.typing.NDArray] = field(default_factory=dict)
+
+    def __post_init__(self):
+        for name in self.statistics:
+            if name not in path_statistic_names:
+                raise ValueError(f"Invalid statistic '{name}'. Choose from {path_statistic_names}.")
+        if 'first_hit' in self.statistics and self.levels is None:
+            raise ValueError("first_hit needs levels.")
+        if self.direction not in ['up', 'down']:
+            raise ValueError("direction must be 'up' or 'down'.")
+        if self.levels is not None:
+            self.levels = np.atleast_1d(np.asarray(self.levels, dtype=np.float64))
+
+    def update(self, index: int, values: np.typing.NDArray) -> "PathStatistics":
+        state = self.state
+        if self.count == 0:
+            if 'max' in self.statistics:
+                state['max'] = values.copy()
+            if 'min' in self.statistics:
+                state['min'] = values.copy()
+            if 'mean' in self.statistics:
+                state['mean'] = values.astype(np.float64)
+            if 'geometric_mean' in self.statistics:
+                state['geometric_mean'] = np.log(values, dtype=np.float64)
+            if 'first_hit' in self.statistics:
+                state['first_hit'] = np.full(values.shape + self.levels.shape, -1, dtype=np.int64) #type: ignore
+        else:
+            if 'max' in self.statistics:
+                np.maximum(state['max'], values, out=state['max'])
+            if 'min' in self.statistics:
+                np.minimum(state['min'], values, out=state['min'])
+            if 'mean' in self.statistics:
+                state['mean'] += values
+            if 'geometric_mean' in self.statistics:
+                state['geometric_mean'] += np.log(values, dtype=np.float64)
+
+        if 'last' in self.statistics:
+            state['last'] = values.copy()
+        if 'first_hit' in self.statistics:
+            hit = values[..., None] >= self.levels if self.direction == 'up' else values[..., None] <= self.levels
+            state['first_hit'][hit & (state['first_hit'] < 0)] = index
+
+        self.count += 1
+        return self
+
+    def result(self) -> dict[str, np.typing.NDArray]:
+        if self.count == 0:
+            raise ValueError("No date observed yet.")
+        results = {name: self.state[name] for name in self.statistics if name not in ['mean', 'geometric_mean']}
+        if 'mean' in self.statistics:
+            results['mean'] = self.state['mean'] / self.count
+        if 'geometric_mean' in self.statistics:
+            results['geometric_mean'] = np.exp(self.state['geometric_mean'] / self.count)
+        return results
@@ -0,0 +1,168 @@
+from dataclasses import dataclass
+from typing import Optional, Literal, Iterator
+import warnings
+
+import numpy as np
+from scipy.stats import qmc
+from scipy.special import ndtri
+
+from B_Model_V1.workspace import Workspace, empty
+from B_Model_V1.cache import shock_cache
+
+uniform_clip = 1e-12 # keeps ndtri finite at the edges of the unit cube
+
+def brownian_bridge_order(times: np.typing.NDArray[np.float64]) -> list[tuple[int, int, int, float, float, float]]:
+    """
+    Construction plan of W(times[1:]) with W(times[0]) = 0: terminal point first, then midpoints breadth-first.
+    each step is (index, left, right, left weight, right weight, std), right = -1 for the terminal point
+    """
+    n = len(times) - 1
+    plan = [(n, 0, -1, 0.0, 0.0, float(np.sqrt(times[n] - times[0])))]
+
+    intervals = [(0, n)]
+    while intervals:
+        next_intervals = []
+        for left, right in intervals:
+            if right - left < 2:
+                continue
+            mid = (left + right) // 2
+            t_l, t_m, t_r = times[left], times[mid], times[right]
+            span = t_r - t_l
+            w_l = (t_r - t_m) / span if span > 0 else 0.5
+            w_r = (t_m - t_l) / span if span > 0 else 0.5
+            std = np.sqrt((t_m - t_l) * (t_r - t_m) / span) if span > 0 else 0.0
+            plan.append((mid, left, right, w_l, w_r, float(std)))
+            next_intervals += [(left, mid), (mid, right)]
+        intervals = next_intervals
+
+    return plan
+
+@dataclass(frozen=False)
+class SobolBlock:
+    """
+    Quasi Monte Carlo alternative to PathBlock, same shape (n_sim, n_steps, d) and same reading interface.
+    Scrambled Sobol points are mapped to normals and assigned to the time steps in Brownian bridge order.
+    paths are split in `replications` independent scramblings of stream_size = n_sim // replications points,
+    the dispersion of the replication means gives the error estimate
+    """
+
+    n_sim: int
+    n_steps: int
+    d: int
+    dt: np.typing.NDArray[np.float64]
+    seed: Optional[int] = None
+    replications: int = 16
+    array: Optional[np.typing.NDArray[np.float64]] = None
+    chunk_size: Optional[int] = None
+    dtype: Literal['float64', 'float32'] = 'float64'
+    workspace: Optional[Workspace] = None
+    cache: bool = False
+
+    def __post_init__(self):
+        if self.replications <= 1:
+            raise ValueError("replications must be at least 2 to estimate the QMC error.")
+        if self.n_sim % self.replications != 0:
+            raise ValueError("n_paths must be a multiple of replications for Sobol paths.")
+        if len(self.dt) != self.n_steps:
+            raise ValueError("dt must have one entry per time step.")
+
+        self.stream_size = self.n_sim // self.replications
+        if self.stream_size & (self.stream_size - 1) != 0:
+            warnings.warn(f"Sobol replications of {self.stream_size} points: powers of 2 keep the balance properties.")
+
+        self.seed_sequence = np.random.SeedSequence(self.seed)
+        self.times = np.concatenate(([0.0], np.cumsum(self.dt[1:])))
+        self.plan = brownian_bridge_order(self.times)
+        self.dimension = (self.n_steps - 1) * self.d
+
+        if self.chunk_size is None:
+            self.generate()
+
+    @property
+    def n_blocks(self) -> int:
+        return self.replications
+
+    @property
+    def cache_key(self) -> Optional[tuple]:
+        if self.seed is None:
+            return None
+        return ('sobol', self.seed_sequence.entropy, tuple(self.seed_sequence.spawn_key), self.n_sim, self.n_steps, self.d,
+                self.replications, np.dtype(self.dtype).str, np.asarray(self.dt, dtype=np.float64).tobytes())
+
+    def stream(self, i_block: int) -> qmc.Sobol:
+        child = np.random.SeedSequence(
+            entropy=self.seed_sequence.entropy,
+            spawn_key=tuple(self.seed_sequence.spawn_key) + (i_block,),
+            pool_size=self.seed_sequence.pool_size,
+        )
+        return qmc.Sobol(d=self.dimension, scramble=True, seed=np.random.default_rng(child))
+
+    def _bridge(self, normals: np.typing.NDArray[np.float64], out: np.typing.NDArray) -> np.typing.NDArray:
+        # normals (n, (n_steps - 1) * d): Sobol coordinate k * d + j drives bridge step k of underlying j
+        n = normals.shape[0]
+        normals = normals.reshape(n, self.n_steps - 1, self.d)
+
+        W = empty(self.workspace, 'bridge', (n, self.n_steps, self.d))
+        W[:, 0] = 0.0
+        for k, (i, left, right, w_l, w_r, std) in enumerate(self.plan):
+            if right < 0:
+                W[:, i] = std * normals[:, k]
+            else:
+                W[:, i] = w_l * W[:, left] + w_r * W[:, right] + std * normals[:, k]
+
+        # back to standardized increments, as drawn by PathBlock
+        sqrt_dt = np.sqrt(self.dt[1:])
+        increments = np.diff(W, axis=1)
+        np.divide(increments, sqrt_dt[:, None], out=increments, where=sqrt_dt[:, None] > 0)
+        out[:, 0, :] = 0.0
+        out[:, 1:, :] = increments
+        return out
+
+    def fill(self, out: np.typing.NDArray, start: int = 0) -> np.typing.NDArray:
+        """
+        Writes paths [start, start + len(out)) into out
+        """
+        stop = start + out.shape[0]
+
+        for i_block in range(start // self.stream_size, -(-stop // self.stream_size)):
+            block_start = i_block * self.stream_size
+            lo, hi = max(start, block_start), min(stop, block_start + self.stream_size)
+
+            sobol = self.stream(i_block)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore") # balance warning on non power of 2 chunks
+                if lo > block_start:
+                    sobol.fast_forward(lo - block_start)
+                points = sobol.random(hi - lo)
+
+            normals = ndtri(np.clip(points, uniform_clip, 1.0 - uniform_clip))
+            self._bridge(normals, out[lo - start:hi - start])
+
+        return out
+
+    def generate(self) -> np.typing.NDArray[np.float64]:
+        key = self.cache_key if self.cache else None
+        if key is None:
+            self.array = self.fill(empty(self.workspace, 'shocks', (self.n_sim, self.n_steps, self.d), self.dtype))
+            return self.array
+
+        self.array = shock_cache.get(key)
+        if self.array is None:
+            self.array = shock_cache.put(key, self.fill(np.empty((self.n_sim, self.n_steps, self.d), dtype=self.dtype)))
+        return self.array
+
+    def iter_chunks(self, chunk_size: Optional[int] = None, start: int = 0, stop: Optional[int] = None) -> Iterator[np.typing.NDArray[np.float64]]:
+        """
+        Yields blocks of at most chunk_size paths over [start, stop), bit-identical to the materialized block.
+        """
+        chunk_size = chunk_size or self.chunk_size or self.n_sim
+        stop = self.n_sim if stop is None else min(stop, self.n_sim)
+
+        if self.array is not None:
+            for lo in range(start, stop, chunk_size):
+                yield self.array[lo:min(lo + chunk_size, stop)]
+            return
+
+        for lo in range(start, stop, chunk_size):
+            size = min(chunk_size, stop - lo)
+            yield self.fill(empty(self.workspace, 'shock_chunk', (size, self.n_steps, self.d), self.dtype), start=lo)
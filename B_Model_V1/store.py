@@ -0,0 +1,149 @@
+import json
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Optional, Literal, Iterator, Union
+
+import numpy as np
+
+from B_Model_V1.base import SimulationConfig, iter_rows
+from B_Model_V1.bs_model import BS_Model
+from B_Model_V1.timegrid import Calendar
+
+store_kinds = ['value', 'percentage', 'shocks', 'basket']
+
+def model_metadata(model: BS_Model) -> dict:
+    calendar = model.calendar
+    correlation = None
+    if model.correlation is not None:
+        correlation = {"matrix": None if model.correlation.matrix is None else model.correlation.matrix.tolist(),
+                       "loadings": None if model.correlation.loadings is None else model.correlation.loadings.tolist()}
+
+    return {
+        "calendar": {
+            "start_date": calendar.start_date.isoformat(),
+            "end_date": calendar.end_date.isoformat(),
+            "trading_days": calendar.trading_days,
+            "dates": [d.isoformat() for d in calendar.get_dates],
+        },
+        "n_paths": model.n_paths,
+        "seed": model.seed,
+        "entropy": str(model.Paths.seed_sequence.entropy),
+        "antithetic": model.antithetic,
+        "dtype": model.dtype,
+        "rounding": model.rounding,
+        "bit_generator": model.bit_generator,
+        "stream_size": model.stream_size,
+        "generator": model.generator,
+        "replications": model.replications,
+        "underlyings": {isin: {"spot": u.spot, "vol": u.vol, "rate": u.rate, "div": u.div} for isin, u in model.underlyings.items()},
+        "correlation": correlation,
+    }
+
+@dataclass(frozen=False)
+class PathStore:
+    """
+    Simulated paths (or the raw shocks) saved as a .npy file read back through a memory map,
+    with a .json header describing the calendar, the seed and the model parameters.
+    Simulate once, then price from any number of processes sharing the same pages.
+    """
+
+    path: Union[str, Path]
+
+    def __post_init__(self):
+        self.path = Path(self.path).with_suffix('.npy')
+        self.metadata_path = self.path.with_suffix('.json')
+        self._metadata: Optional[dict] = None
+
+    def write(self, model: BS_Model, kind: Literal['value', 'percentage', 'shocks'] = 'value', chunk_size: Optional[int] = None) -> np.memmap:
+        """
+        Simulates model chunk by chunk straight into the file, peak memory is one chunk
+        """
+        if kind == 'value':
+            chunks = model.iter_bs_value(chunk_size)
+            shape = (model.n_paths, model.calendar.n_steps, len(model.underlyings))
+        elif kind == 'percentage':
+            chunks = model.iter_bs_percentage(chunk_size)
+            shape = (model.n_paths, model.calendar.n_steps, len(model.underlyings))
+        elif kind == 'shocks':
+            chunks = model.Paths.iter_chunks(chunk_size or model.chunk_size)
+            shape = (model.n_paths, model.calendar.n_steps, model.n_shocks)
+        else:
+            raise ValueError("kind must be 'value', 'percentage' or 'shocks'.")
+
+        array = np.lib.format.open_memmap(self.path, mode='w+', dtype=model.dtype, shape=shape) #type: ignore
+        start = 0
+        for chunk in chunks:
+            array[start:start + chunk.shape[0]] = chunk
+            start += chunk.shape[0]
+        array.flush()
+
+        self._write_metadata(model, kind, shape)
+        return self.read()
+
+    def write_array(self, array: np.typing.NDArray, model: BS_Model, kind: Literal['value', 'percentage', 'shocks', 'basket'] = 'basket') -> np.memmap:
+        # already simulated paths, e.g. a basket from BasketModel
+        if kind not in store_kinds:
+            raise ValueError(f"kind must be one of {store_kinds}")
+        if array.shape[0] != model.n_paths:
+            raise ValueError("array must have one row per path of the model.")
+
+        np.save(self.path, np.ascontiguousarray(array))
+        self._write_metadata(model, kind, array.shape)
+        return self.read()
+
+    def _write_metadata(self, model: BS_Model, kind: str, shape: tuple):
+        metadata = model_metadata(model)
+        metadata.update({"kind": kind, "shape": list(shape)})
+        with open(self.metadata_path, 'w') as file:
+            json.dump(metadata, file, indent=2)
+        self._metadata = metadata
+
+    @property
+    def metadata(self) -> dict:
+        if self._metadata is None:
+            if not self.metadata_path.exists():
+                raise FileNotFoundError(f"{self.metadata_path} does not exist.")
+            with open(self.metadata_path) as file:
+                self._metadata = json.load(file)
+        return self._metadata #type: ignore
+
+    def read(self, mmap_mode: Literal['r', 'r+', 'c'] = 'r') -> np.memmap:
+        # no data is loaded here, pages are read when rows are accessed
+        if not self.path.exists():
+            raise FileNotFoundError(f"{self.path} does not exist.")
+        array = np.load(self.path, mmap_mode=mmap_mode)
+        if list(array.shape) != self.metadata["shape"]:
+            raise ValueError(f"{self.path} does not match its metadata.")
+        return array
+
+    def iter_chunks(self, chunk_size: Optional[int] = None, start: int = 0, stop: Optional[int] = None) -> Iterator[np.typing.NDArray]:
+        return iter_rows(self.read(), chunk_size, start, stop)
+
+    @property
+    def calendar(self) -> Calendar:
+        # rebuilt on the saved dates, index lookups are identical to the simulation grid
+        calendar = self.metadata["calendar"]
+        return Calendar(
+            start_date=date.fromisoformat(calendar["start_date"]),
+            end_date=date.fromisoformat(calendar["end_date"]),
+            trading_days=calendar["trading_days"],
+            dates=[date.fromisoformat(d) for d in calendar["dates"]]
+        )
+
+    def config(self, chunk_size: Optional[int] = None) -> SimulationConfig:
+        # configuration of the saved paths for the pricing models, nothing is simulated
+        metadata = self.metadata
+        return SimulationConfig(
+            calendar=self.calendar,
+            n_paths=metadata["n_paths"],
+            seed=metadata["seed"],
+            antithetic=metadata["antithetic"],
+            chunk_size=chunk_size,
+            dtype=metadata["dtype"],
+            rounding=metadata["rounding"],
+            bit_generator=metadata["bit_generator"],
+            stream_size=metadata["stream_size"],
+            generator=metadata["generator"],
+            replications=metadata["replications"]
+        )
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from B_Model_V1.accumulator import RunningStats, RunningCovariance
+
+def split(sample: np.ndarray, sizes: list[int]) -> list[np.ndarray]:
+    return np.split(sample, np.cumsum(sizes)[:-1])
+
+@pytest.mark.parametrize("sizes", [[1000], [1, 999], [333, 333, 334], [7] * 100 + [300], [0, 500, 0, 500]])
+def test_running_stats_match_numpy_whatever_the_batches(sizes):
+    sample = np.random.default_rng(0).standard_normal((1000, 3))
+    stats = RunningStats()
+    for batch in split(sample, sizes):
+        stats.update(batch)
+
+    assert stats.count == 1000
+    np.testing.assert_allclose(stats.mean, sample.mean(axis=0), rtol=0, atol=1e-14)
+    np.testing.assert_allclose(stats.std, sample.std(axis=0), rtol=1e-13)
+    np.testing.assert_allclose(stats.std_error, sample.std(axis=0) / np.sqrt(1000), rtol=1e-13)
+
+def test_merge_is_order_independent():
+    # workers merge their partial statistics in any order
+    batches = split(np.random.default_rng(1).exponential(size=(900, 2)), [100, 250, 50, 500])
+    partials = [RunningStats().update(batch) for batch in batches]
+
+    forward, backward = RunningStats(), RunningStats()
+    for stats in partials:
+        forward.merge(stats)
+    for stats in partials[::-1]:
+        backward.merge(stats)
+
+    np.testing.assert_allclose(forward.mean, backward.mean, rtol=1e-14)
+    np.testing.assert_allclose(forward.m2, backward.m2, rtol=1e-13)
+
+def test_welford_keeps_the_variance_of_a_large_offset():
+    # sum of squares minus squared mean loses every digit here, the centered updates do not
+    noise = np.random.default_rng(2).standard_normal(10_000)
+    stats = RunningStats()
+    for batch in split(1e9 + noise, [10] * 1000):
+        stats.update(batch)
+    assert stats.std == pytest.approx(noise.std(), rel=1e-6)
+
+def test_float32_batches_are_accumulated_in_float64():
+    sample = np.random.default_rng(3).standard_normal(4096).astype(np.float32)
+    stats = RunningStats().update(sample[:1000]).update(sample[1000:])
+    assert stats.mean.dtype == np.float64
+    assert stats.mean == pytest.approx(sample.astype(np.float64).mean(), abs=1e-12)
+
+def test_running_covariance_matches_the_population_covariance():
+    rng = np.random.default_rng(4)
+    sample = rng.standard_normal((2000, 3)) @ np.array([[1.0, 0.5, 0.0], [0.0, 1.0, -0.3], [0.0, 0.0, 2.0]])
+    stats = RunningCovariance()
+    for batch in split(sample, [17, 983, 1000]):
+        stats.update(batch)
+
+    np.testing.assert_allclose(stats.covariance, np.cov(sample, rowvar=False, bias=True), rtol=1e-12, atol=1e-14)
+    np.testing.assert_allclose(stats.std, sample.std(axis=0), rtol=1e-12)
+
+def test_statistics_of_nothing_are_an_error():
+    with pytest.raises(ValueError):
+        RunningStats().update(np.empty((0, 2))).std
+    with pytest.raises(ValueError):
+        RunningCovariance().covariance
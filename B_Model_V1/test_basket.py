@@ -0,0 +1,76 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from B_Model_V1.base import BasketModel
+from B_Model_V1.bs_model import BS_Model, UnderlyingParams
+from B_Model_V1.timegrid import Calendar
+
+calendar = Calendar(start_date=date(2024, 1, 1), end_date=date(2025, 1, 1), n_steps=12, trading_days=365.0)
+spots, vols = [100.0, 80.0, 120.0, 95.0, 60.0], [0.3, 0.2, 0.25, 0.4, 0.35]
+underlyings = {f"U{i}": UnderlyingParams(f"U{i}", spots[i], vols[i], 0.02, 0.0) for i in range(5)}
+weights = np.array([0.1, 0.3, 0.2, 0.25, 0.15])
+rank_weights = np.array([0.5, 0.25, 0.15, 0.1, 0.0]) # best first
+
+def bs_model(**kwargs) -> BS_Model:
+    return BS_Model(calendar=calendar, underlyings=underlyings, n_paths=2001, seed=6, **kwargs)
+
+def basket(method: str, paths, **kwargs) -> BasketModel:
+    return BasketModel(config=bs_model(), n_underlyings=5, basket_method=method, paths=paths, **kwargs)
+
+def reference(method: str, paths: np.typing.NDArray, k: int = 2) -> np.typing.NDArray:
+    # sorted basket: worst first
+    ranked = np.sort(paths, axis=-1)
+    if method == 'kth-worst':
+        return ranked[..., k - 1]
+    if method == 'kth-best':
+        return ranked[..., -k]
+    if method == 'rainbow':
+        return ranked[..., ::-1] @ rank_weights
+    return (paths / paths[:, :1]) @ weights
+
+methods = [('kth-worst', {'k': 2}), ('kth-best', {'k': 2}), ('rainbow', {'rank_weights': rank_weights}), ('performance', {'weights': weights})]
+
+@pytest.mark.parametrize("method, kwargs", methods)
+@pytest.mark.parametrize("block_elements", [2 ** 22, 97])
+def test_rank_baskets_are_the_sorted_basket(method, kwargs, block_elements):
+    paths = bs_model().apply_bs_value()
+    result = basket(method, paths, block_elements=block_elements, **kwargs).apply_basket_method()
+    np.testing.assert_allclose(result, reference(method, paths, kwargs.get('k', 2)), rtol=1e-13)
+
+@pytest.mark.parametrize("method, kwargs", methods)
+def test_streamed_baskets_are_the_materialized_basket(method, kwargs):
+    materialized = basket(method, bs_model().apply_bs_value(), **kwargs).apply_basket_method()
+    chunks = basket(method, bs_model(chunk_size=300).iter_bs_value(), **kwargs).apply_basket_method()
+    np.testing.assert_array_equal(np.concatenate(list(chunks)), materialized)
+
+def test_extreme_ranks_are_worst_and_best_of():
+    paths = bs_model().apply_bs_value()
+    np.testing.assert_array_equal(basket('kth-worst', paths, k=1).apply_basket_method(), basket('worst-of', paths).apply_basket_method())
+    np.testing.assert_array_equal(basket('kth-best', paths, k=1).apply_basket_method(), basket('best-of', paths).apply_basket_method())
+
+def test_performance_of_percentage_paths():
+    # percentage paths start at 1: the performance basket is their weighted basket
+    percentages = bs_model().apply_bs_percentage()
+    performance = basket('performance', percentages, weights=weights).apply_basket_method()
+    np.testing.assert_allclose(performance, basket('weighted', percentages, weights=weights).apply_basket_method(), rtol=1e-13)
+    uniform = basket('performance', percentages).apply_basket_method()
+    np.testing.assert_allclose(uniform, basket('uniform', percentages).apply_basket_method(), rtol=1e-13)
+
+def test_out_buffer_is_filled_in_place():
+    paths = bs_model().apply_bs_value()
+    out = np.empty(paths.shape[:-1])
+    assert basket('rainbow', paths, rank_weights=rank_weights).reduce(paths, out=out) is out
+    np.testing.assert_allclose(out, reference('rainbow', paths), rtol=1e-13)
+
+def test_invalid_baskets():
+    paths = bs_model().apply_bs_value()
+    with pytest.raises(ValueError, match="between 1"):
+        basket('kth-worst', paths, k=6)
+    with pytest.raises(ValueError, match="rank_weights"):
+        basket('rainbow', paths)
+    with pytest.raises(ValueError, match="one value per underlying"):
+        basket('weighted', paths, weights=np.ones(4))
+    with pytest.raises(ValueError, match="dates axis"):
+        basket('performance', paths[:, -1]).apply_basket_method()
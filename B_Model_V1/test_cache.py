@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from B_Model_V1.base import PathBlock
+from B_Model_V1.cache import ShockCache, shock_cache
+
+def block(value: float) -> np.typing.NDArray:
+    return np.full(100, value) # 800 bytes
+
+@pytest.fixture
+def process_cache():
+    shock_cache.clear()
+    yield shock_cache
+    shock_cache.clear()
+
+def test_least_recently_used_block_is_evicted():
+    cache = ShockCache(max_bytes=2 * 800)
+    cache.put("a", block(1.0))
+    cache.put("b", block(2.0))
+    assert cache.get("a") is not None # "b" is now the least recently used
+
+    cache.put("c", block(3.0))
+    assert list(cache.blocks) == ["a", "c"]
+    assert cache.get("b") is None
+    assert cache.report() == {"hits": 1, "misses": 1, "evictions": 1, "blocks": 2, "bytes": 1600}
+
+def test_budget():
+    cache = ShockCache(max_bytes=700)
+    large = cache.put("large", block(1.0))
+    assert not large.flags.writeable
+    assert "large" not in cache.blocks # above the whole budget: returned, never stored
+
+    cache.set_budget(2000)
+    cache.put("a", block(1.0))
+    cache.put("b", block(2.0))
+    cache.set_budget(800)
+    assert list(cache.blocks) == ["b"]
+    with pytest.raises(ValueError):
+        cache.set_budget(-1)
+
+def test_same_scenario_gets_the_identical_array(process_cache):
+    first = PathBlock(n_sim=500, n_steps=10, d=2, seed=3, antithetic=True, cache=True).array
+    second = PathBlock(n_sim=500, n_steps=10, d=2, seed=3, antithetic=True, cache=True).array
+    assert second is first
+    assert not first.flags.writeable
+    assert process_cache.report()["hits"] == 1
+
+    np.testing.assert_array_equal(PathBlock(n_sim=500, n_steps=10, d=2, seed=3, antithetic=True).array, first)
+    assert PathBlock(n_sim=500, n_steps=10, d=2, seed=4, antithetic=True, cache=True).array is not first
+    assert PathBlock(n_sim=500, n_steps=10, d=2, seed=3, antithetic=True, dtype='float32', cache=True).array is not first
+
+def test_opt_in_and_seeded_only(process_cache):
+    PathBlock(n_sim=500, n_steps=10, d=2, seed=3)
+    PathBlock(n_sim=500, n_steps=10, d=2, cache=True) # fresh entropy: never reused
+    assert len(process_cache.blocks) == 0
@@ -0,0 +1,107 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from B_Model_V1.correlation import CorrelationModel, nearest_correlation, cholesky_factor, factor_loadings, _cached_cholesky
+
+def off_diagonal(matrix: np.ndarray) -> np.ndarray:
+    return matrix[~np.eye(matrix.shape[0], dtype=bool)]
+
+def equicorrelation(d: int, rho: float) -> np.ndarray:
+    matrix = np.full((d, d), rho)
+    np.fill_diagonal(matrix, 1.0)
+    return matrix
+
+class TestRepair:
+    # Higham (2002), section 4: nearest correlation matrix of an indefinite unit diagonal matrix
+    broken = np.array([[1.0, 1.0, 0.0], [1.0, 1.0, 1.0], [0.0, 1.0, 1.0]])
+
+    def test_higham_example(self):
+        repaired = nearest_correlation(self.broken)
+        expected = np.array([[1.0, 0.7607, 0.1573], [0.7607, 1.0, 0.7607], [0.1573, 0.7607, 1.0]])
+        np.testing.assert_allclose(repaired, expected, atol=1e-3)
+
+    def test_repaired_matrix_is_a_correlation_matrix(self):
+        repaired = nearest_correlation(self.broken)
+        np.testing.assert_array_equal(repaired, repaired.T)
+        np.testing.assert_allclose(np.diag(repaired), 1.0, atol=1e-12)
+        assert np.linalg.eigvalsh(repaired).min() > 0.0
+        np.linalg.cholesky(repaired)
+
+    def test_valid_matrix_is_kept(self):
+        valid = equicorrelation(4, 0.3)
+        np.testing.assert_allclose(nearest_correlation(valid), valid, atol=1e-9)
+
+    def test_cholesky_repairs_and_is_shared(self):
+        _cached_cholesky.cache_clear()
+        with pytest.warns(RuntimeWarning, match="repaired"):
+            factor = cholesky_factor(self.broken)
+        np.testing.assert_allclose(factor @ factor.T, nearest_correlation(self.broken), atol=1e-12)
+        assert cholesky_factor(self.broken.copy()) is factor
+        assert not factor.flags.writeable
+
+class TestFactorLoadings:
+    def test_equicorrelation_is_fitted_exactly(self):
+        # one factor explains it: B = sqrt(rho), a truncated eigendecomposition gives 0.625 for rho = 0.5
+        loadings, idiosyncratic = factor_loadings(equicorrelation(5, 0.5), 1)
+        np.testing.assert_allclose(np.abs(loadings), np.sqrt(0.5), atol=1e-8)
+        np.testing.assert_allclose(idiosyncratic, 0.5, atol=1e-8)
+
+    def test_factor_structure_is_recovered(self):
+        B = np.random.default_rng(3).uniform(-0.6, 0.6, (40, 3))
+        matrix = B @ B.T
+        np.fill_diagonal(matrix, 1.0)
+
+        loadings, idiosyncratic = factor_loadings(matrix, 3)
+        np.testing.assert_allclose(off_diagonal(loadings @ loadings.T), off_diagonal(matrix), atol=1e-8)
+        np.testing.assert_allclose((loadings ** 2).sum(axis=1) + idiosyncratic, 1.0)
+
+    def test_too_few_factors_warn(self):
+        matrix = np.corrcoef(np.random.default_rng(4).standard_normal((8, 12)))
+        with pytest.warns(UserWarning, match="increase the rank"):
+            factor_loadings(matrix, 1)
+
+    def test_heywood_rows_are_kept_within_the_unit_variance(self):
+        # the first variable is almost a common factor of the others: its communality would exceed 1
+        matrix = np.array([[1.0, 0.95, 0.9], [0.95, 1.0, 0.7], [0.9, 0.7, 1.0]])
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            loadings, idiosyncratic = factor_loadings(matrix, 1)
+        assert np.all((loadings ** 2).sum(axis=1) <= 1.0 + 1e-12)
+        assert np.all(idiosyncratic >= -1e-12)
+
+class TestCorrelationModel:
+    matrix = np.array([[1.0, 0.8, -0.2], [0.8, 1.0, 0.1], [-0.2, 0.1, 1.0]])
+
+    @pytest.mark.parametrize("arguments", [dict(), dict(rank=2)])
+    def test_shocks_have_the_effective_correlation(self, arguments):
+        model = CorrelationModel(matrix=self.matrix, **arguments)
+        Z = np.random.default_rng(5).standard_normal((200_000, 1, model.n_shocks))
+        shocks = model.apply(Z)[:, 0]
+
+        assert shocks.shape == (200_000, 3)
+        np.testing.assert_allclose(np.corrcoef(shocks, rowvar=False), model.effective_matrix, atol=1e-2)
+        np.testing.assert_allclose(np.diag(model.effective_matrix), 1.0)
+
+    def test_factor_mode_draws_d_plus_k_shocks(self):
+        assert CorrelationModel(matrix=self.matrix).n_shocks == 3
+        with pytest.warns(UserWarning):
+            assert CorrelationModel(matrix=self.matrix, rank=1).n_shocks == 4
+        assert CorrelationModel(loadings=np.full((3, 2), 0.5)).n_shocks == 5
+
+    @pytest.mark.parametrize("arguments", [
+        dict(matrix=np.array([[1.0, 0.5], [0.4, 1.0]])),
+        dict(matrix=np.array([[2.0, 0.5], [0.5, 1.0]])),
+        dict(matrix=np.array([[1.0, 1.5], [1.5, 1.0]])),
+        dict(matrix=np.eye(3), rank=3),
+        dict(loadings=np.full((2, 2), 0.8)),
+        dict(),
+    ])
+    def test_invalid_inputs(self, arguments):
+        with pytest.raises(ValueError):
+            CorrelationModel(**arguments)
+
+    def test_wrong_number_of_shocks(self):
+        with pytest.raises(ValueError, match="Expected 3 shocks"):
+            CorrelationModel(matrix=self.matrix).apply(np.zeros((2, 1, 4)))
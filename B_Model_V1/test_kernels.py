@@ -0,0 +1,99 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+import C_Vanilla_V1.Pipeline as pipeline_module
+from B_Model_V1.kernels import fused_payoffs
+from B_Model_V1.bs_model import BS_Model, UnderlyingParams
+from B_Model_V1.timegrid import Calendar
+from C_Vanilla_V1.Barrier import Barrier_Feature
+from C_Vanilla_V1.Model import Vanilla_Model, Vanilla_Barrier_Model
+from C_Vanilla_V1.Option import Option_Call, Option_Put, Digital_Call
+from C_Vanilla_V1.Pipeline import Pricing_Pipeline
+
+start, middle, end = date(2025, 1, 1), date(2025, 7, 2), date(2026, 1, 1)
+calendar = Calendar(start_date=start, end_date=end, n_steps=52)
+underlyings = {"A": UnderlyingParams("A", 100.0, 0.2, 0.03, 0.0), "B": UnderlyingParams("B", 90.0, 0.3, 0.02, 0.01)}
+observations = [date(2025, 4, 1), date(2025, 10, 1), date(2025, 12, 1)]
+# float32 levels carry ~7 digits, the sums of the two backends may round apart on a handful of paths
+tolerances = {'float64': 1e-12, 'float32': 1e-5}
+
+@pytest.fixture(params=['python', 'numba'])
+def kernel(request, monkeypatch):
+    # 'python': the loop of fused_payoffs as plain Python (numba or not), 'numba': the compiled kernel
+    if request.param == 'numba':
+        pytest.importorskip("numba")
+    else:
+        monkeypatch.setattr(pipeline_module, "backend_available", lambda backend: True)
+        monkeypatch.setattr(pipeline_module, "fused_kernel", lambda parallel=False: fused_payoffs)
+    return request.param
+
+def model(dtype: str, correlation=None) -> BS_Model:
+    return BS_Model(calendar=calendar, underlyings=underlyings, n_paths=2000, seed=7, dtype=dtype, correlation=correlation, kernel_backend='numba') #type: ignore
+
+def basket_paths(pipeline: Pricing_Pipeline) -> tuple:
+    # the basket paths of the NumPy stages, materialized, and their calendar config
+    plan = pipeline.plan()
+    return pipeline.model.on_calendar(plan["calendar"]), np.concatenate(list(pipeline.reduced_paths(plan))), list(plan["strikes_dates"])
+
+def assert_prices(result: dict, reference: dict, dtype: str):
+    for strike_date, row in reference.items():
+        assert result[strike_date]["price"] == pytest.approx(row["price"], rel=tolerances[dtype], abs=tolerances[dtype])
+        assert result[strike_date]["std"] == pytest.approx(row["std"], rel=tolerances[dtype], abs=tolerances[dtype])
+
+@pytest.mark.parametrize("dtype", ['float64', 'float32'])
+@pytest.mark.parametrize("basket_method", ['uniform', 'worst-of', 'best-of'])
+@pytest.mark.parametrize("option", [
+    Option_Call(start, end, 'EU', 95.0, 'absolute', [], 'uniform', rebate=1.0, levier=1.5),
+    Option_Put(start, end, 'EU', 1.0, 'relative', [], 'uniform', rebate=0.5),
+    Digital_Call(start, end, 'EU', 95.0, 'absolute', [], 'uniform', payout=10.0, rebate=1.0),
+])
+def test_kernel_matches_vanilla_model(kernel, dtype, basket_method, option):
+    pipeline = Pricing_Pipeline(model(dtype, np.array([[1.0, 0.5], [0.5, 1.0]]))).simulate('value').basket(basket_method).payoff(option, [middle, end])
+    assert pipeline.kernel_allowed(pipeline.plan())
+
+    config, paths, strikes_dates = basket_paths(pipeline)
+    reference = Vanilla_Model(option, config, paths, strikes_dates, analytic=False).price(90.0)
+    assert_prices(pipeline.price(90.0), reference, dtype)
+
+@pytest.mark.parametrize("dtype", ['float64', 'float32'])
+@pytest.mark.parametrize("mecanism, level", [('U&I', 110.0), ('D&O', 85.0)])
+@pytest.mark.parametrize("barrier_method", ['Best', 'Worst', 'Above_Mean'])
+@pytest.mark.parametrize("rebate_if_not_activated", [True, False])
+def test_kernel_matches_vanilla_barrier_model(kernel, dtype, mecanism, level, barrier_method, rebate_if_not_activated):
+    option = Option_Call(start, end, 'EU', 95.0, 'absolute', [], 'uniform', rebate=1.0)
+    barrier = Barrier_Feature(start, end, mecanism, 'EU', level, 90.0, 'absolute', observations, calendar)
+    pipeline = Pricing_Pipeline(model(dtype)).simulate('value').basket('uniform').barrier(barrier, barrier_method, rebate_if_not_activated).payoff(option, [middle, end])
+    assert pipeline.kernel_allowed(pipeline.plan())
+
+    config, paths, strikes_dates = basket_paths(pipeline)
+    reference = Vanilla_Barrier_Model(option, barrier, config, paths, strikes_dates, barrier_method, rebate_if_not_activated, analytic=False).price(90.0)
+    assert_prices(pipeline.price(90.0), reference, dtype)
+
+def test_kernel_rounds_in_the_path_dtype():
+    # one float32 path, rounded to 6 decimals: the kernel and np.round must agree to the bit
+    levels = np.array([[[np.log(np.float32(101.234567))]]], dtype=np.float32) # (n, m - 1, d) shocks, vol 1, no drift
+    baskets = np.empty((1, 2), dtype=np.float32)
+    fused_payoffs(
+        levels, np.ones(1, dtype=np.float32), np.zeros((1, 1), dtype=np.float32), np.zeros(1, dtype=np.float32), np.float32(1e6), 0,
+        np.zeros(2, dtype=np.bool_), 0.0, True, True, -1,
+        np.array([1]), 0, np.float32(0.0), np.float32(1.0), np.float32(0.0), np.float32(0.0), True,
+        np.empty((1, 1), dtype=np.float32), baskets, np.empty((1, 1)),
+    )
+    expected = np.round(np.exp(levels[:, 0, 0]), 6)
+    assert baskets[0, 1] == expected[0]
+    assert baskets.dtype == np.float32
+
+@pytest.mark.parametrize("dtype", ['float64', 'float32'])
+def test_parallel_kernel_is_the_serial_kernel(dtype):
+    # paths are independent: the threads write their own rows, the sums are taken after the kernel
+    pytest.importorskip("numba")
+    option = Option_Put(start, end, 'EU', 100.0, 'absolute', [], 'worst-of', rebate=0.5)
+    prices = []
+    for parallel in [False, True]:
+        config = model(dtype, np.array([[1.0, 0.5], [0.5, 1.0]]))
+        config.kernel_parallel = parallel
+        prices.append(Pricing_Pipeline(config).simulate('value').basket('worst-of').payoff(option, [middle, end]).price())
+    for strike_date in prices[0]:
+        assert prices[1][strike_date]["price"] == prices[0][strike_date]["price"]
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from B_Model_V1.base import PathBlock
+
+def block(**kwargs) -> PathBlock:
+    arguments = dict(n_sim=1000, n_steps=5, d=2, seed=21, antithetic=True, stream_size=256)
+    arguments.update(kwargs)
+    return PathBlock(**arguments) #type: ignore
+
+def test_antithetic_pairs_are_formed_inside_each_stream_block():
+    shocks = block().array
+    for lo in range(0, 1000, 256):
+        part = shocks[lo:lo + 256]
+        half = part.shape[0] // 2
+        np.testing.assert_array_equal(part[half:2 * half], -part[:half])
+
+def test_odd_block_keeps_an_unpaired_path():
+    # last block of 1001 - 3 * 256 = 233 paths: 116 pairs and one independent path
+    last = block(n_sim=1001).array[768:]
+    np.testing.assert_array_equal(last[116:232], -last[:116])
+    assert not np.allclose(last[232], -last[115])
+    assert np.abs(last[232, 1:]).min() > 0.0
+
+def test_start_date_row_is_zero():
+    assert not block().array[:, 0].any()
+
+def test_paths_do_not_depend_on_the_number_of_paths():
+    # each block has its own stream: more paths append blocks, the complete ones are unchanged
+    # (the last, partial block pairs its own halves)
+    np.testing.assert_array_equal(block(n_sim=2000).array[:768], block().array[:768])
+
+@pytest.mark.parametrize("start, size", [(0, 1000), (100, 300), (255, 2), (511, 489)])
+def test_fill_at_any_offset_is_a_slice_of_the_block(start, size):
+    streamed = block(chunk_size=64)
+    out = streamed.fill(np.empty((size, 5, 2)), start=start)
+    np.testing.assert_array_equal(out, block().array[start:start + size])
+
+def test_streams_are_reproducible_and_distinct():
+    np.testing.assert_array_equal(block().array, block(rng=np.random.default_rng(21)).array)
+    assert not np.array_equal(block().array, block(seed=22).array)
+    assert not np.array_equal(block().array, block(bit_generator='Philox').array)
+
+def test_blocks_are_independent_streams():
+    # same seed, different spawn keys: the first paths of two blocks are uncorrelated draws
+    shocks = block(n_sim=4096, antithetic=False, stream_size=2048, n_steps=2, d=1).array[:, 1, 0]
+    first, second = shocks[:2048], shocks[2048:]
+    assert abs(np.corrcoef(first, second)[0, 1]) < 4 / np.sqrt(2048)
+    assert not np.array_equal(first, second)
+
+def test_rng_without_seed_sequence_is_refused():
+    # no seed sequence to spawn the block streams from: the ValueError, not an AttributeError
+    with pytest.raises(ValueError, match="SeedSequence"):
+        block(rng=object())
+    with pytest.raises(ValueError, match="SeedSequence"):
+        block(rng=np.random.PCG64.__new__(np.random.PCG64))
@@ -0,0 +1,54 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from B_Model_V1.bs_model import BS_Model, UnderlyingParams
+from B_Model_V1.path_statistics import PathStatistics
+from B_Model_V1.timegrid import Calendar
+
+calendar = Calendar(start_date=date(2024, 1, 1), end_date=date(2025, 1, 1), n_steps=50, trading_days=365.0)
+underlyings = {"A": UnderlyingParams("A", 100.0, 0.3, 0.02, 0.0), "B": UnderlyingParams("B", 80.0, 0.2, 0.02, 0.01)}
+
+def bs_model(**kwargs) -> BS_Model:
+    return BS_Model(calendar=calendar, underlyings=underlyings, correlation=np.array([[1.0, 0.5], [0.5, 1.0]]), n_paths=3001, seed=4, **kwargs)
+
+def first_hit(levels: np.typing.NDArray, barrier: float, offset: int = 0) -> np.typing.NDArray:
+    # first grid index at or above the barrier, -1 when never hit
+    hit = levels >= barrier
+    return np.where(hit.any(axis=1), hit.argmax(axis=1) + offset, -1)
+
+@pytest.mark.parametrize("chunk_size", [None, 400, 3001])
+def test_statistics_are_the_materialized_paths(chunk_size):
+    paths = bs_model().apply_bs_value()[:, 1:]
+    statistics = bs_model().path_statistics(['max', 'min', 'mean', 'last', 'first_hit'], levels=[110.0, 130.0], chunk_size=chunk_size)
+
+    np.testing.assert_array_equal(statistics['max'], paths.max(axis=1))
+    np.testing.assert_array_equal(statistics['min'], paths.min(axis=1))
+    np.testing.assert_array_equal(statistics['last'], paths[:, -1])
+    np.testing.assert_allclose(statistics['mean'], paths.mean(axis=1), rtol=1e-12)
+    for j, level in enumerate([110.0, 130.0]):
+        np.testing.assert_array_equal(statistics['first_hit'][..., j], first_hit(paths, level, offset=1))
+
+def test_basket_on_observed_dates():
+    observed = calendar.get_dates[10::10]
+    columns = calendar.index_of(observed)
+    worst = bs_model().apply_bs_percentage()[:, columns].min(axis=-1)
+    statistics = bs_model(chunk_size=700).path_statistics(['min', 'first_hit'], dates=observed, levels=[0.9], direction='down', basket_method='worst-of', percentage=True)
+
+    np.testing.assert_array_equal(statistics['min'], worst.min(axis=1))
+    hit = worst <= 0.9
+    np.testing.assert_array_equal(statistics['first_hit'][:, 0], np.where(hit.any(axis=1), columns[hit.argmax(axis=1)], -1))
+
+def test_default_statistics_are_max_and_min():
+    chunks = list(bs_model().iter_path_statistics(chunk_size=1000))
+    assert [sorted(chunk) for chunk in chunks] == [['max', 'min']] * 4
+    assert sorted(bs_model().path_statistics()) == ['max', 'min']
+
+def test_invalid_statistics():
+    with pytest.raises(ValueError, match="Invalid statistic"):
+        PathStatistics(statistics=['median'])
+    with pytest.raises(ValueError, match="levels"):
+        PathStatistics(statistics=['first_hit'])
+    with pytest.raises(ValueError, match="No date"):
+        PathStatistics(statistics=['max']).result()
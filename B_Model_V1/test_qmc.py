@@ -0,0 +1,91 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from B_Model_V1.qmc import SobolBlock, brownian_bridge_order
+from B_Model_V1.accumulator import RunningStats, ReplicatedStats
+
+# uneven steps, dt[0] is the start date row
+dt = np.array([0.0, 0.1, 0.3, 0.05, 0.2, 0.15, 0.2])
+times = np.concatenate(([0.0], np.cumsum(dt[1:])))
+
+def sobol(**kwargs) -> SobolBlock:
+    arguments = dict(n_sim=1024, n_steps=len(dt), d=2, dt=dt, seed=5, replications=4)
+    arguments.update(kwargs)
+    return SobolBlock(**arguments) #type: ignore
+
+def test_bridge_plan_builds_every_date_once_after_its_neighbours():
+    plan = brownian_bridge_order(times)
+    assert sorted(step[0] for step in plan) == list(range(1, len(times)))
+
+    built = {0}
+    for index, left, right, _, _, _ in plan:
+        assert left in built and (right < 0 or right in built)
+        built.add(index)
+
+def test_bridge_has_the_brownian_covariance():
+    # the bridge is linear in the normals: feeding the unit vectors gives W = L z, and L L^T must be min(t_i, t_j)
+    block = sobol(d=1)
+    increments = block._bridge(np.eye(len(dt) - 1), np.empty((len(dt) - 1, len(dt), 1)))[..., 0]
+    L = np.cumsum(increments * np.sqrt(dt), axis=1).T
+
+    np.testing.assert_allclose(L @ L.T, np.minimum.outer(times, times), atol=1e-14)
+
+def test_chunks_are_the_materialized_points():
+    materialized = sobol().array
+    for start, size in [(0, 1024), (100, 300), (255, 2), (700, 324)]:
+        out = sobol(chunk_size=64).fill(np.empty((size, len(dt), 2)), start=start)
+        np.testing.assert_array_equal(out, materialized[start:start + size])
+
+def test_replications_are_distinct_scramblings_of_a_seeded_set():
+    shocks = sobol().array
+    np.testing.assert_array_equal(shocks, sobol().array)
+    assert not np.array_equal(shocks[:256], shocks[256:512])
+    assert not np.array_equal(shocks, sobol(seed=6).array)
+
+def test_shocks_are_standard_normal_increments():
+    # a scrambled Sobol set integrates the first moments almost exactly
+    shocks = sobol(n_sim=4096).array[:, 1:]
+    assert not sobol().array[:, 0].any()
+    np.testing.assert_allclose(shocks.mean(axis=0), 0.0, atol=2e-2)
+    np.testing.assert_allclose(shocks.var(axis=0), 1.0, atol=5e-2)
+
+def test_invalid_replications():
+    with pytest.raises(ValueError):
+        sobol(replications=1)
+    with pytest.raises(ValueError):
+        sobol(n_sim=1000, replications=3)
+    with pytest.warns(UserWarning, match="powers of 2"):
+        sobol(n_sim=300, replications=3)
+
+def test_power_of_two_replications_do_not_warn():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        sobol()
+
+class TestReplicatedStats:
+    sample = np.random.default_rng(8).standard_normal((1000, 2)) + np.linspace(0.0, 1.0, 1000)[:, None]
+
+    def test_error_comes_from_the_block_means(self):
+        stats = ReplicatedStats(block_size=250)
+        for lo in range(0, 1000, 300): # chunks cut across the blocks
+            stats.update(self.sample[lo:lo + 300], start=lo)
+
+        means = self.sample.reshape(4, 250, 2).mean(axis=1)
+        np.testing.assert_allclose(stats.std_error, means.std(axis=0, ddof=1) / 2.0, rtol=1e-12)
+        np.testing.assert_allclose(stats.mean, self.sample.mean(axis=0), rtol=1e-12)
+        np.testing.assert_allclose(stats.std, RunningStats().update(self.sample).std, rtol=1e-12)
+
+    def test_workers_merge_to_the_single_pass(self):
+        single = ReplicatedStats(block_size=250).update(self.sample)
+        left = ReplicatedStats(block_size=250).update(self.sample[:600])
+        right = ReplicatedStats(block_size=250).update(self.sample[600:], start=600)
+
+        merged = right.merge(left)
+        np.testing.assert_allclose(merged.std_error, single.std_error, rtol=1e-12)
+        np.testing.assert_allclose(merged.total.m2, single.total.m2, rtol=1e-12)
+
+    def test_one_block_has_no_error_estimate(self):
+        with pytest.raises(ValueError):
+            ReplicatedStats(block_size=2000).update(self.sample).std_error
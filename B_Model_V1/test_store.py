@@ -0,0 +1,64 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from B_Model_V1.bs_model import BS_Model, UnderlyingParams
+from B_Model_V1.store import PathStore
+from B_Model_V1.timegrid import Calendar
+from C_Vanilla_V1.Model import Vanilla_Model
+from C_Vanilla_V1.Option import Option_Call
+
+start, end = date(2024, 1, 1), date(2025, 1, 1)
+calendar = Calendar(start_date=start, end_date=end, n_steps=24, trading_days=365.0)
+underlyings = {"A": UnderlyingParams("A", 100.0, 0.25, 0.03, 0.0), "B": UnderlyingParams("B", 50.0, 0.35, 0.03, 0.02)}
+
+def bs_model(**kwargs) -> BS_Model:
+    return BS_Model(calendar=calendar, underlyings=underlyings, correlation=np.array([[1.0, -0.2], [-0.2, 1.0]]), n_paths=3001, seed=5, stream_size=1000, **kwargs)
+
+@pytest.mark.parametrize("kind, reference", [
+    ('value', lambda model: model.apply_bs_value()),
+    ('percentage', lambda model: model.apply_bs_percentage()),
+    ('shocks', lambda model: model.Paths.array),
+])
+def test_written_paths_are_read_back(tmp_path, kind, reference):
+    store = PathStore(tmp_path / "paths")
+    stored = store.write(bs_model(), kind, chunk_size=700)
+    assert isinstance(stored, np.memmap)
+    np.testing.assert_array_equal(stored, reference(bs_model()))
+    np.testing.assert_array_equal(np.concatenate(list(store.iter_chunks(1000, start=500))), stored[500:])
+
+def test_config_is_the_model_config(tmp_path):
+    model = bs_model(dtype='float32', rounding=4, bit_generator='Philox')
+    store = PathStore(tmp_path / "paths")
+    store.write(model)
+
+    config = PathStore(tmp_path / "paths.npy").config(chunk_size=512) # a new store reads the .json header
+    for name in ['n_paths', 'seed', 'antithetic', 'dtype', 'rounding', 'bit_generator', 'stream_size', 'generator', 'replications']:
+        assert getattr(config, name) == getattr(model, name)
+    assert config.chunk_size == 512
+    assert config.calendar.get_dates == calendar.get_dates
+    np.testing.assert_array_equal(config.calendar.get_time_dt, calendar.get_time_dt)
+
+def test_price_on_the_memory_map(tmp_path):
+    model = bs_model()
+    call = Option_Call(start, end, 'EU', 1.0, 'relative', [], 'uniform')
+    basket = model.apply_bs_percentage().mean(axis=-1)
+    reference = Vanilla_Model(call, model, basket, [end], analytic=False).price()[end]
+
+    store = PathStore(tmp_path / "basket")
+    stored = store.write_array(basket, model)
+    streamed = Vanilla_Model(call, store.config(chunk_size=400), stored, [end], analytic=False).price()[end]
+    assert streamed["price"] == pytest.approx(reference["price"], rel=1e-12)
+    assert store.metadata["kind"] == 'basket'
+
+def test_missing_or_mismatched_files(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        PathStore(tmp_path / "missing").read()
+    store = PathStore(tmp_path / "paths")
+    store.write_array(np.zeros((3001, 25)), bs_model())
+    np.save(store.path, np.zeros((10, 25)))
+    with pytest.raises(ValueError, match="metadata"):
+        store.read()
+    with pytest.raises(ValueError):
+        store.write_array(np.zeros((10, 25)), bs_model())
@@ -0,0 +1,68 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+from scipy.stats import ks_2samp
+
+from B_Model_V1.bs_model import BS_Model, UnderlyingParams
+from B_Model_V1.timegrid import Calendar
+
+start, end = date(2024, 1, 1), date(2025, 1, 1)
+calendar = Calendar(start_date=start, end_date=end, n_steps=52, trading_days=365.0)
+
+def nearest(dates: list[date], target: date) -> int:
+    # first minimum: the earlier date wins a tie
+    gaps = [abs((d - target).days) for d in dates]
+    return gaps.index(min(gaps))
+
+def test_index_of_grid_dates():
+    dates = calendar.get_dates
+    np.testing.assert_array_equal(calendar.index_of(dates), np.arange(len(dates)))
+    np.testing.assert_array_equal(calendar.index_of([dates[40], dates[3], dates[40]]), [40, 3, 40])
+    assert int(calendar.index_of(dates[7])) == 7
+
+def test_index_of_dates_off_the_grid():
+    with pytest.raises(ValueError, match="not on the calendar grid"):
+        calendar.index_of([calendar.get_dates[1], calendar.get_dates[1] + timedelta(days=1)])
+    with pytest.raises(ValueError, match="not on the calendar grid"):
+        calendar.index_of(end + timedelta(days=30))
+
+def test_nearest_indices_are_the_brute_force_nearest():
+    dates = calendar.get_dates
+    targets = [start - timedelta(days=10) + timedelta(days=k) for k in range(0, 400, 3)]
+    np.testing.assert_array_equal(calendar.nearest_indices(targets), [nearest(dates, t) for t in targets])
+    assert calendar.nearest_dates(targets) == [dates[nearest(dates, t)] for t in targets]
+
+def test_ties_go_to_the_earlier_date():
+    grid = Calendar(start_date=start, end_date=date(2024, 1, 9), dates=[date(2024, 1, 3), date(2024, 1, 7)])
+    np.testing.assert_array_equal(grid.nearest_indices([date(2024, 1, 2), date(2024, 1, 5), date(2024, 1, 9)]), [0, 1, 2])
+    assert grid.get_nearest_time_index(date(2024, 1, 5)) == date(2024, 1, 3)
+
+def test_index_follows_a_changed_grid():
+    grid = Calendar(start_date=start, end_date=end, dates=[date(2024, 6, 1)])
+    grid.dates = [start, date(2024, 3, 1), date(2024, 6, 1)]
+    assert int(grid.index_of(date(2024, 6, 1))) == 2
+    np.testing.assert_allclose(grid.get_time_dt[1:], [60 / 365, 92 / 365])
+
+class TestSparse:
+    # a sparse grid keeps the exact dt between the dates it keeps: same law at those dates, fewer steps
+    observed = [calendar.get_dates[13], calendar.get_dates[26], end]
+    full = BS_Model(calendar=calendar, underlyings={"A": UnderlyingParams("A", 100.0, 0.3, 0.04, 0.01)}, n_paths=40_000, seed=1)
+    sparse = full.sparse(observed)
+
+    def test_grid_keeps_the_start_and_the_observed_dates(self):
+        assert self.sparse.calendar.get_dates == [start] + self.observed
+        times = np.cumsum(calendar.get_time_dt)[calendar.index_of(self.observed)]
+        np.testing.assert_allclose(np.cumsum(self.sparse.calendar.get_time_dt)[1:], times, rtol=1e-14)
+
+    def test_distribution_at_the_observed_dates(self):
+        full = self.full.apply_bs_value()[:, calendar.index_of(self.observed), 0]
+        sparse = self.sparse.apply_bs_value()[:, 1:, 0]
+        assert sparse.shape == full.shape
+        for k in range(len(self.observed)):
+            assert ks_2samp(full[:, k], sparse[:, k]).pvalue > 1e-3
+            assert sparse[:, k].mean() == pytest.approx(full[:, k].mean(), abs=4 * np.hypot(full[:, k].std(), sparse[:, k].std()) / np.sqrt(40_000))
+
+        # increments stay independent: the correlation of the log levels is sqrt(t_i / t_j) on both grids
+        log_full, log_sparse = np.log(full), np.log(sparse)
+        np.testing.assert_allclose(np.corrcoef(log_sparse, rowvar=False), np.corrcoef(log_full, rowvar=False), atol=2e-2)
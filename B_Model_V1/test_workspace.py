@@ -0,0 +1,53 @@
+from dataclasses import replace
+from datetime import date
+
+import numpy as np
+
+from B_Model_V1.bs_model import BS_Model, UnderlyingParams
+from B_Model_V1.timegrid import Calendar
+from B_Model_V1.workspace import Workspace
+
+calendar = Calendar(start_date=date(2024, 1, 1), end_date=date(2025, 1, 1), n_steps=20, trading_days=365.0)
+
+def bs_model(spot: float = 100.0, **kwargs) -> BS_Model:
+    return BS_Model(calendar=calendar, underlyings={"A": UnderlyingParams("A", spot, 0.2, 0.02, 0.0)}, n_paths=1000, seed=6, **kwargs)
+
+def test_smaller_requests_are_views_of_the_buffer():
+    workspace = Workspace()
+    first = workspace.get("x", (10, 4))
+    smaller = workspace.get("x", (3, 5))
+    assert np.shares_memory(first, smaller) and smaller.shape == (3, 5)
+
+    larger = workspace.get("x", (20, 4))
+    assert not np.shares_memory(first, larger)
+    assert not np.shares_memory(larger, workspace.get("x", (20, 4), 'float32'))
+    assert workspace.report() == {"allocations": 3, "reuses": 1, "bytes": 20 * 4 * 4}
+
+def test_paths_are_the_paths_without_workspace():
+    reference = bs_model().apply_bs_value()
+    np.testing.assert_array_equal(bs_model(workspace=Workspace()).apply_bs_value(), reference)
+
+    streamed = bs_model(workspace=Workspace(), chunk_size=300)
+    for lo, chunk in zip(range(0, 1000, 300), streamed.iter_bs_value()):
+        np.testing.assert_array_equal(chunk, reference[lo:lo + 300])
+
+def test_returned_paths_are_overwritten_by_the_next_call():
+    # documented aliasing: copy the paths to keep them across calls on the same workspace
+    workspace = Workspace()
+    model = bs_model(workspace=workspace)
+    paths = model.apply_bs_value()
+    kept = paths.copy()
+
+    bumped = replace(model, underlyings={"A": UnderlyingParams("A", 110.0, 0.2, 0.02, 0.0)})
+    repriced = bumped.apply_bs_value()
+    assert np.shares_memory(paths, repriced)
+    np.testing.assert_array_equal(paths, repriced)
+    np.testing.assert_allclose(paths / kept, 1.1, rtol=1e-5)
+
+def test_chunks_share_one_buffer():
+    chunks = bs_model(workspace=Workspace(), chunk_size=250).iter_bs_value()
+    first = next(chunks)
+    kept = first.copy()
+    second = next(chunks)
+    assert np.shares_memory(first, second)
+    assert not np.array_equal(first, kept)
@@ -1,8 +1,8 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Union
 
 from datetime import date, timedelta
-from numpy import diff, array, insert
+from numpy import diff, array, insert, searchsorted, clip, where, asarray, int64
 from numpy.typing import NDArray
 
 @dataclass(frozen=False)
@@ -13,8 +13,13 @@ class Calendar:
     dt: Optional[float] = None
     n_steps: Optional[int] = None
     trading_days: float = 365.0
+    dates: Optional[list[date]] = None # explicit (sparse) grid, replaces dt / n_steps
 
     def __post_init__(self):
+        if self.dates is not None:
+            self._init_from_dates()
+            return
+
         if self.dt is not None and self.n_steps is not None:
             raise ValueError("Only one of 'dt' or 'n_steps' should be provided.")
         if self.dt is None and self.n_steps is None:
@@ -30,20 +35,97 @@ class Calendar:
             self.times = [i * self.dt for i in range(self.n_steps)]
         else:
             raise ValueError("One of 'dt' or 'n_steps' must be provided.")
+
+        self._build_index()
+
+    def _init_from_dates(self):
+        if self.dt is not None or self.n_steps is not None:
+            raise ValueError("'dates' cannot be combined with 'dt' or 'n_steps'.")
+
+        self.dates = sorted(set(self.dates) | {self.start_date}) #type: ignore
+        if self.dates[-1] > self.end_date:
+            raise ValueError("Calendar dates must be between start_date and end_date.")
+        if self.dates[0] < self.start_date:
+            raise ValueError("Calendar dates must be between start_date and end_date.")
+
+        self.n_steps = len(self.dates)
+        total_days = (self.end_date - self.start_date).days
+        self.times = [(d - self.start_date).days / total_days for d in self.dates]
+
+        self._build_index()
+
+    def sparse(self, dates: list[date]) -> "Calendar":
+        # sub grid made of the start date and the grid dates nearest to `dates`, dt between them is exact
+        return Calendar(
+            start_date=self.start_date,
+            end_date=self.end_date,
+            trading_days=self.trading_days,
+            dates=self.nearest_dates(dates)
+        )
+
+    def _index_key(self) -> tuple:
+        return (self.start_date, self.end_date, self.n_steps, self.trading_days, None if self.dates is None else tuple(self.dates))
+
+    def _build_index(self):
+        # dates, datetime64 array, dt array and date -> index map, built once per grid
+        if self.dates is not None:
+            tmp = self.dates
+        else:
+            tmp = [self.start_date + timedelta(days=int(t * (self.end_date - self.start_date).days)) for t in self.times]
+        self._dates: list[date] = sorted(set(tmp))
+        self._date_array: NDArray = array(self._dates, dtype='datetime64[D]')
+        self._date_index: dict[date, int] = {d: i for i, d in enumerate(self._dates)}
+
+        dt = diff(self._date_array).astype(float) / self.trading_days
+        self._time_dt: NDArray = insert(dt, 0, 0.0)
+        self._time_dt.setflags(write=False)
+
+        self._built_for = self._index_key()
+
+    def _check_index(self):
+        # the dataclass is mutable: rebuild if the grid definition changed since the last build
+        if self._built_for != self._index_key():
+            self._build_index()
         
     @property
-    def get_dates(self):
-        tmp = [self.start_date + timedelta(days=int(t * (self.end_date - self.start_date).days)) for t in self.times]
-        tmp = list(set(tmp))
-        return sorted(tmp)
+    def get_dates(self) -> list[date]:
+        self._check_index()
+        return list(self._dates)
+
+    @property
+    def date_array(self) -> NDArray:
+        self._check_index()
+        return self._date_array
 
     @property
     def get_time_dt(self) -> NDArray:
-        dt = diff(array(self.get_dates)).astype('timedelta64[D]').astype(float) / self.trading_days
-        dt = insert(dt, 0, 0.0)
-        return dt
+        self._check_index()
+        return self._time_dt
+
+    def index_of(self, dates: Union[date, list[date]]) -> NDArray:
+        # vectorized date -> column index, dates must be on the grid
+        self._check_index()
+        targets = asarray(dates, dtype='datetime64[D]')
+        indices = clip(searchsorted(self._date_array, targets), 0, len(self._dates) - 1)
+        if not (self._date_array[indices] == targets).all():
+            missing = targets[self._date_array[indices] != targets]
+            raise ValueError(f"Dates {missing.tolist()} are not on the calendar grid.")
+        return indices.astype(int64)
+
+    def nearest_indices(self, dates: Union[date, list[date]]) -> NDArray:
+        # vectorized nearest grid index, ties go to the earlier date
+        self._check_index()
+        targets = asarray(dates, dtype='datetime64[D]')
+        right = clip(searchsorted(self._date_array, targets), 0, len(self._dates) - 1)
+        left = clip(right - 1, 0, len(self._dates) - 1)
+        left_gap = abs(targets - self._date_array[left])
+        right_gap = abs(self._date_array[right] - targets)
+        return where(left_gap <= right_gap, left, right).astype(int64)
+
+    def nearest_dates(self, dates: list[date]) -> list[date]:
+        self._check_index()
+        return [self._dates[i] for i in self.nearest_indices(dates)]
     
     def get_nearest_time_index(self, D: date) -> date:
-        date_list = self.get_dates
-        nearest_date = min(date_list, key=lambda d: abs(d - D))
-        return nearest_date
\ No newline at end of file
+        self._check_index()
+        return self._dates[int(self.nearest_indices(D))]
\ No newline at end of file
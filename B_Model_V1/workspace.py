@@ -0,0 +1,48 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+@dataclass(frozen=False)
+class Workspace:
+    """
+    Named buffers reused across calls (repricing loops, chunks).
+    A buffer is reallocated only when a larger one is requested, smaller requests get a view of it.
+    An array handed out is overwritten by the next request of the same name.
+    """
+
+    buffers: dict[str, np.typing.NDArray] = field(default_factory=dict)
+    allocations: int = 0
+    reuses: int = 0
+
+    def get(self, name: str, shape: tuple[int, ...], dtype: str = 'float64') -> np.typing.NDArray:
+        dtype_ = np.dtype(dtype)
+        size = int(np.prod(shape))
+
+        buffer = self.buffers.get(name)
+        if buffer is None or buffer.dtype != dtype_ or buffer.size < size:
+            buffer = np.empty(size, dtype=dtype_)
+            self.buffers[name] = buffer
+            self.allocations += 1
+        else:
+            self.reuses += 1
+
+        return buffer[:size].reshape(shape)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buffer.nbytes for buffer in self.buffers.values())
+
+    def report(self) -> dict[str, int]:
+        return {"allocations": self.allocations, "reuses": self.reuses, "bytes": self.nbytes}
+
+    def clear(self):
+        self.buffers.clear()
+        self.allocations = 0
+        self.reuses = 0
+
+def empty(workspace: Optional[Workspace], name: str, shape: tuple[int, ...], dtype: str = 'float64') -> np.typing.NDArray:
+    # np.empty, or a reused buffer when a workspace is attached
+    if workspace is None:
+        return np.empty(shape, dtype=dtype)
+    return workspace.get(name, shape, dtype)
@@ -0,0 +1,182 @@
+from typing import Union, Literal, Optional, Iterator
+from datetime import date
+from time import perf_counter
+
+import numpy as np
+from numpy import typing, float64
+
+from C_Vanilla_V1.Option import Option_Call, Option_Put, Digital_Call, Digital_Put
+from B_Model_V1.base import SimulationConfig, BasketModel, resolve_rng, child_sequence
+from B_Model_V1.bs_model import BS_Model
+
+bridge_stream = 2 ** 32 # spawn key of the backward bridge stream, apart from the path stream blocks
+default_degree = 3
+
+class Longstaff_Schwartz:
+    """
+    Least-squares Monte Carlo for American exercise on the calendar dates after the start date.
+    Backward induction keeps only the cashflows (n_sim, n_dates) and the basket at the current date:
+    - paths given, basket (n_sim, n_steps) or underlyings (n_sim, n_steps, d), array or memory map:
+      read one date (column) at a time, the underlyings reduced with the option's basket_method
+    - paths None: the BS_Model Brownian motion is drawn at the last date and bridged backward, nothing is stored
+    The continuation value of every maturity is regressed at once on a polynomial of the basket, in the money paths only.
+    Prices follow the Monte Carlo convention (undiscounted): cashflows are carried to the maturity at the rate.
+    """
+    def __init__(self, config: SimulationConfig, option: Union[Option_Call, Option_Put, Digital_Call, Digital_Put], strikes_dates: list[date], paths: Optional[typing.NDArray] = None, path_method: Literal['value', 'percentage'] = 'value', degree: int = default_degree, rate: Optional[float] = None):
+        if len(strikes_dates) == 0:
+            raise ValueError("No strike dates provided.")
+        if degree < 1:
+            raise ValueError("degree must be a positive integer.")
+        if path_method not in ['value', 'percentage']:
+            raise ValueError("path_method must be 'value' or 'percentage'.")
+        if paths is None and not isinstance(config, BS_Model):
+            raise ValueError("Without paths, the backward bridge needs the BS_Model as config.")
+
+        self.config = config
+        self.option = option
+        self.strikes_dates = config.calendar.nearest_dates(strikes_dates)
+        self.paths = paths
+        self.path_method = path_method
+        self.degree = degree
+        self.rate = self.discount_rate() if rate is None else rate
+        self.times = np.cumsum(config.calendar.get_time_dt)
+        # one record per regression: date, in the money paths, seconds
+        self.timings: list[dict] = []
+
+    def discount_rate(self) -> float:
+        if not isinstance(self.config, BS_Model):
+            raise ValueError("The discount rate is read on a BS_Model, provide rate otherwise.")
+        rates = {params.rate for params in self.config.underlyings.values()}
+        if len(rates) != 1:
+            raise ValueError("Underlyings with different rates, provide the discount rate.")
+        return rates.pop()
+
+    def exercise_value(self, basket: typing.NDArray, spot: float) -> tuple[typing.NDArray[float64], typing.NDArray[np.bool_]]:
+        # intrinsic value and in the money flag, same strike / rebate / payout rules as Vanilla_Model.payoff
+        scale = spot if self.option.value_method == 'relative' else 1.0
+        K, rebate = self.option.strike_price * scale, self.option.rebate * scale
+
+        itm = basket > K if isinstance(self.option, (Option_Call, Digital_Call)) else basket < K
+        if isinstance(self.option, Option_Call):
+            value = basket - K
+            value *= self.option.levier
+        elif isinstance(self.option, Option_Put):
+            value = K - basket
+            value *= self.option.levier
+        else:
+            value = np.full(basket.shape, self.option.payout * scale)
+        np.copyto(value, rebate, where=~itm)
+        return value, itm
+
+    def slices(self, last: int) -> Iterator[tuple[int, typing.NDArray[float64]]]:
+        # (grid index, basket (n_sim,)) from the last index down to the start date
+        if self.paths is None:
+            yield from self.bridge_slices(last)
+            return
+
+        if self.paths.ndim == 2:
+            for i in range(last, -1, -1):
+                yield i, np.asarray(self.paths[:, i], dtype=float64)
+            return
+
+        # a memory map is never loaded whole: one date of the underlyings, the first date too for the performance basket
+        basket = BasketModel(config=self.config, n_underlyings=self.paths.shape[2], basket_method=self.option.basket_method, paths=np.empty((0,)))
+        for i in range(last, -1, -1):
+            if self.option.basket_method == 'performance':
+                yield i, basket.reduce(np.asarray(self.paths[:, [0, i]], dtype=float64))[:, 1]
+            else:
+                yield i, basket.reduce(np.asarray(self.paths[:, i], dtype=float64))
+
+    def bridge_slices(self, last: int) -> Iterator[tuple[int, typing.NDArray[float64]]]:
+        model: BS_Model = self.config #type: ignore
+        # the model's bit generator (bit_generator or rng), on a child of its seed apart from the path blocks
+        bit_generator_class = resolve_rng(model.seed, model.rng, model.bit_generator)[1]
+        rng = np.random.Generator(bit_generator_class(child_sequence(model.seed_sequence, bridge_stream)))
+
+        params = list(model.underlyings.values())
+        vols = np.array([p.vol for p in params])
+        drifts = np.array([p.rate - p.div - 0.5 * p.vol ** 2 for p in params])
+        log_spots = np.zeros(len(params)) if self.path_method == 'percentage' else np.log([p.spot for p in params])
+        basket = BasketModel(config=model, n_underlyings=len(params), basket_method=self.option.basket_method, paths=np.empty((0,)))
+        n, s = model.n_paths, model.n_shocks
+
+        def normals() -> typing.NDArray[float64]:
+            if not model.antithetic:
+                return rng.standard_normal((n, s))
+            Z = np.empty((n, s))
+            half = n // 2
+            rng.standard_normal(out=Z[:half])
+            np.negative(Z[:half], out=Z[half:2 * half])
+            if n % 2 != 0:
+                rng.standard_normal(out=Z[2 * half:])
+            return Z
+
+        # independent Brownian motions at the last date, then W(t_i) | W(t_i+1) ~ N(W(t_i+1) t_i / t_i+1, t_i (t_i+1 - t_i) / t_i+1)
+        W = np.sqrt(self.times[last]) * normals()
+        for i in range(last, -1, -1):
+            if i < last:
+                t, t_next = self.times[i], self.times[i + 1]
+                W *= t / t_next
+                W += np.sqrt(t * (t_next - t) / t_next) * normals()
+
+            shocks = W if model.correlation is None else model.correlation.apply(W[:, None, :])[:, 0]
+            levels = np.exp(log_spots + drifts * self.times[i] + vols * shocks)
+            yield i, basket.reduce(model.round_output(levels[:, None, :]))[:, 0]
+
+    def regress(self, basket: typing.NDArray[float64], cashflows: typing.NDArray[float64], strike: float) -> typing.NDArray[float64]:
+        # continuation values (n_itm, k) of the k live maturities, one least squares with k right hand sides
+        # powers of the basket as rows (contiguous), normal equations solved in the (degree + 1)^2 space
+        X = np.empty((self.degree + 1, basket.shape[0]))
+        X[0] = 1.0
+        np.divide(basket, strike, out=X[1])
+        for k in range(2, self.degree + 1):
+            np.multiply(X[k - 1], X[1], out=X[k])
+        coefficients = np.linalg.lstsq(X @ X.T, X @ cashflows, rcond=None)[0]
+        return X.T @ coefficients
+
+    def price(self, spot: float = 1.0) -> dict:
+        date_indices = self.config.calendar.index_of(self.strikes_dates)
+        last = int(date_indices.max())
+        strike = self.option.strike_price * (spot if self.option.value_method == 'relative' else 1.0)
+        self.timings = []
+
+        cashflows: Optional[typing.NDArray[float64]] = None
+        exercise, itm = np.zeros(0), np.zeros(0, dtype=bool)
+        for i, basket in self.slices(last):
+            if cashflows is None:
+                cashflows = np.zeros((basket.shape[0], len(date_indices)))
+            else:
+                # cashflows are valued at the current date
+                cashflows *= np.exp(-self.rate * (self.times[i + 1] - self.times[i]))
+
+            exercise, itm = self.exercise_value(basket, spot)
+            cashflows[:, date_indices == i] = exercise[:, None]
+
+            live = date_indices > i
+            if i == 0 or not live.any() or not itm.any():
+                continue
+
+            start = perf_counter()
+            rows = np.flatnonzero(itm)
+            held = cashflows[np.ix_(rows, live)]
+            continuation = self.regress(basket[rows], held, strike)
+            exercised = exercise[rows, None] > continuation
+            cashflows[np.ix_(rows, live)] = np.where(exercised, exercise[rows, None], held)
+            self.timings.append({"date": self.config.calendar.get_dates[i], "itm": len(rows), "seconds": perf_counter() - start})
+
+        if cashflows is None:
+            raise ValueError("No path to price.")
+
+        # carried to the maturity, and compared with the exercise at the start date
+        growth = np.exp(self.rate * self.times[date_indices])
+        values = cashflows.mean(axis=0) * growth
+        stds = cashflows.std(axis=0) * growth
+        immediate = np.where(itm[0], exercise[0], 0.0) * growth
+
+        results = {}
+        for k, strike_date in enumerate(self.strikes_dates):
+            if immediate[k] > values[k]:
+                results[strike_date] = {"price": immediate[k], "std": 0.0, "std_error": 0.0, "exercise": "immediate"}
+            else:
+                results[strike_date] = {"price": values[k], "std": stds[k], "std_error": stds[k] / np.sqrt(cashflows.shape[0]), "exercise": "lsm"}
+        return results
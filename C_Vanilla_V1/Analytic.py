@@ -0,0 +1,149 @@
+from typing import Union, Literal, Optional, Callable
+
+import numpy as np
+from numpy import typing, float64
+from scipy.special import ndtr, owens_t
+
+from C_Vanilla_V1.Option import Option_Call, Option_Put, Digital_Call, Digital_Put
+
+# Undiscounted Black-Scholes expectations, same convention as the Monte Carlo prices (mean payoff, population std).
+# Every argument broadcasts: arrays of spots, strikes, times, params price a whole grid at once.
+
+ArrayLike = Union[float, typing.NDArray[float64]]
+bivariate_clip = 40.0 # |x| above which N(x) is 0 or 1 in double precision
+
+def bivariate_cdf(h: ArrayLike, k: ArrayLike, rho: ArrayLike) -> typing.NDArray[float64]:
+    """
+    P(X < h, Y < k) for standard normals of correlation rho (|rho| < 1), through Owen's T function
+    """
+    h, k, rho = np.broadcast_arrays(np.clip(h, -bivariate_clip, bivariate_clip), np.clip(k, -bivariate_clip, bivariate_clip), np.asarray(rho, dtype=float64))
+    h = np.where(h == 0.0, 1e-12, h)
+    k = np.where(k == 0.0, 1e-12, k)
+    root = np.sqrt(1.0 - rho ** 2)
+
+    beta = np.where((h * k > 0) | ((h * k == 0) & (h + k >= 0)), 0.0, 0.5)
+    return 0.5 * (ndtr(h) + ndtr(k)) - owens_t(h, (k - rho * h) / (h * root)) - owens_t(k, (h - rho * k) / (k * root)) - beta
+
+def log_moments(spot: ArrayLike, vol: ArrayLike, rate: ArrayLike, div: ArrayLike, t: ArrayLike, power: int) -> tuple:
+    # E[S_t^power] and the mean of log S_t under the measure weighted by S_t^power
+    spot, vol, t = np.asarray(spot, dtype=float64), np.asarray(vol, dtype=float64), np.asarray(t, dtype=float64)
+    drift = np.asarray(rate, dtype=float64) - np.asarray(div, dtype=float64)
+    scale = spot ** power * np.exp(power * drift * t + 0.5 * power * (power - 1) * vol ** 2 * t)
+    mean = np.log(spot) + (drift - 0.5 * vol ** 2 + power * vol ** 2) * t
+    return scale, mean
+
+def _standardized(level: ArrayLike, mean: typing.NDArray, std: typing.NDArray) -> typing.NDArray[float64]:
+    with np.errstate(divide='ignore'):
+        return (np.log(np.asarray(level, dtype=float64)) - mean) / std
+
+def bs_moment(spot: ArrayLike, vol: ArrayLike, rate: ArrayLike, div: ArrayLike, t: ArrayLike, lower: ArrayLike, upper: ArrayLike, power: int) -> typing.NDArray[float64]:
+    """
+    E[S_t^power 1{lower < S_t < upper}], power 0, 1 or 2
+    """
+    scale, mean = log_moments(spot, vol, rate, div, t, power)
+    std = np.asarray(vol, dtype=float64) * np.sqrt(t)
+    return scale * np.clip(ndtr(_standardized(upper, mean, std)) - ndtr(_standardized(lower, mean, std)), 0.0, 1.0)
+
+def observed_moment(spot: ArrayLike, vol: ArrayLike, rate: ArrayLike, div: ArrayLike, t: ArrayLike, lower: ArrayLike, upper: ArrayLike, power: int, t_obs: ArrayLike, level: ArrayLike, above: bool) -> typing.NDArray[float64]:
+    """
+    E[S_t^power 1{lower < S_t < upper} 1{S_obs > level}] (above) or with 1{S_obs < level}, S_obs observed once at t_obs
+    """
+    scale, mean_t = log_moments(spot, vol, rate, div, t, power)
+    _, mean_obs = log_moments(spot, vol, rate, div, t_obs, power)
+    mean_obs = mean_obs + np.asarray(vol, dtype=float64) ** 2 * power * (np.minimum(t, t_obs) - np.asarray(t_obs, dtype=float64))
+
+    std_t = np.asarray(vol, dtype=float64) * np.sqrt(t)
+    std_obs = np.asarray(vol, dtype=float64) * np.sqrt(t_obs)
+    rho = np.sqrt(np.minimum(t, t_obs) / np.maximum(t, t_obs))
+    rho = np.minimum(rho, 1.0 - 1e-12)
+
+    a, b = _standardized(lower, mean_t, std_t), _standardized(upper, mean_t, std_t)
+    c = _standardized(level, mean_obs, std_obs)
+    sign = -1.0 if above else 1.0 # P(Y > c) = P(-Y < -c), correlation flips with it
+    probability = bivariate_cdf(b, sign * c, sign * rho) - bivariate_cdf(a, sign * c, sign * rho)
+    return scale * np.clip(probability, 0.0, 1.0)
+
+def continuous_moment(spot: ArrayLike, vol: ArrayLike, rate: ArrayLike, div: ArrayLike, t: ArrayLike, lower: ArrayLike, upper: ArrayLike, power: int, level: ArrayLike, up: bool) -> typing.NDArray[float64]:
+    """
+    E[S_t^power 1{lower < S_t < upper} 1{barrier not hit on [0, t]}], continuously monitored up (max < level) or down (min > level) barrier.
+    Reflection principle: paths from spot minus the paths from level^2 / spot, weighted by (level / spot)^(2 nu / vol^2)
+    """
+    spot, level = np.asarray(spot, dtype=float64), np.asarray(level, dtype=float64)
+    nu = np.asarray(rate, dtype=float64) - np.asarray(div, dtype=float64) - 0.5 * np.asarray(vol, dtype=float64) ** 2
+
+    if up:
+        upper = np.minimum(upper, level)
+    else:
+        lower = np.maximum(lower, level)
+    upper = np.maximum(upper, lower)
+
+    reflected = level ** 2 / spot
+    weight = (level / spot) ** (2.0 * nu / np.asarray(vol, dtype=float64) ** 2)
+    survived = bs_moment(spot, vol, rate, div, t, lower, upper, power) - weight * bs_moment(reflected, vol, rate, div, t, lower, upper, power)
+
+    breached = (spot >= level) if up else (spot <= level)
+    return np.where(breached, 0.0, np.maximum(survived, 0.0))
+
+def payoff_pieces(option: Union[Option_Call, Option_Put, Digital_Call, Digital_Put], spot: float = 1.0) -> list[tuple[float, float, float, float]]:
+    # payoff as alpha + beta * S on (lower, upper) intervals, same strike / rebate / payout rules as Vanilla_Model.payoff
+    scale = spot if option.value_method == 'relative' else 1.0
+    K, rebate = option.strike_price * scale, option.rebate * scale
+
+    if isinstance(option, Option_Call):
+        return [(0.0, K, rebate, 0.0), (K, np.inf, -option.levier * K, option.levier)]
+    if isinstance(option, Option_Put):
+        return [(0.0, K, option.levier * K, -option.levier), (K, np.inf, rebate, 0.0)]
+    if isinstance(option, Digital_Call):
+        return [(0.0, K, rebate, 0.0), (K, np.inf, option.payout * scale, 0.0)]
+    return [(0.0, K, option.payout * scale, 0.0), (K, np.inf, rebate, 0.0)]
+
+def piecewise_expectation(pieces: list[tuple[float, float, float, float]], moment: Callable[[float, float, int], typing.NDArray]) -> tuple[typing.NDArray, typing.NDArray]:
+    # E[payoff] and E[payoff^2] from the moments E[S^p 1{lower < S < upper}] (times any event indicator)
+    mean, second = 0.0, 0.0
+    for lower, upper, alpha, beta in pieces:
+        m0, m1 = moment(lower, upper, 0), moment(lower, upper, 1)
+        mean = mean + alpha * m0 + beta * m1
+        second = second + alpha ** 2 * m0 + 2 * alpha * beta * m1
+        if beta != 0.0:
+            second = second + beta ** 2 * moment(lower, upper, 2)
+    return mean, second
+
+def vanilla_price(option: Union[Option_Call, Option_Put, Digital_Call, Digital_Put], spot: ArrayLike, vol: ArrayLike, rate: ArrayLike, div: ArrayLike, t: ArrayLike, value_spot: float = 1.0) -> dict[str, typing.NDArray[float64]]:
+    """
+    price (mean payoff) and std of the payoff at t. value_spot is the `spot` of the Monte Carlo price() (relative strikes)
+    """
+    moment = lambda lower, upper, power: bs_moment(spot, vol, rate, div, t, lower, upper, power)
+    mean, second = piecewise_expectation(payoff_pieces(option, value_spot), moment)
+    return {"price": mean, "std": np.sqrt(np.maximum(second - mean ** 2, 0.0))}
+
+def barrier_price(option: Union[Option_Call, Option_Put, Digital_Call, Digital_Put], spot: ArrayLike, vol: ArrayLike, rate: ArrayLike, div: ArrayLike, t: ArrayLike, barrier_mecanism: Literal['U&I', 'U&O', 'D&I', 'D&O'], level: ArrayLike, t_obs: Optional[ArrayLike] = None, rebate_if_not_activated: bool = True, value_spot: float = 1.0) -> dict[str, typing.NDArray[float64]]:
+    """
+    Barrier observed once at t_obs, or continuously on [0, t] when t_obs is None.
+    payoff = a * vanilla + (1 - a) * R, a the activation of Vanilla_Barrier_Model, R the rebate if rebate_if_not_activated else 0
+    """
+    if barrier_mecanism not in ['U&I', 'U&O', 'D&I', 'D&O']:
+        raise ValueError("barrier_mecanism must be one of 'U&I', 'U&O', 'D&I', 'D&O'.")
+
+    up = barrier_mecanism in ['U&I', 'U&O']
+    knock_in = barrier_mecanism in ['U&I', 'D&I']
+
+    if t_obs is None:
+        # survival of the barrier, knock in = complement
+        survived = lambda lower, upper, power: continuous_moment(spot, vol, rate, div, t, lower, upper, power, level, up)
+    else:
+        survived = lambda lower, upper, power: observed_moment(spot, vol, rate, div, t, lower, upper, power, t_obs, level, above=not up)
+
+    if knock_in:
+        moment = lambda lower, upper, power: bs_moment(spot, vol, rate, div, t, lower, upper, power) - survived(lower, upper, power)
+    else:
+        moment = survived
+
+    pieces = payoff_pieces(option, value_spot)
+    mean, second = piecewise_expectation(pieces, moment)
+    activated = moment(0.0, np.inf, 0)
+
+    scale = value_spot if option.value_method == 'relative' else 1.0
+    R = option.rebate * scale if rebate_if_not_activated else 0.0
+    mean = mean + R * (1.0 - activated)
+    second = second + R ** 2 * (1.0 - activated)
+    return {"price": mean, "std": np.sqrt(np.maximum(second - mean ** 2, 0.0))}
@@ -1,22 +1,26 @@
 
 from datetime import date
 from typing import Union, Literal
-from numpy import typing, float64, round
+from numpy import typing, float64
 
 from B_Model_V1.timegrid import Calendar
 
-accuracy_float = 6
-
 barrier_mecanism = ['U&I', 'U&O', 'D&I', 'D&O']
 barrier_exercise = ['EU', 'US']
+barrier_monitoring = ['discrete', 'continuous']
 
 class Barrier_Feature():
-    def __init__(self, start_date: date, end_date: date, barrier_mecanism: Literal['U&I', 'U&O', 'D&I', 'D&O'], barrier_exercise: Literal['EU', 'US'], barrier_level: float, spot_price: float, value_method: Literal['absolute', 'relative'], observation_dates: Union[list[date], None] = None, calendar: Union[Calendar, None] = None):
+    def __init__(self, start_date: date, end_date: date, barrier_mecanism: Literal['U&I', 'U&O', 'D&I', 'D&O'], barrier_exercise: Literal['EU', 'US'], barrier_level: float, spot_price: float, value_method: Literal['absolute', 'relative'], observation_dates: Union[list[date], None] = None, calendar: Union[Calendar, None] = None, monitoring: Literal['discrete', 'continuous'] = 'discrete'):
+        if monitoring not in barrier_monitoring:
+            raise ValueError(f"monitoring must be one of {barrier_monitoring}")
+
         self.start_date: date = start_date
         self.end_date: date = end_date
 
         self.barrier_mecanism: str = barrier_mecanism
         self.barrier_exercise: str = barrier_exercise
+        # continuous: also hit between the grid points of the observation window (Brownian bridge)
+        self.monitoring: str = monitoring
 
         self.value_method: str = value_method
         self.barrier_level: float = barrier_level
@@ -48,19 +52,20 @@ class Barrier_Feature():
         if self.calendar is None or self.observation_dates is None:
             raise ValueError("Calendar and observation_dates must be provided to update strike dates.")
         
+        nearest_dates = self.calendar.nearest_dates(self.observation_dates)
         for t in range(len(self.observation_dates)):
-            nearest_date = self.calendar.get_nearest_time_index(self.observation_dates[t])
+            nearest_date = nearest_dates[t]
             if nearest_date != self.observation_dates[t]:
                 print(f"Updating strike date from {self.observation_dates[t]} to nearest date {nearest_date}")
                 self.observation_dates[t] = nearest_date
     
-    def reduce_to_strike_dates(self, paths:typing.NDArray[float64]) -> typing.NDArray[float64]:
-        paths = round(paths, accuracy_float)
+    def reduce_to_strike_dates(self, paths:typing.NDArray[float64], calendar: Union[Calendar, None] = None) -> typing.NDArray[float64]:
+        # calendar: grid of the paths when it differs from the barrier's own (e.g. sparse simulation)
         if self.calendar is None or self.observation_dates is None:
             # If no observation dates provided, return the last column
             reduced_paths = paths[:,-1]
         else:
-            date_indices = [self.calendar.get_dates.index(d) for d in self.observation_dates]
+            date_indices = (calendar or self.calendar).index_of(self.observation_dates)
             reduced_paths = paths[:, date_indices]
         return reduced_paths
 
@@ -0,0 +1,166 @@
+from typing import Union, Iterable
+from datetime import date
+
+import numpy as np
+from numpy import typing, float64
+
+from C_Vanilla_V1.Option import Option_Call, Option_Put, Digital_Call, Digital_Put
+from C_Vanilla_V1.Model import new_stats, basket_of
+from C_Vanilla_V1.American import Longstaff_Schwartz
+from B_Model_V1.base import SimulationConfig, path_chunks, iter_rows
+from B_Model_V1.bs_model import BS_Model
+from B_Model_V1.accumulator import ReplicatedStats
+
+option_kinds = {Option_Call: 'call', Option_Put: 'put', Digital_Call: 'digital_call', Digital_Put: 'digital_put'}
+book_dtype = np.dtype([('trade', 'i8'), ('type', 'U12'), ('date', 'datetime64[D]'), ('price', 'f8'), ('std', 'f8'), ('std_error', 'f8')])
+default_block_elements = 2 ** 24 # payoff values (paths x trades x dates) evaluated at once
+
+class Book_Group:
+    """
+    Trades of one type (and one basket method) as parameter vectors
+    """
+    def __init__(self, kind: str, basket_method: str, trades: list[int], options: list, spot: float):
+        self.kind = kind
+        self.basket_method = basket_method
+        self.trades = np.asarray(trades)
+
+        scale = np.array([spot if option.value_method == 'relative' else 1.0 for option in options])
+        self.strike = np.array([option.strike_price for option in options]) * scale
+        self.rebate = np.array([option.rebate for option in options]) * scale
+        if kind in ['call', 'put']:
+            self.levier = np.array([option.levier for option in options])
+        else:
+            self.payout = np.array([option.payout for option in options]) * scale
+
+    def payoff(self, basket: typing.NDArray) -> typing.NDArray[float64]:
+        # basket (n, m) -> payoff (n, k, m) of the k trades of the group
+        B = basket[:, None, :]
+        K, rebate = self.strike[None, :, None], self.rebate[None, :, None]
+
+        if self.kind == 'call':
+            return np.where(B > K, self.levier[None, :, None] * (B - K), rebate)
+        if self.kind == 'put':
+            return np.where(B < K, self.levier[None, :, None] * (K - B), rebate)
+        if self.kind == 'digital_call':
+            return np.where(B > K, self.payout[None, :, None], rebate)
+        return np.where(B < K, self.payout[None, :, None], rebate)
+
+class Book_Pricer:
+    """
+    Prices a book of calls, puts and digitals against one path set, all trades and dates in broadcast.
+    paths: basket paths (n_sim, n_steps), or underlying paths (n_sim, n_steps, d) reduced with each trade's basket_method.
+    Memory is bounded by block_elements payoff values at a time.
+    American trades ('US') go through Longstaff-Schwartz one by one, reading the paths one date at a time
+    (reduced with the trade's basket method): the paths must then be an array or a memory map,
+    and rate the discount rate unless config is the BS_Model.
+    """
+    def __init__(self, options: list[Union[Option_Call, Option_Put, Digital_Call, Digital_Put]], config: SimulationConfig, paths: Union[typing.NDArray[float64], Iterable[typing.NDArray[float64]]], strikes_dates: list[date], block_elements: int = default_block_elements, rate: Union[float, None] = None):
+        if len(options) == 0:
+            raise ValueError("The book is empty.")
+        if len(strikes_dates) == 0:
+            raise ValueError("No strike dates provided.")
+
+        for option in options:
+            if type(option) not in option_kinds:
+                raise ValueError(f"Unsupported product in the book: {type(option).__name__}.")
+
+        if any(option.option_type == 'US' for option in options):
+            # backward induction reads every path at each date, from the last date down
+            if not isinstance(paths, np.ndarray):
+                raise ValueError("American trades in the book read the paths backward: pass them as an array or a memory map, a chunk stream is read once.")
+            if paths.ndim not in [2, 3]:
+                raise ValueError("American trades in the book need basket paths (n_sim, n_steps) or underlying paths (n_sim, n_steps, d).")
+            if rate is None and not isinstance(config, BS_Model):
+                raise ValueError("American trades in the book need the discount rate on a SimulationConfig: Book_Pricer(..., rate=r).")
+
+        self.options = options
+        self.config = config
+        self.paths = paths
+        self.strikes_dates = config.calendar.nearest_dates(strikes_dates)
+        self.block_elements = block_elements
+        self.rate = rate
+
+    def groups(self, spot: float = 1.0) -> list[Book_Group]:
+        # European trades only, the American ones are priced by american_rows
+        members: dict[tuple[str, str], list[int]] = {}
+        for i, option in enumerate(self.options):
+            if option.option_type == 'US':
+                continue
+            members.setdefault((option_kinds[type(option)], option.basket_method), []).append(i)
+        return [Book_Group(kind, basket_method, trades, [self.options[i] for i in trades], spot) for (kind, basket_method), trades in members.items()]
+
+    def accumulate(self, groups: list[Book_Group]) -> list:
+        # one running statistic per group, columns (k, m) of its trades
+        date_indices = self.config.calendar.index_of(self.strikes_dates)
+        n_trades, n_dates = len(self.options), len(self.strikes_dates)
+        rows = max(1, self.block_elements // (n_trades * n_dates))
+
+        stats = [new_stats(self.config) for _ in groups]
+        start = 0
+        for chunk in path_chunks(self.paths, self.config.chunk_size):
+            for block in iter_rows(chunk, rows):
+                n = block.shape[0]
+                reduced = np.asarray(block[:, date_indices], dtype=float64)
+                baskets = {}
+
+                for group, group_stats in zip(groups, stats):
+                    if reduced.ndim == 2:
+                        basket = reduced
+                    else:
+                        if group.basket_method not in baskets:
+                            baskets[group.basket_method] = basket_of(self.config, reduced, group.basket_method) #type: ignore
+                        basket = baskets[group.basket_method]
+
+                    payoff = group.payoff(basket)
+                    group_stats.update(payoff.reshape(n, -1), start)
+                start += n
+
+        if stats[0].count == 0:
+            raise ValueError("Path stream is empty or already consumed.")
+        return stats
+
+    def american_rows(self, spot: float = 1.0) -> tuple[list[int], list[np.ndarray], list[np.ndarray], list[np.ndarray]]:
+        # one Longstaff-Schwartz per American trade, each reads the paths (memory map included) one date at a time
+        trades, means, stds, std_errors = [], [], [], []
+        for i, option in enumerate(self.options):
+            if option.option_type != 'US':
+                continue
+
+            results = Longstaff_Schwartz(self.config, option, self.strikes_dates, self.paths, rate=self.rate).price(spot) #type: ignore
+            rows = [results[strike_date] for strike_date in self.strikes_dates]
+            trades.append(i)
+            means.append(np.array([row["price"] for row in rows]))
+            stds.append(np.array([row["std"] for row in rows]))
+            std_errors.append(np.array([row["std_error"] for row in rows]))
+        return trades, means, stds, std_errors
+
+    def price(self, spot: float = 1.0) -> np.ndarray:
+        """
+        One row per (trade, date), trades in book order
+        """
+        groups = self.groups(spot)
+        means, stds, std_errors = [], [], []
+        for stats in (self.accumulate(groups) if groups else []):
+            total = stats.total if isinstance(stats, ReplicatedStats) else stats
+            means.append(total.mean)
+            stds.append(total.std)
+            std_errors.append(stats.std_error if self.config.generator == 'sobol' else total.std_error)
+        n_dates = len(self.strikes_dates)
+
+        american, american_means, american_stds, american_std_errors = self.american_rows(spot)
+        means += american_means
+        stds += american_stds
+        std_errors += american_std_errors
+
+        order = np.concatenate([group.trades for group in groups] + [np.asarray(american, dtype=int)])
+        kinds = np.concatenate([[group.kind] * len(group.trades) for group in groups] + [[option_kinds[type(self.options[i])] for i in american]])
+
+        table = np.empty(len(order) * n_dates, dtype=book_dtype)
+        table['trade'] = np.repeat(order, n_dates)
+        table['type'] = np.repeat(kinds, n_dates)
+        table['date'] = np.tile(np.array(self.strikes_dates, dtype='datetime64[D]'), len(order))
+        table['price'] = np.concatenate(means)
+        table['std'] = np.concatenate(stds)
+        table['std_error'] = np.concatenate(std_errors)
+
+        return table[np.argsort(table['trade'], kind='stable')]
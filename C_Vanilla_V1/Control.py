@@ -0,0 +1,141 @@
+from typing import Union, Callable
+
+import numpy as np
+from numpy import typing, float64
+
+from C_Vanilla_V1.Option import Option_Call, Option_Put, Digital_Call, Digital_Put
+from C_Vanilla_V1.Analytic import vanilla_price
+from B_Model_V1.base import SimulationConfig
+from B_Model_V1.bs_model import BS_Model
+from B_Model_V1.accumulator import RunningCovariance, ReplicatedStats
+
+control_names = ['spot', 'geometric', 'vanilla']
+
+class Control_Variates:
+    """
+    Controls with a known Black-Scholes expectation, evaluated on the pricing paths:
+    - spot: level of each underlying at the strike date, E = S0 exp((r - q) t)
+    - geometric: the option payoff on the geometric basket of the underlyings (lognormal, closed form)
+    - vanilla: the option payoff on the basket without the barrier (single underlying)
+    The coefficients beta = Cov(C)^-1 Cov(C, payoff) are estimated per date on the same paths.
+    """
+    def __init__(self, config: SimulationConfig, option: Union[Option_Call, Option_Put, Digital_Call, Digital_Put], controls: Union[str, list[str]], payoff: Callable[[typing.NDArray], typing.NDArray], spot: float = 1.0):
+        if not isinstance(config, BS_Model):
+            raise ValueError("Control variates need the BS_Model that simulated the paths as config.")
+
+        self.controls = [controls] if isinstance(controls, str) else list(controls)
+        if len(self.controls) == 0:
+            raise ValueError("No control variate provided.")
+        for control in self.controls:
+            if control not in control_names:
+                raise ValueError(f"Invalid control '{control}'. Choose from {control_names}.")
+
+        params = list(config.underlyings.values())
+        self.isins = list(config.underlyings.keys())
+        if 'vanilla' in self.controls and len(params) != 1:
+            raise ValueError("The 'vanilla' control needs a single underlying, use 'geometric' for baskets.")
+
+        self.vols = np.array([p.vol for p in params], dtype=float64)
+        self.carries = np.array([p.rate - p.div for p in params], dtype=float64)
+        self.correlation = np.eye(len(params)) if config.correlation is None else config.correlation.effective_matrix
+        self.times = np.cumsum(config.calendar.get_time_dt)
+
+        self.config = config
+        self.option = option
+        self.payoff = payoff
+        self.spot = spot
+        self.d = len(params)
+
+    @property
+    def labels(self) -> list[str]:
+        # one column per underlying for 'spot'
+        labels = []
+        for control in self.controls:
+            if control == 'spot' and self.d > 1:
+                labels += [f"spot_{isin}" for isin in self.isins]
+            else:
+                labels.append(control)
+        return labels
+
+    def geometric_params(self) -> tuple[float, float]:
+        # the geometric basket is Black-Scholes with this vol and carry (no dividend)
+        w = self.vols / self.d
+        vol = float(np.sqrt(w @ self.correlation @ w))
+        carry = float(np.mean(self.carries - 0.5 * self.vols ** 2)) + 0.5 * vol ** 2
+        return vol, carry
+
+    def expected(self, spots: typing.NDArray[float64], date_indices: typing.NDArray) -> typing.NDArray[float64]:
+        """
+        Known expectations (m, k) of the controls, spots the start levels of the underlying paths
+        """
+        t = self.times[date_indices]
+        columns = []
+        for control in self.controls:
+            if control == 'spot':
+                columns += list((spots[None, :] * np.exp(np.outer(t, self.carries))).T)
+            elif control == 'geometric':
+                vol, carry = self.geometric_params()
+                columns.append(vanilla_price(self.option, float(np.exp(np.log(spots).mean())), vol, carry, 0.0, t, self.spot)["price"])
+            else:
+                columns.append(vanilla_price(self.option, float(spots[0]), self.vols[0], self.carries[0], 0.0, t, self.spot)["price"])
+        return np.stack(columns, axis=-1)
+
+    def values(self, paths: typing.NDArray, basket: typing.NDArray, date_indices: typing.NDArray) -> typing.NDArray[float64]:
+        """
+        paths (n, n_steps, d) underlying paths, basket (n, n_steps) -> controls (n, m, k)
+        """
+        S = np.asarray(paths[:, date_indices], dtype=float64)
+        columns = []
+        for control in self.controls:
+            if control == 'spot':
+                columns += [S[..., i] for i in range(self.d)]
+            elif control == 'geometric':
+                columns.append(self.payoff(np.exp(np.log(S).mean(axis=-1))))
+            else:
+                columns.append(self.payoff(np.asarray(basket[:, date_indices], dtype=float64)))
+        return np.stack(columns, axis=-1)
+
+    @staticmethod
+    def stack(payoff: typing.NDArray, controls: typing.NDArray) -> typing.NDArray[float64]:
+        # one row per path: (m, 1 + k) [payoff, controls] for the running covariance
+        return np.concatenate([np.asarray(payoff, dtype=float64)[..., None], controls], axis=-1)
+
+    def results(self, stats: Union[RunningCovariance, ReplicatedStats], expected: typing.NDArray[float64], strikes_dates: list) -> dict:
+        total = stats.total if isinstance(stats, ReplicatedStats) else stats
+        covariance = total.covariance
+        mean = total.mean
+
+        # beta per date, pinv so that a constant control (deep out of the money) gets a zero coefficient
+        beta = (np.linalg.pinv(covariance[:, 1:, 1:]) @ covariance[:, 1:, :1])[..., 0]
+        price = mean[:, 0] - np.sum(beta * (mean[:, 1:] - expected), axis=-1) #type: ignore
+        plain_variance = covariance[:, 0, 0]
+        variance = np.maximum(plain_variance - np.sum(beta * covariance[:, 0, 1:], axis=-1), 0.0)
+
+        if self.config.generator == 'sobol':
+            # error from the dispersion of the adjusted replication means
+            means = np.array([block.mean for block in stats.blocks.values()]) #type: ignore
+            if len(means) < 2:
+                raise ValueError("At least two blocks are needed to estimate the error.")
+            adjusted = means[..., 0] - np.sum(beta * (means[..., 1:] - expected), axis=-1)
+            std_error = adjusted.std(axis=0, ddof=1) / np.sqrt(len(means))
+            plain_std_error = means[..., 0].std(axis=0, ddof=1) / np.sqrt(len(means))
+        else:
+            std_error = np.sqrt(variance / total.count)
+            plain_std_error = np.sqrt(plain_variance / total.count)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            reduction = np.where(variance > 0, plain_variance / variance, np.inf)
+
+        labels = self.labels
+        results = {}
+        for i, strike_date in enumerate(strikes_dates):
+            results[strike_date] = {
+                "price": price[i],
+                "std": np.sqrt(variance[i]),
+                "std_error": std_error[i],
+                "plain_price": mean[i, 0], #type: ignore
+                "plain_std_error": plain_std_error[i],
+                "beta": dict(zip(labels, beta[i])),
+                "variance_reduction": reduction[i],
+            }
+        return results
@@ -0,0 +1,141 @@
+from typing import Union, Literal
+
+import numpy as np
+from numpy import typing, float64
+
+from C_Vanilla_V1.Option import Option_Call, Option_Put, Digital_Call, Digital_Put
+from B_Model_V1.base import SimulationConfig
+from B_Model_V1.bs_model import BS_Model
+from B_Model_V1.accumulator import RunningStats, ReplicatedStats
+
+greek_names = ['delta', 'vega']
+
+class Greeks_Estimator:
+    """
+    Delta and vega per underlying, computed on the pricing paths in the same pass.
+    - pathwise: derivative of the payoff along each path, for calls and puts without rebate
+    - likelihood ratio: payoff times the score of the density of the dates the payoff observes
+      (digitals, rebates, barriers). Only the first observed date depends on the spot, every observed interval on the vol.
+    Sensitivities are taken with respect to the first row of the underlying paths (spot for 'value' paths), strike fixed.
+    """
+    def __init__(self, config: SimulationConfig, basket_method: Literal['uniform', 'worst-of', 'best-of']):
+        if not isinstance(config, BS_Model):
+            raise ValueError("Greeks need the BS_Model that simulated the paths as config.")
+
+        params = list(config.underlyings.values())
+        self.isins = list(config.underlyings.keys())
+        self.vols = np.array([p.vol for p in params], dtype=float64)
+        if np.any(self.vols <= 0):
+            raise ValueError("Greeks need positive volatilities.")
+
+        rates = np.array([p.rate for p in params], dtype=float64)
+        divs = np.array([p.div for p in params], dtype=float64)
+        self.drifts = rates - divs - 0.5 * self.vols ** 2
+
+        correlation = np.eye(len(params)) if config.correlation is None else config.correlation.effective_matrix
+        self.inv_correlation = np.linalg.inv(correlation)
+
+        # time in years of each grid index
+        self.times = np.cumsum(config.calendar.get_time_dt)
+        self.basket_method = basket_method
+        self.d = len(params)
+
+    @staticmethod
+    def pathwise_allowed(option: Union[Option_Call, Option_Put, Digital_Call, Digital_Put]) -> bool:
+        # a rebate makes the payoff jump at the strike, the pathwise derivative would miss it
+        return isinstance(option, (Option_Call, Option_Put)) and option.rebate == 0.0
+
+    @staticmethod
+    def payoff_slope(basket: typing.NDArray, option: Union[Option_Call, Option_Put], spot: float = 1.0) -> typing.NDArray[float64]:
+        # derivative of the payoff with respect to the basket level
+        strike_value = option.strike_price if option.value_method == 'absolute' else option.strike_price * spot
+        if isinstance(option, Option_Call):
+            return np.where(basket > strike_value, option.levier, 0.0)
+        return np.where(basket < strike_value, -option.levier, 0.0)
+
+    def basket_weights(self, paths: typing.NDArray) -> typing.NDArray[float64]:
+        # d basket / d underlying, paths (..., d)
+        if self.basket_method == 'uniform':
+            return np.full(paths.shape, 1.0 / self.d)
+        if self.basket_method == 'worst-of':
+            selected = np.argmin(paths, axis=-1)
+        elif self.basket_method == 'best-of':
+            selected = np.argmax(paths, axis=-1)
+        else:
+            raise ValueError("Invalid basket_method. Choose from 'uniform', 'worst-of', or 'best-of'.")
+        return (selected[..., None] == np.arange(self.d)).astype(float64)
+
+    def pathwise(self, paths: typing.NDArray, date_indices: typing.NDArray, slope: typing.NDArray) -> tuple[typing.NDArray[float64], typing.NDArray[float64]]:
+        """
+        paths (n, n_steps, d) underlying paths, slope (n, m) payoff slope at the m dates -> delta, vega (n, m, d)
+        """
+        spots = np.asarray(paths[:, 0], dtype=float64)[:, None, :]
+        S = np.asarray(paths[:, date_indices], dtype=float64)
+        t = self.times[date_indices][None, :, None]
+
+        dB = slope[..., None] * self.basket_weights(S)
+        delta = dB * S / spots
+        # dS/dvol = S (W_t - vol t), W_t recovered from the log return
+        vega = dB * S * (np.log(S / spots) - (self.drifts + self.vols ** 2) * t) / self.vols
+        return delta, vega
+
+    def scores(self, paths: typing.NDArray, observed: list[list[int]]) -> tuple[typing.NDArray[float64], typing.NDArray[float64]]:
+        """
+        Likelihood ratio weights (n, m, d): observed[k] are the grid indices the payoff of column k depends on
+        """
+        n = paths.shape[0]
+        spots = np.asarray(paths[:, 0], dtype=float64)
+        delta_score = np.empty((n, len(observed), self.d))
+        vega_score = np.empty((n, len(observed), self.d))
+
+        computed: dict[tuple[int, ...], tuple[typing.NDArray, typing.NDArray]] = {}
+        for k, indices in enumerate(observed):
+            key = tuple(sorted(set(i for i in indices if i > 0)))
+            if len(key) == 0:
+                raise ValueError("The payoff must observe at least one date after the start date.")
+            if key not in computed:
+                computed[key] = self._scores(paths, spots, key)
+            delta_score[:, k], vega_score[:, k] = computed[key]
+
+        return delta_score, vega_score
+
+    def _scores(self, paths: typing.NDArray, spots: typing.NDArray[float64], indices: tuple[int, ...]) -> tuple[typing.NDArray, typing.NDArray]:
+        delta = np.zeros_like(spots)
+        vega = np.zeros_like(spots)
+
+        previous, previous_level = 0, spots
+        for i in indices:
+            level = np.asarray(paths[:, i], dtype=float64)
+            dt = self.times[i] - self.times[previous]
+            # standardized correlated shock over the interval, and C^-1 applied to it
+            u = (np.log(level / previous_level) - self.drifts * dt) / (self.vols * np.sqrt(dt))
+            v = u @ self.inv_correlation
+
+            if previous == 0:
+                delta = v / (spots * self.vols * np.sqrt(dt))
+            vega += (v * u - 1.0) / self.vols - v * np.sqrt(dt)
+            previous, previous_level = i, level
+
+        return delta, vega
+
+    @staticmethod
+    def stack(payoff: typing.NDArray, delta: typing.NDArray, vega: typing.NDArray) -> typing.NDArray[float64]:
+        # one row per path: [payoff (m), delta (m * d), vega (m * d)] for the running statistics
+        n = payoff.shape[0]
+        return np.concatenate([payoff.reshape(n, -1), delta.reshape(n, -1), vega.reshape(n, -1)], axis=1)
+
+    def results(self, config: SimulationConfig, stats: Union[RunningStats, ReplicatedStats], strikes_dates: list, method: str) -> dict:
+        total = stats.total if isinstance(stats, ReplicatedStats) else stats
+        std_error = stats.std_error if config.generator == 'sobol' else total.std_error
+        m, d = len(strikes_dates), self.d
+
+        means = {"price": total.mean[:m], "delta": total.mean[m:m + m * d].reshape(m, d), "vega": total.mean[m + m * d:].reshape(m, d)} #type: ignore
+        errors = {"price": std_error[:m], "delta": std_error[m:m + m * d].reshape(m, d), "vega": std_error[m + m * d:].reshape(m, d)}
+
+        results = {}
+        for i, strike_date in enumerate(strikes_dates):
+            results[strike_date] = {"price": means["price"][i], "std": total.std[i], "std_error": errors["price"][i], "greek_method": method}
+            for name in greek_names:
+                results[strike_date][name] = dict(zip(self.isins, means[name][i]))
+                results[strike_date][f"{name}_std_error"] = dict(zip(self.isins, errors[name][i]))
+        return results
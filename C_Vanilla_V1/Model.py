@@ -1,48 +1,178 @@
 
-from typing import Union, Literal
+from typing import Union, Literal, Iterable, Callable
 from datetime import date
 
-from numpy import typing, float64, where, round
+from numpy import typing, float64, where, round, ndarray, asarray, memmap, cumsum, log, exp, diff, random, errstate, empty, zeros_like
 
 from C_Vanilla_V1.Option import Digital_Option, Option_Call, Option_Put, Digital_Call, Digital_Put
 from C_Vanilla_V1.Barrier import Barrier_Feature
-from B_Model_V1.base import SimulationConfig
+from B_Model_V1.base import SimulationConfig, BasketModel, path_chunks, iter_rows, child_sequence
+from B_Model_V1.bs_model import BS_Model
+from B_Model_V1.accumulator import RunningStats, RunningCovariance, ReplicatedStats, ConvergenceTrace
+from C_Vanilla_V1.Greeks import Greeks_Estimator
+from C_Vanilla_V1.Analytic import vanilla_price, barrier_price
+from C_Vanilla_V1.Control import Control_Variates
+from C_Vanilla_V1.American import Longstaff_Schwartz
 
 accuracy_float = 6
+crossing_stream = 2 ** 32 + 1 # spawn key of the uniforms drawn for the barrier crossings
+
+def new_stats(config: SimulationConfig, block_size: Union[int, None] = None, factory: Callable = RunningStats) -> Union[RunningStats, RunningCovariance, ReplicatedStats]:
+    # per block statistics when asked for, or when the error has to come from QMC replications
+    block_size = block_size or config.replication_size
+    return factory() if block_size is None else ReplicatedStats(block_size, factory=factory)
+
+def pricing_results(config: SimulationConfig, stats: Union[RunningStats, ReplicatedStats], strikes_dates: list[date], trace: Union[ConvergenceTrace, None] = None) -> dict:
+    total = stats.total if isinstance(stats, ReplicatedStats) else stats
+    results = {d: {"price": total.mean[i], "std": total.std[i]} for i, d in enumerate(strikes_dates)} #type: ignore
+
+    if config.generator == 'sobol':
+        std_error = stats.std_error
+        for i, d in enumerate(strikes_dates):
+            results[d]["std_error"] = std_error[i]
+
+    if trace is not None:
+        # adaptive mode: paths used and the price / std error after each check
+        prices, std_errors = asarray(trace.prices), asarray(trace.std_errors)
+        for i, d in enumerate(strikes_dates):
+            results[d]["std_error"] = total.std_error[i]
+            results[d]["n_paths"] = total.count
+            results[d]["converged"] = trace.converged
+            results[d]["trace"] = {"n_paths": asarray(trace.n_paths), "price": prices[:, i], "std_error": std_errors[:, i]}
+
+    return results
+
+def new_trace(config: SimulationConfig) -> Union[ConvergenceTrace, None]:
+    # the target is checked once per random stream block (the antithetic pairs of a block are then complete)
+    if not config.adaptive:
+        return None
+    return ConvergenceTrace(config.target_std_error, config.target_relative, config.stream_size) #type: ignore
+
+def adaptive_chunks(config: SimulationConfig, paths):
+    # in memory paths are read by stream blocks in adaptive mode, so that pricing can stop early
+    if config.adaptive and not is_streamed(paths):
+        return iter_rows(paths, config.stream_size)
+    return path_chunks(paths, config.chunk_size)
+
+def end_trace(config: SimulationConfig, trace: Union[ConvergenceTrace, None], stats: Union[RunningStats, ReplicatedStats]) -> Union[ConvergenceTrace, None]:
+    if trace is None:
+        return None
+    trace.finish(stats)
+    if not trace.converged:
+        print(f"Warning: target std error {config.target_std_error} not reached with the budget of {stats.count} paths.")
+    return trace
+
+def crossing_uniforms(config: SimulationConfig, start: int, n: int) -> typing.NDArray[float64]:
+    # uniform of path p drawn from stream block p // stream_size of the config's seed sequence:
+    # the same draw whatever the chunking, the worker or the pass
+    size = config.stream_size
+    uniforms = empty(n, dtype=float64)
+    for i_block in range(start // size, -(-(start + n) // size)):
+        lo, hi = max(start, i_block * size), min(start + n, (i_block + 1) * size)
+        rng = random.default_rng(child_sequence(config.seed_sequence, crossing_stream, i_block))
+        uniforms[lo - start:hi - start] = rng.random(size)[lo - i_block * size:hi - i_block * size]
+    return uniforms
+
+def analytic_results(result: dict, strikes_dates: list[date]) -> dict:
+    return {d: {"price": result["price"][i], "std": result["std"][i], "method": "analytic"} for i, d in enumerate(strikes_dates)}
+
+def single_underlying(config: SimulationConfig, option, paths) -> bool:
+    # closed forms need the BS parameters of a single underlying, an EU option and the start level of the paths
+    return isinstance(config, BS_Model) and len(config.underlyings) == 1 and option.option_type == 'EU' and isinstance(paths, ndarray) and paths.ndim == 2
+
+def as_paths(paths, config: SimulationConfig):
+    # memory maps are kept as is (read by row chunks), other arrays are cast to the pipeline dtype
+    if isinstance(paths, memmap) or not isinstance(paths, ndarray):
+        return paths
+    return asarray(paths, dtype=config.dtype)
+
+def is_streamed(paths) -> bool:
+    return not isinstance(paths, ndarray) or isinstance(paths, memmap)
+
+def basket_of(config: SimulationConfig, paths: typing.NDArray[float64], basket_method: Literal['uniform', 'worst-of', 'best-of']) -> typing.NDArray[float64]:
+    return BasketModel(config=config, n_underlyings=paths.shape[2], basket_method=basket_method, paths=paths).reduce(paths)
+
+def control_prices(config: SimulationConfig, controls: Control_Variates, paths, underlying_paths, basket_method: Literal['uniform', 'worst-of', 'best-of'], strikes_dates: list[date], payoff_of: Callable) -> dict:
+    """
+    One pass over the underlying paths (the basket paths for a single underlying): payoff and controls
+    in a running covariance, then the price adjusted by the estimated betas. payoff_of(basket, start) -> payoff (n, m)
+    """
+    if underlying_paths is None:
+        if len(config.underlyings) != 1: #type: ignore
+            raise ValueError("Control variates need the underlying paths (n_sim, n_steps, d) the basket is built from.")
+        underlying_paths = paths
+
+    date_indices = config.calendar.index_of(strikes_dates)
+    stats = new_stats(config, factory=RunningCovariance)
+    expected = None
+    start = 0
+    for chunk in path_chunks(underlying_paths, config.chunk_size):
+        if chunk.ndim == 2:
+            chunk = chunk[..., None]
+        if expected is None:
+            expected = controls.expected(asarray(chunk[0, 0], dtype=float64), date_indices)
+
+        basket = basket_of(config, chunk, basket_method)
+        stats.update(controls.stack(payoff_of(basket, start), controls.values(chunk, basket, date_indices)), start)
+        start += chunk.shape[0]
+
+    if stats.count == 0:
+        raise ValueError("Path stream is empty or already consumed.")
+
+    return controls.results(stats, expected, strikes_dates) #type: ignore
+
+def sparse_model(model: BS_Model, strikes_dates: list[date], barrier_features: list[Barrier_Feature] = []) -> BS_Model:
+    """
+    Model simulated only at the dates the products observe: the union of the strike dates
+    and of the barrier observation dates (the last date when a barrier has none).
+    """
+    dates = set(model.calendar.nearest_dates(strikes_dates))
+    for barrier in barrier_features:
+        if barrier.calendar is None or barrier.observation_dates is None:
+            dates.add(model.calendar.get_dates[-1])
+        else:
+            dates.update(barrier.observation_dates)
+
+    return model.sparse(sorted(dates))
 
 class Vanilla_Model:
-    def __init__(self, option: Union[Option_Call, Option_Put, Digital_Call, Digital_Put], config: SimulationConfig, paths: typing.NDArray[float64], strikes_dates: list[date]):
+    def __init__(self, option: Union[Option_Call, Option_Put, Digital_Call, Digital_Put], config: SimulationConfig, paths: Union[typing.NDArray[float64], Iterable[typing.NDArray[float64]]], strikes_dates: list[date], analytic: bool = True):
         self.option = option
-        self.paths = round(paths, accuracy_float)
+        # closed form Black-Scholes price when the product and the model allow it, False forces Monte Carlo
+        self.analytic = analytic
+        # paths is either the full (n_sim, n_steps) basket array, a memory map or an iterable of chunks (streaming mode)
+        self.paths = as_paths(paths, config)
         self.config = config
         self.strikes_dates = strikes_dates
+        self.trace: Union[ConvergenceTrace, None] = None
+        self.timings: list[dict] = []
 
     def update_strikes_dates(self):
+        nearest_dates = self.config.calendar.nearest_dates(self.strikes_dates)
         for t in range(len(self.strikes_dates)):
-            nearest_date = self.config.calendar.get_nearest_time_index(self.strikes_dates[t])
+            nearest_date = nearest_dates[t]
             if nearest_date != self.strikes_dates[t]:
                 print(f"Updating strike date from {self.strikes_dates[t]} to nearest date {nearest_date}")
                 self.strikes_dates[t] = nearest_date
 
-    def reduce_to_strike_dates(self) -> typing.NDArray[float64]:
+    def reduce_to_strike_dates(self, paths: Union[typing.NDArray[float64], None] = None) -> typing.NDArray[float64]:
         if len(self.strikes_dates) == 0:
             raise ValueError("No strike dates provided.")    
         
-        date_indices = [self.config.calendar.get_dates.index(d) for d in self.strikes_dates]
-        reduced_paths = self.paths[:, date_indices]
+        paths = self.paths if paths is None else paths
+        date_indices = self.config.calendar.index_of(self.strikes_dates)
+        reduced_paths = paths[:, date_indices]
         
         return reduced_paths
     
     @staticmethod
-    def price_one_path(one_path: typing.NDArray[float64], option: Union[Option_Call, Option_Put, Digital_Call, Digital_Put], spot: Union[float, float64]) -> dict[str, Union[float, float64]]:
+    def payoff(one_path: typing.NDArray[float64], option: Union[Option_Call, Option_Put, Digital_Call, Digital_Put], spot: Union[float, float64]) -> typing.NDArray[float64]:
+        # vectorized over any shape of one_path, e.g. (n_sim,) or (n_sim, n_dates)
         
         strike = option.strike_price
         rebate = 0.0
         payout = 0.0
 
-        price_mean: Union[float, float64] 
-        price_std: Union[float, float64]
-
         if option.value_method == 'absolute':
             strike_value = strike
             rebate = option.rebate
@@ -61,38 +191,58 @@ class Vanilla_Model:
             if isinstance(option, Option_Call):
                 levier = option.levier
                 one_path_final = where(one_path > strike_value, levier * (one_path - strike_value), rebate)
-                price_mean = one_path_final.mean()
-                price_std = one_path_final.std()
                 
             if isinstance(option, Option_Put):
                 levier = option.levier
                 one_path_final = where(one_path < strike_value, levier * (strike_value - one_path), rebate)
-                price_mean = one_path_final.mean()
-                price_std = one_path_final.std()
 
             if isinstance(option, Digital_Call):
 
                 one_path_final = where(one_path > strike_value, payout, rebate)
-                price_mean = one_path_final.mean()
-                price_std = one_path_final.std()
             
             if isinstance(option, Digital_Put):
 
                 one_path_final = where(one_path < strike_value, payout, rebate)
-                price_mean = one_path_final.mean()
-                price_std = one_path_final.std()
 
         elif option.option_type == 'US':
-            raise NotImplementedError("American option pricing not implemented yet.")
+            # the value of an American option depends on the exercise policy, not on the path at a given date
+            raise ValueError("An American option has no payoff at a fixed date: price it with Vanilla_Model.price or Book_Pricer (Longstaff-Schwartz).")
+
+        return one_path_final
 
-        price = price_mean
-        std = price_std
+    @staticmethod
+    def price_one_path(one_path: typing.NDArray[float64], option: Union[Option_Call, Option_Put, Digital_Call, Digital_Put], spot: Union[float, float64]) -> dict[str, Union[float, float64]]:
+        
+        one_path_final = Vanilla_Model.payoff(one_path, option, spot)
+
+        price = one_path_final.mean(dtype=float64)
+        std = one_path_final.std(dtype=float64)
         return {"price": price, "std": std}
 
-    def price(self, spot: float = 1.0) -> dict:
+    def price(self, spot: float = 1.0, greeks: bool = False, underlying_paths: Union[typing.NDArray[float64], Iterable[typing.NDArray[float64]], None] = None, control: Union[str, list[str], None] = None, rate: Union[float, None] = None) -> dict:
+        # greeks: price, deltas and vegas from the underlying paths (n_sim, n_steps, d) in one pass
+        # control: 'spot' and / or 'geometric' control variates, same underlying paths
+        # rate: discount rate of the American exercise ('US'), read on the BS_Model when None
         
         pricing_dict: dict[date, dict[str, Union[float, float64]]] = {}
 
+        if self.option.option_type == 'US':
+            if greeks or control is not None:
+                raise ValueError("Greeks and control variates need a payoff at fixed dates, not available for American exercise: price it without greeks and control.")
+            return self.price_american(spot, rate=rate)
+
+        if greeks:
+            return self.price_greeks(spot, underlying_paths)
+
+        if control is not None:
+            return self.price_control(spot, control, underlying_paths)
+
+        if self.analytic_allowed():
+            return self.price_analytic(spot)
+
+        if is_streamed(self.paths) or self.config.generator == 'sobol' or self.config.adaptive:
+            return self.price_streaming(spot)
+
         dates_i = 0
         for path in self.reduce_to_strike_dates().T:
             price_std = self.price_one_path(path, self.option, spot)
@@ -101,11 +251,114 @@ class Vanilla_Model:
 
         return pricing_dict
 
+    def analytic_allowed(self) -> bool:
+        return self.analytic and single_underlying(self.config, self.option, self.paths)
+
+    def price_analytic(self, spot: float = 1.0) -> dict:
+        # same expectation as the Monte Carlo price (undiscounted), S0 read on the paths (spot or 1.0 for percentage paths)
+        params = next(iter(self.config.underlyings.values())) #type: ignore
+        times = cumsum(self.config.calendar.get_time_dt)[self.config.calendar.index_of(self.strikes_dates)]
+        result = vanilla_price(self.option, float(self.paths[0, 0]), params.vol, params.rate, params.div, times, spot) #type: ignore
+        return analytic_results(result, self.strikes_dates)
+
+    def price_american(self, spot: float = 1.0, degree: int = 3, rate: Union[float, None] = None) -> dict:
+        """
+        Longstaff-Schwartz on the paths of the model, basket (n_sim, n_steps) or underlyings (n_sim, n_steps, d)
+        reduced with the option's basket_method, array or memory map read one date at a time (never loaded whole),
+        per regression timings in self.timings.
+        rate: discount rate, read on the BS_Model (common rate of the underlyings) when None
+        """
+        if not isinstance(self.paths, ndarray):
+            raise ValueError("American exercise reads the paths backward: pass them as an array or a memory map, a chunk stream is read once.")
+        if self.paths.ndim not in [2, 3]:
+            raise ValueError("American exercise needs basket paths (n_sim, n_steps) or underlying paths (n_sim, n_steps, d).")
+        if rate is None and not isinstance(self.config, BS_Model):
+            raise ValueError("American exercise on a SimulationConfig needs the discount rate: price(..., rate=r).")
+
+        engine = Longstaff_Schwartz(self.config, self.option, self.strikes_dates, self.paths, degree=degree, rate=rate) #type: ignore
+        results = engine.price(spot)
+        self.timings = engine.timings
+        return results
+
+    def accumulate(self, spot: float = 1.0, start: int = 0, block_size: Union[int, None] = None) -> Union[RunningStats, ReplicatedStats]:
+        # consumes the chunk iterator once, peak memory is set by the chunk size
+        # start is the index of the first path, block_size splits the statistics by blocks of paths
+        
+        # adaptive mode stops at the first check meeting the target, the rest of the stream is never generated
+        
+        stats = new_stats(self.config, block_size)
+        trace = new_trace(self.config)
+        for chunk in adaptive_chunks(self.config, self.paths):
+            reduced = self.reduce_to_strike_dates(chunk)
+            stats.update(self.payoff(reduced, self.option, spot), start)
+            start += chunk.shape[0]
+            if trace is not None and trace.update(stats):
+                break
+
+        if stats.count == 0:
+            raise ValueError("Path stream is empty or already consumed.")
+
+        self.trace = end_trace(self.config, trace, stats)
+        return stats
+
+    def price_streaming(self, spot: float = 1.0) -> dict:
+        stats = self.accumulate(spot)
+        return pricing_results(self.config, stats, self.strikes_dates, self.trace)
+
+    def price_control(self, spot: float = 1.0, control: Union[str, list[str]] = 'geometric', underlying_paths: Union[typing.NDArray[float64], Iterable[typing.NDArray[float64]], None] = None) -> dict:
+        payoff_of = lambda basket: self.payoff(basket, self.option, spot)
+        controls = Control_Variates(self.config, self.option, control, payoff_of, spot)
+        if 'vanilla' in controls.controls:
+            raise ValueError("The 'vanilla' control is the payoff itself without a barrier, use 'spot' or 'geometric'.")
+
+        date_indices = self.config.calendar.index_of(self.strikes_dates)
+        return control_prices(self.config, controls, self.paths, underlying_paths, self.option.basket_method, self.strikes_dates, lambda basket, start: payoff_of(basket[:, date_indices]))
+
+    def price_greeks(self, spot: float = 1.0, underlying_paths: Union[typing.NDArray[float64], Iterable[typing.NDArray[float64]], None] = None) -> dict:
+        if underlying_paths is None:
+            raise ValueError("Greeks need the underlying paths (n_sim, n_steps, d) the basket is built from.")
+
+        estimator = Greeks_Estimator(self.config, self.option.basket_method)
+        pathwise = estimator.pathwise_allowed(self.option)
+        date_indices = self.config.calendar.index_of(self.strikes_dates)
+
+        stats = new_stats(self.config)
+        start = 0
+        for chunk in path_chunks(underlying_paths, self.config.chunk_size):
+            basket = basket_of(self.config, chunk, self.option.basket_method)[:, date_indices]
+            payoff = self.payoff(basket, self.option, spot)
+
+            if pathwise:
+                delta, vega = estimator.pathwise(chunk, date_indices, estimator.payoff_slope(basket, self.option, spot)) #type: ignore
+            else:
+                delta, vega = estimator.scores(chunk, [[i] for i in date_indices])
+                delta *= payoff[..., None]
+                vega *= payoff[..., None]
+
+            stats.update(estimator.stack(payoff, delta, vega), start)
+            start += chunk.shape[0]
+
+        if stats.count == 0:
+            raise ValueError("Path stream is empty or already consumed.")
+
+        return estimator.results(self.config, stats, self.strikes_dates, 'pathwise' if pathwise else 'likelihood_ratio')
+
 class Barrier_Model:
-    def __init__(self, barrier_feature: Barrier_Feature, config: SimulationConfig, paths: typing.NDArray[float64]):
+    # bridge_method: continuous monitoring hits as a probability ('probability') or as a 0 / 1 draw ('uniform')
+    # start: global index of the first path, the uniform of a path depends on its index only (same draws across chunks and workers)
+    # bridge_model: BS_Model giving the bridge variance when config is not one (e.g. the reduced calendar of Pricing_Pipeline),
+    # variance: the bridge variance per interval of the window when already computed
+    def __init__(self, barrier_feature: Barrier_Feature, config: SimulationConfig, paths: typing.NDArray[float64], bridge_method: Literal['probability', 'uniform'] = 'probability', start: int = 0, bridge_model: Union[BS_Model, None] = None, variance: Union[typing.NDArray[float64], None] = None):
+        if bridge_method not in ['probability', 'uniform']:
+            raise ValueError("bridge_method must be 'probability' or 'uniform'.")
+
         self.barrier_feature = barrier_feature
         self.config = config
-        self.paths = round(paths, accuracy_float)
+        self.paths = as_paths(paths, config)
+        self.bridge_method = bridge_method
+        self.start = start
+        self.bridge_model = bridge_model
+        self.variance = variance
         
         self.level: float64
 
@@ -114,7 +367,7 @@ class Barrier_Model:
         method = self.barrier_feature.value_method
         barrier_level = self.barrier_feature.barrier_level
 
-        self.level = round(float64(barrier_level), accuracy_float)
+        self.level = round(float64(barrier_level), accuracy_float).astype(self.config.dtype)
 
         return self.level
     
@@ -122,7 +375,7 @@ class Barrier_Model:
 
         value_if_activated:int = 1
         value_if_not_activated:int = 0
-        tmp_array = self.barrier_feature.reduce_to_strike_dates(self.paths)
+        tmp_array = self.barrier_feature.reduce_to_strike_dates(self.paths, self.config.calendar)
 
         if self.barrier_feature.barrier_mecanism in ['U&I']:
             observed = where(tmp_array >= self.levels(), value_if_activated, value_if_not_activated)
@@ -138,8 +391,96 @@ class Barrier_Model:
 
         return observed
     
+    def window(self) -> tuple[int, int]:
+        # grid indices of the first and last observations, the whole grid without observation dates
+        calendar = self.config.calendar
+        if self.barrier_feature.calendar is None or self.barrier_feature.observation_dates is None:
+            return 0, calendar.n_steps - 1 #type: ignore
+        indices = calendar.index_of(self.barrier_feature.observation_dates)
+        return int(indices.min()), int(indices.max())
+
+    def bridge_variance(self, vol: Union[float, None] = None) -> typing.NDArray[float64]:
+        """
+        Variance vol^2 dt of the log level over each interval of the window, from the model parameters:
+        the same for every path, chunk and worker. Only a single Black-Scholes underlying has a constant one.
+        vol: volatility of the bridge when not the model's (e.g. a vol bumped scenario)
+        """
+        if self.variance is not None and vol is None:
+            return self.variance
+        model = self.config if isinstance(self.config, BS_Model) else self.bridge_model
+        if model is None:
+            raise ValueError("Continuous monitoring needs the BS_Model volatility, pass bridge_model with a plain SimulationConfig.")
+        if len(model.underlyings) != 1:
+            raise ValueError("Continuous monitoring needs a single underlying: the log of a basket has no constant variance to bridge with.")
+
+        lo, hi = self.window()
+        vol = next(iter(model.underlyings.values())).vol if vol is None else vol
+        return vol ** 2 * self.config.calendar.get_time_dt[lo + 1:hi + 1]
+
+    def crossings(self) -> tuple[typing.NDArray[float64], typing.NDArray[float64], typing.NDArray]:
+        # log distances (n_sim, k + 1) of the window's grid points to the level, exponents (n_sim, k) of the k crossing
+        # probabilities exp(-2 log(S_i / B) log(S_i+1 / B) / (vol^2 dt)) (-inf without variance), paths with a point beyond
+        lo, hi = self.window()
+        distance = log(asarray(self.paths[:, lo:hi + 1], dtype=float64) / float64(self.levels()))
+        up = self.barrier_feature.barrier_mecanism in ['U&I', 'U&O']
+        breached = distance >= 0 if up else distance <= 0
+
+        variance = self.bridge_variance()
+        with errstate(divide='ignore', invalid='ignore'):
+            exponent = where(variance > 0, -2.0 * distance[:, :-1] * distance[:, 1:] / variance, -float64('inf'))
+        return distance, exponent, breached.any(axis=1)
+
+    def survival(self) -> typing.NDArray[float64]:
+        """
+        Probability (n_sim,) that the path stays on its side of the level over the window, given the grid points:
+        product over the intervals of 1 - exp(-2 log(S_i / B) log(S_i+1 / B) / (vol^2 dt)), 0 when a grid point is beyond
+        """
+        _, exponent, breached = self.crossings()
+        survived = (1.0 - exp(exponent)).prod(axis=1)
+        return where(breached, 0.0, survived)
+
+    def survival_sensitivities(self, vol: float) -> tuple[typing.NDArray[float64], typing.NDArray[float64]]:
+        """
+        Derivatives (n_sim,) of survival() with respect to the first level of the paths and to vol, the grid points fixed:
+        the dependence the likelihood ratio weights of the grid points leave out. For each crossing probability c = exp(x),
+        x = -2 log(S_i / B) log(S_i+1 / B) / (vol^2 dt): dc / dvol = -2 c x / vol,
+        and the first interval of a window opening at the start date moves with S_0: dc / dS_0 = -2 c log(S_1 / B) / (vol^2 dt S_0)
+        """
+        lo, _ = self.window()
+        distance, exponent, breached = self.crossings()
+        crossing = exp(exponent)
+        # c x is 0 without variance (x = -inf), paths never breached have every c < 1
+        weighted = crossing * where(crossing > 0, exponent, 0.0)
+        survived = where(breached, 0.0, (1.0 - crossing).prod(axis=1))
+
+        with errstate(divide='ignore', invalid='ignore'):
+            # d log(1 - c) = -dc / (1 - c)
+            d_vol = where(breached, 0.0, survived * (2.0 * weighted / (vol * (1.0 - crossing))).sum(axis=1))
+            d_spot = zeros_like(survived)
+            if lo == 0:
+                spots = asarray(self.paths[:, 0], dtype=float64)
+                d_crossing = -2.0 * crossing[:, 0] * distance[:, 1] / (self.bridge_variance()[0] * spots)
+                d_spot = where(breached, 0.0, -survived * d_crossing / (1.0 - crossing[:, 0]))
+        return d_spot, d_vol
+
+    def continuous_activation(self, method_obs: Literal["Best", "Worst", "Last", "First", "Above_Mean"]) -> typing.NDArray:
+        knock_in = self.barrier_feature.barrier_mecanism in ['U&I', 'D&I']
+        # a hit anywhere in the window: the continuous version of 'Best' (knock in) and 'Worst' (knock out)
+        if method_obs != ("Best" if knock_in else "Worst"):
+            raise ValueError("Continuous monitoring observes the whole window: use 'Best' for knock in and 'Worst' for knock out barriers.")
+
+        hit = 1.0 - self.survival()
+        if self.bridge_method == 'uniform':
+            hit = (crossing_uniforms(self.config, self.start, hit.shape[0]) < hit).astype(int)
+
+        return hit if knock_in else 1 - hit
+
     def apply_observe_method(self, method_obs: Literal["Best", "Worst", "Last", "First", "Above_Mean"]):
 
+        if self.barrier_feature.monitoring == 'continuous':
+            results = self.continuous_activation(method_obs)
+            return results.reshape((results.shape[0], 1))
+
         observations = self.observe()
 
         if method_obs == "Best":
@@ -157,9 +498,12 @@ class Barrier_Model:
         return results.reshape((results.shape[0], 1))
     
 class Vanilla_Barrier_Model:
-    def __init__(self, option: Union[Option_Call, Option_Put, Digital_Call, Digital_Put], barrier_feature: Barrier_Feature, config: SimulationConfig, paths: typing.NDArray[float64], strikes_dates: list[date], barrier_method: Literal["Best", "Worst", "Last", "First", "Above_Mean"], rebate_if_not_activated: bool = True):
+    def __init__(self, option: Union[Option_Call, Option_Put, Digital_Call, Digital_Put], barrier_feature: Barrier_Feature, config: SimulationConfig, paths: Union[typing.NDArray[float64], Iterable[typing.NDArray[float64]]], strikes_dates: list[date], barrier_method: Literal["Best", "Worst", "Last", "First", "Above_Mean"], rebate_if_not_activated: bool = True, analytic: bool = True, bridge_method: Literal['probability', 'uniform'] = 'probability', bridge_model: Union[BS_Model, None] = None):
         
         self.Sim_config = config
+        self.analytic = analytic
+        # continuous monitoring only: crossing probabilities as weights, or drawn hits
+        self.bridge_method: Literal['probability', 'uniform'] = bridge_method
         
         self.option = option
         self.barrier = barrier_feature
@@ -167,10 +511,16 @@ class Vanilla_Barrier_Model:
         self.rebate_if_not_activated = rebate_if_not_activated
 
         self.strikes_dates = strikes_dates
-        self.paths = round(paths, accuracy_float)
+        self.paths = as_paths(paths, config)
+        self.trace: Union[ConvergenceTrace, None] = None
         self.update_strikes_dates()
         
         self.warning_dates()
+
+        # continuous monitoring: bridge variance computed once from the model, before any chunk is read
+        self.bridge_variance: Union[typing.NDArray[float64], None] = None
+        if self.barrier.monitoring == 'continuous':
+            self.bridge_variance = Barrier_Model(self.barrier, config, self.paths, bridge_model=bridge_model).bridge_variance()
         
     def warning_dates(self):
         
@@ -184,17 +534,18 @@ class Vanilla_Barrier_Model:
                     return None
 
     def update_strikes_dates(self):
+        nearest_dates = self.Sim_config.calendar.nearest_dates(self.strikes_dates)
         for t in range(len(self.strikes_dates)):
-            nearest_date = self.Sim_config.calendar.get_nearest_time_index(self.strikes_dates[t])
+            nearest_date = nearest_dates[t]
             if nearest_date != self.strikes_dates[t]:
                 print(f"Updating strike date from {self.strikes_dates[t]} to nearest date {nearest_date}")
                 self.strikes_dates[t] = nearest_date
 
-    def get_path_option(self) -> typing.NDArray[float64]:
+    def get_path_option(self, paths: Union[typing.NDArray[float64], None] = None) -> typing.NDArray[float64]:
         vanilla_model = Vanilla_Model(
             option=self.option,
             config=self.Sim_config,
-            paths=self.paths,
+            paths=self.paths if paths is None else paths,
             strikes_dates=self.strikes_dates
         )
 
@@ -202,11 +553,15 @@ class Vanilla_Barrier_Model:
 
         return reduced_paths
     
-    def get_path_barrier(self) -> typing.NDArray[float64]:
+    def get_path_barrier(self, paths: Union[typing.NDArray[float64], None] = None, start: int = 0, variance: Union[typing.NDArray[float64], None] = None) -> typing.NDArray[float64]:
+        # variance: bridge variance of continuous monitoring when not the model's (e.g. a vol bumped scenario)
         barrier_model = Barrier_Model(
             barrier_feature=self.barrier,
             config=self.Sim_config,
-            paths=self.paths
+            paths=self.paths if paths is None else paths,
+            bridge_method=self.bridge_method,
+            start=start,
+            variance=self.bridge_variance if variance is None else variance
         )
 
         barrier_observed = barrier_model.apply_observe_method(self.barrier_method)
@@ -214,17 +569,13 @@ class Vanilla_Barrier_Model:
         return barrier_observed
     
     
-    def price_one_path(self, one_path_equity: typing.NDArray[float64], one_path_barrier: typing.NDArray[float64], spot: float = 1.0) -> dict[str, Union[float, float64]]:
+    def payoff(self, one_path_equity: typing.NDArray[float64], barrier_activated: typing.NDArray[float64], spot: float = 1.0) -> typing.NDArray[float64]:
+        # vectorized: barrier_activated broadcasts against one_path_equity, e.g. (n_sim,) or (n_sim, 1) vs (n_sim, n_dates)
 
         strike = self.option.strike_price
         rebate = 0.0
         payout = 0.0
 
-        barrier_activated = one_path_barrier[0]
-
-        price_mean: Union[float, float64] 
-        price_std: Union[float, float64]
-
         if self.option.value_method == 'absolute':
             strike_value = strike
             rebate = self.option.rebate
@@ -247,9 +598,6 @@ class Vanilla_Barrier_Model:
                     one_path_final = where(one_path_equity > strike_value, levier * (one_path_equity - strike_value) * barrier_activated + rebate * (1 - barrier_activated), rebate)
                 else:
                     one_path_final = where(one_path_equity > strike_value, levier * (one_path_equity - strike_value) * barrier_activated, rebate * barrier_activated)
-
-                price_mean = one_path_final.mean()
-                price_std = one_path_final.std()
         
             if isinstance(self.option, Option_Put):
                 levier = self.option.levier
@@ -259,18 +607,12 @@ class Vanilla_Barrier_Model:
                 else:
                     one_path_final = where(one_path_equity < strike_value, levier * (strike_value - one_path_equity) * barrier_activated, rebate * barrier_activated)
 
-                price_mean = one_path_final.mean()
-                price_std = one_path_final.std()
-
             if isinstance(self.option, Digital_Call):
 
                 if self.rebate_if_not_activated:
                     one_path_final = where(one_path_equity > strike_value, payout * barrier_activated + rebate * (1 - barrier_activated), rebate)
                 else:
                     one_path_final = where(one_path_equity > strike_value, payout * barrier_activated, rebate * barrier_activated)
-
-                price_mean = one_path_final.mean()
-                price_std = one_path_final.std()
             
             if isinstance(self.option, Digital_Put):
                 
@@ -278,22 +620,42 @@ class Vanilla_Barrier_Model:
                     one_path_final = where(one_path_equity < strike_value, payout * barrier_activated + rebate * (1 - barrier_activated), rebate)
                 else:
                     one_path_final = where(one_path_equity < strike_value, payout * barrier_activated, rebate * barrier_activated)
-                
-                price_mean = one_path_final.mean()
-                price_std = one_path_final.std()
 
         elif self.option.option_type == 'US':
-            raise NotImplementedError("American option pricing not implemented yet.")
+            raise ValueError("American exercise with a barrier is not supported: the activation depends on the past of the path, which the backward induction does not keep.")
+
+        return one_path_final
+
+    def price_one_path(self, one_path_equity: typing.NDArray[float64], one_path_barrier: typing.NDArray[float64], spot: float = 1.0) -> dict[str, Union[float, float64]]:
+
+        barrier_activated = one_path_barrier[0]
 
+        one_path_final = self.payoff(one_path_equity, barrier_activated, spot)
 
-        price = price_mean
-        std = price_std
+        price = one_path_final.mean(dtype=float64)
+        std = one_path_final.std(dtype=float64)
         return {"price": price, "std": std}
 
-    def price(self, spot: float = 1.0) -> dict:
+    def price(self, spot: float = 1.0, greeks: bool = False, underlying_paths: Union[typing.NDArray[float64], Iterable[typing.NDArray[float64]], None] = None, control: Union[str, list[str], None] = None) -> dict:
         
         pricing_dict: dict[date, dict[str, Union[float, float64]]] = {}
 
+        if self.option.option_type == 'US':
+            # the activation depends on the past of the path, which the backward induction does not keep
+            raise ValueError("American exercise with a barrier is not supported, price the option with Vanilla_Model without barrier.")
+
+        if greeks:
+            return self.price_greeks(spot, underlying_paths)
+
+        if control is not None:
+            return self.price_control(spot, control, underlying_paths)
+
+        if self.analytic_allowed():
+            return self.price_analytic(spot)
+
+        if is_streamed(self.paths) or self.Sim_config.generator == 'sobol' or self.Sim_config.adaptive:
+            return self.price_streaming(spot)
+
         equity = self.get_path_option().T
         barrier = self.get_path_barrier().T
 
@@ -302,4 +664,133 @@ class Vanilla_Barrier_Model:
             pricing_dict[self.strikes_dates[i_sim]] = price_std
             pass
 
-        return pricing_dict
\ No newline at end of file
+        return pricing_dict
+
+    def observation_index(self) -> Union[int, None]:
+        # grid index of the single barrier observation, None when the barrier is observed on several dates
+        calendar = self.Sim_config.calendar
+        if self.barrier.calendar is None or self.barrier.observation_dates is None:
+            return calendar.n_steps - 1 #type: ignore
+        indices = set(calendar.index_of(self.barrier.observation_dates))
+        return indices.pop() if len(indices) == 1 else None
+
+    def continuous_window(self) -> Union[int, None]:
+        # continuous monitoring from the start date up to every strike date: the window end, None otherwise
+        lo, hi = Barrier_Model(self.barrier, self.Sim_config, self.paths).window()
+        knock_in = self.barrier.barrier_mecanism in ['U&I', 'D&I']
+        if lo != 0 or self.barrier_method != ("Best" if knock_in else "Worst"):
+            return None
+        return hi if set(self.Sim_config.calendar.index_of(self.strikes_dates)) == {hi} else None
+
+    def analytic_allowed(self) -> bool:
+        if not (self.analytic and single_underlying(self.Sim_config, self.option, self.paths)):
+            return False
+        if self.barrier.monitoring == 'continuous':
+            index = self.continuous_window()
+            return index is not None and index > 0
+        # one observation: the activation is an event on a single date, 'US' (every date) stays in Monte Carlo
+        if self.barrier.barrier_exercise != 'EU':
+            return False
+        index = self.observation_index()
+        return index is not None and index > 0
+
+    def price_analytic(self, spot: float = 1.0) -> dict:
+        calendar = self.Sim_config.calendar
+        params = next(iter(self.Sim_config.underlyings.values())) #type: ignore
+        times = cumsum(calendar.get_time_dt)
+        result = barrier_price(
+            self.option,
+            float(self.paths[0, 0]), #type: ignore
+            params.vol, params.rate, params.div,
+            times[calendar.index_of(self.strikes_dates)],
+            self.barrier.barrier_mecanism, #type: ignore
+            float(self.barrier.barrier_level),
+            t_obs=None if self.barrier.monitoring == 'continuous' else times[self.observation_index()],
+            rebate_if_not_activated=self.rebate_if_not_activated,
+            value_spot=spot
+        )
+        return analytic_results(result, self.strikes_dates)
+
+    def accumulate(self, spot: float = 1.0, start: int = 0, block_size: Union[int, None] = None) -> Union[RunningStats, ReplicatedStats]:
+        # consumes the chunk iterator once, peak memory is set by the chunk size
+
+        stats = new_stats(self.Sim_config, block_size)
+        trace = new_trace(self.Sim_config)
+        for chunk in adaptive_chunks(self.Sim_config, self.paths):
+            equity = self.get_path_option(chunk)
+            barrier = self.get_path_barrier(chunk, start)
+            stats.update(self.payoff(equity, barrier, spot), start)
+            start += chunk.shape[0]
+            if trace is not None and trace.update(stats):
+                break
+
+        if stats.count == 0:
+            raise ValueError("Path stream is empty or already consumed.")
+
+        self.trace = end_trace(self.Sim_config, trace, stats)
+        return stats
+
+    def price_streaming(self, spot: float = 1.0) -> dict:
+        stats = self.accumulate(spot)
+        return pricing_results(self.Sim_config, stats, self.strikes_dates, self.trace)
+
+    def price_control(self, spot: float = 1.0, control: Union[str, list[str]] = 'vanilla', underlying_paths: Union[typing.NDArray[float64], Iterable[typing.NDArray[float64]], None] = None) -> dict:
+        # controls are priced without the barrier: the vanilla payoff on the basket or on the geometric basket
+        controls = Control_Variates(self.Sim_config, self.option, control, lambda basket: Vanilla_Model.payoff(basket, self.option, spot), spot)
+        payoff_of = lambda basket, start: self.payoff(self.get_path_option(basket), self.get_path_barrier(basket, start), spot)
+        return control_prices(self.Sim_config, controls, self.paths, underlying_paths, self.option.basket_method, self.strikes_dates, payoff_of)
+
+    def observed_indices(self) -> list[list[int]]:
+        # grid indices each strike date column depends on: its own date and the barrier observations,
+        # every grid point of the window for continuous monitoring
+        calendar = self.Sim_config.calendar
+        if self.barrier.monitoring == 'continuous':
+            lo, hi = Barrier_Model(self.barrier, self.Sim_config, self.paths).window()
+            barrier_indices = list(range(lo, hi + 1))
+        elif self.barrier.calendar is None or self.barrier.observation_dates is None:
+            barrier_indices = [calendar.n_steps - 1]
+        else:
+            barrier_indices = list(calendar.index_of(self.barrier.observation_dates))
+        return [barrier_indices + [i] for i in calendar.index_of(self.strikes_dates)]
+
+    def price_greeks(self, spot: float = 1.0, underlying_paths: Union[typing.NDArray[float64], Iterable[typing.NDArray[float64]], None] = None) -> dict:
+        # the barrier indicator is discontinuous: likelihood ratio weights for every payoff.
+        # continuous monitoring: the survival probability also depends on the spot and the vol given the grid points,
+        # its derivatives are added (the payoff is affine in the activation)
+        if underlying_paths is None:
+            raise ValueError("Greeks need the underlying paths (n_sim, n_steps, d) the basket is built from.")
+        continuous = self.barrier.monitoring == 'continuous'
+        if continuous and self.bridge_method != 'probability':
+            raise ValueError("Greeks of a continuous barrier need bridge_method='probability': a drawn hit has no derivative.")
+
+        estimator = Greeks_Estimator(self.Sim_config, self.option.basket_method)
+        observed = self.observed_indices()
+        knock_in = self.barrier.barrier_mecanism in ['U&I', 'D&I']
+
+        stats = new_stats(self.Sim_config)
+        start = 0
+        for chunk in path_chunks(underlying_paths, self.Sim_config.chunk_size):
+            basket = basket_of(self.Sim_config, chunk, self.option.basket_method)
+            equity = self.get_path_option(basket)
+            payoff = self.payoff(equity, self.get_path_barrier(basket, start), spot)
+
+            delta, vega = estimator.scores(chunk, observed)
+            delta *= payoff[..., None]
+            vega *= payoff[..., None]
+
+            if continuous:
+                survival = Barrier_Model(self.barrier, self.Sim_config, basket, variance=self.bridge_variance)
+                d_spot, d_vol = survival.survival_sensitivities(estimator.vols[0])
+                jump = self.payoff(equity, 1.0, spot) - self.payoff(equity, 0.0, spot)
+                if knock_in:
+                    jump = -jump
+                delta += (jump * d_spot[:, None])[..., None]
+                vega += (jump * d_vol[:, None])[..., None]
+
+            stats.update(estimator.stack(payoff, delta, vega), start)
+            start += chunk.shape[0]
+
+        if stats.count == 0:
+            raise ValueError("Path stream is empty or already consumed.")
+
+        return estimator.results(self.Sim_config, stats, self.strikes_dates, 'likelihood_ratio')
@@ -0,0 +1,125 @@
+from typing import Union, Literal, Optional
+from datetime import date
+from dataclasses import replace
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from os import cpu_count
+
+from numpy import ndarray, float64
+
+from C_Vanilla_V1.Option import Option_Call, Option_Put, Digital_Call, Digital_Put
+from C_Vanilla_V1.Barrier import Barrier_Feature
+from C_Vanilla_V1.Model import Vanilla_Model, Vanilla_Barrier_Model, pricing_results
+from B_Model_V1.base import BasketModel
+from B_Model_V1.bs_model import BS_Model
+from B_Model_V1.accumulator import RunningStats, ReplicatedStats
+
+def _stats_view(shm: shared_memory.SharedMemory, n_blocks: int, n_dates: int) -> ndarray:
+    # one row per random stream block: [count, mean per date, m2 per date]
+    return ndarray((n_blocks, 1 + 2 * n_dates), dtype=float64, buffer=shm.buf)
+
+def _price_slice(pricer: "Parallel_Pricer", spot: float, start: int, stop: int, i_slice: int, n_blocks: int, shm_name: str) -> int:
+    model = pricer.model
+    if pricer.path_method == 'value':
+        paths = model.iter_bs_value(pricer.chunk_size, start, stop)
+    else:
+        paths = model.iter_bs_percentage(pricer.chunk_size, start, stop)
+
+    basket_paths = BasketModel(
+        config=model,
+        n_underlyings=len(model.underlyings),
+        basket_method=pricer.basket_method,
+        paths=paths
+    ).apply_basket_method()
+
+    if pricer.barrier_feature is None:
+        slice_model = Vanilla_Model(option=pricer.option, config=model, paths=basket_paths, strikes_dates=list(pricer.strikes_dates))
+    else:
+        slice_model = Vanilla_Barrier_Model(
+            option=pricer.option,
+            barrier_feature=pricer.barrier_feature,
+            config=model,
+            paths=basket_paths,
+            strikes_dates=list(pricer.strikes_dates),
+            barrier_method=pricer.barrier_method, #type: ignore
+            rebate_if_not_activated=pricer.rebate_if_not_activated
+        )
+
+    stats = slice_model.accumulate(spot, start=start, block_size=model.Paths.stream_size)
+
+    n_dates = len(pricer.strikes_dates)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        view = _stats_view(shm, n_blocks, n_dates)
+        for i_block, block_stats in stats.blocks.items(): #type: ignore
+            view[i_block, 0] = block_stats.count
+            view[i_block, 1:1 + n_dates] = block_stats.mean
+            view[i_block, 1 + n_dates:] = block_stats.m2
+    finally:
+        shm.close()
+
+    return i_slice
+
+class Parallel_Pricer:
+    """
+    Splits n_paths across a process pool. Each worker simulates and prices its own slice of paths
+    (same streams as the single process run) and writes its running statistics into shared memory,
+    which are then merged.
+    """
+    def __init__(self, model: BS_Model, option: Union[Option_Call, Option_Put, Digital_Call, Digital_Put], strikes_dates: list[date], basket_method: Literal['uniform', 'worst-of', 'best-of'] = 'uniform', path_method: Literal['value', 'percentage'] = 'value', barrier_feature: Union[Barrier_Feature, None] = None, barrier_method: Optional[Literal["Best", "Worst", "Last", "First", "Above_Mean"]] = None, rebate_if_not_activated: bool = True, n_workers: Optional[int] = None, chunk_size: Optional[int] = None):
+
+        if barrier_feature is not None and barrier_method is None:
+            raise ValueError("barrier_method must be provided with a barrier_feature.")
+
+        if path_method not in ['value', 'percentage']:
+            raise ValueError("path_method must be 'value' or 'percentage'.")
+
+        if model.adaptive:
+            raise ValueError("Adaptive mode stops on the merged error, price it in a single process with streamed paths.")
+
+        # lazy copy of the model: workers only receive the parameters, never a materialized PathBlock
+        self.model = replace(model, chunk_size=chunk_size or model.chunk_size or model.Paths.stream_size)
+        self.chunk_size = self.model.chunk_size
+
+        self.option = option
+        self.strikes_dates = model.calendar.nearest_dates(strikes_dates)
+        self.basket_method: Literal['uniform', 'worst-of', 'best-of'] = basket_method
+        self.path_method = path_method
+        self.barrier_feature = barrier_feature
+        self.barrier_method = barrier_method
+        self.rebate_if_not_activated = rebate_if_not_activated
+        self.n_workers = n_workers or cpu_count() or 1
+
+    def slices(self) -> list[tuple[int, int]]:
+        # slices are aligned on the random stream blocks (QMC replications) so that no block is drawn twice
+        stream_size = self.model.Paths.stream_size
+        n_blocks = self.model.Paths.n_blocks
+        n_slices = min(self.n_workers, n_blocks)
+
+        bounds = [(i * n_blocks // n_slices) * stream_size for i in range(n_slices + 1)]
+        bounds[-1] = self.model.n_paths
+        return [(bounds[i], bounds[i + 1]) for i in range(n_slices)]
+
+    def accumulate(self, spot: float = 1.0) -> ReplicatedStats:
+        slices = self.slices()
+        n_blocks, n_dates = self.model.Paths.n_blocks, len(self.strikes_dates)
+
+        shm = shared_memory.SharedMemory(create=True, size=n_blocks * (1 + 2 * n_dates) * float64().itemsize)
+        try:
+            with ProcessPoolExecutor(max_workers=len(slices)) as executor:
+                futures = [executor.submit(_price_slice, self, spot, start, stop, i_slice, n_blocks, shm.name) for i_slice, (start, stop) in enumerate(slices)]
+                for future in futures:
+                    future.result()
+
+            results = _stats_view(shm, n_blocks, n_dates).copy()
+        finally:
+            shm.close()
+            shm.unlink()
+
+        stats = ReplicatedStats(block_size=self.model.Paths.stream_size)
+        for i_block, row in enumerate(results):
+            stats.blocks[i_block] = RunningStats(count=int(row[0]), mean=row[1:1 + n_dates], m2=row[1 + n_dates:])
+        return stats
+
+    def price(self, spot: float = 1.0) -> dict:
+        return pricing_results(self.model, self.accumulate(spot), self.strikes_dates)
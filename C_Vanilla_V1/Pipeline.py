@@ -0,0 +1,230 @@
+from typing import Union, Literal, Optional, Iterator
+from datetime import date
+
+import numpy as np
+from numpy import typing, float64
+
+from C_Vanilla_V1.Option import Option_Call, Option_Put, Digital_Call, Digital_Put
+from C_Vanilla_V1.Barrier import Barrier_Feature
+from C_Vanilla_V1.Model import Vanilla_Model, Vanilla_Barrier_Model, Barrier_Model, new_stats, new_trace, end_trace, pricing_results
+from B_Model_V1.base import BasketModel
+from B_Model_V1.bs_model import BS_Model
+from B_Model_V1.kernels import backend_available, fused_kernel, basket_codes, observe_codes, payoff_codes
+
+default_chunk_elements = 2 ** 20 # shocks read per chunk (paths x steps x shocks), about 8 MB in float64
+
+class Pricing_Pipeline:
+    """
+    Lazy simulate -> basket -> barrier -> payoff chain. Stages are recorded, price() plans and runs them:
+    the shocks are summed over the intervals between the needed dates (strikes, barrier observations),
+    correlated and exponentiated only there, so each chunk of shocks is read once and the full paths never exist.
+    Prices match the materialized pipeline on the same model.
+    With model.kernel_backend 'numba', the basket -> barrier -> payoff stages of a chunk run as one compiled loop per path
+    (kernels.fused_payoffs), the NumPy stages are the fallback (numba missing, continuous barrier, other baskets).
+    """
+    def __init__(self, model: BS_Model, chunk_size: Optional[int] = None):
+        self.model = model
+        self.chunk_size = chunk_size or model.chunk_size or max(1, default_chunk_elements // (model.calendar.n_steps * model.n_shocks)) #type: ignore
+        self.stages: dict[str, dict] = {}
+
+    def simulate(self, path_method: Literal['value', 'percentage'] = 'value') -> "Pricing_Pipeline":
+        if path_method not in ['value', 'percentage']:
+            raise ValueError("path_method must be 'value' or 'percentage'.")
+        self.stages['simulate'] = {"path_method": path_method}
+        return self
+
+    def basket(self, basket_method: Literal['uniform', 'worst-of', 'best-of'] = 'uniform') -> "Pricing_Pipeline":
+        self.stages['basket'] = {"basket_method": basket_method}
+        return self
+
+    def barrier(self, barrier_feature: Barrier_Feature, barrier_method: Literal["Best", "Worst", "Last", "First", "Above_Mean"], rebate_if_not_activated: bool = True) -> "Pricing_Pipeline":
+        self.stages['barrier'] = {"barrier_feature": barrier_feature, "barrier_method": barrier_method, "rebate_if_not_activated": rebate_if_not_activated}
+        return self
+
+    def payoff(self, option: Union[Option_Call, Option_Put, Digital_Call, Digital_Put], strikes_dates: list[date]) -> "Pricing_Pipeline":
+        self.stages['payoff'] = {"option": option, "strikes_dates": list(strikes_dates)}
+        return self
+
+    def plan(self) -> dict:
+        """
+        Dates to compute (the start date first) and how the shocks are read
+        """
+        if 'payoff' not in self.stages:
+            raise ValueError("The pipeline needs a payoff stage.")
+
+        calendar = self.model.calendar
+        strikes_dates = calendar.nearest_dates(self.stages['payoff']['strikes_dates'])
+        dates = set(strikes_dates)
+
+        if 'barrier' in self.stages:
+            barrier = self.stages['barrier']['barrier_feature']
+            if barrier.calendar is None or barrier.observation_dates is None:
+                dates.add(calendar.get_dates[-1])
+            else:
+                dates.update(calendar.nearest_dates(barrier.observation_dates))
+
+        reduced_calendar = calendar.sparse(sorted(dates))
+        return {
+            "calendar": reduced_calendar,
+            "indices": calendar.index_of(reduced_calendar.get_dates),
+            "strikes_dates": strikes_dates,
+            "path_method": self.stages.get('simulate', {"path_method": 'value'})["path_method"],
+            "basket_method": self.stages.get('basket', {"basket_method": 'uniform'})["basket_method"],
+            "chunk_size": self.chunk_size,
+        }
+
+    def segments(self, plan: dict) -> tuple:
+        """
+        Segment k sums the steps (indices[k - 1], indices[k]]: sqrt(dt) weights (m - 1, n_steps) of the shocks,
+        drift sums (m - 1, d), vols (d,) and start log levels (d,) in the model dtype
+        """
+        model = self.model
+        indices = plan["indices"]
+        dtype = model.dtype
+
+        dt = model.calendar.get_time_dt
+        weights = np.zeros((len(indices) - 1, len(dt)), dtype=dtype)
+        for k in range(1, len(indices)):
+            weights[k - 1, indices[k - 1] + 1:indices[k] + 1] = np.sqrt(dt[indices[k - 1] + 1:indices[k] + 1])
+        segment_dt = np.diff(np.cumsum(dt)[indices])
+
+        params = list(model.underlyings.values())
+        vols = np.array([p.vol for p in params])
+        drifts = np.array([p.rate - p.div - 0.5 * p.vol ** 2 for p in params])
+        drift_dt = np.outer(segment_dt, drifts).astype(dtype)
+        log_spots = np.zeros(len(params), dtype=dtype) if plan["path_method"] == 'percentage' else np.log([p.spot for p in params]).astype(dtype)
+        return weights, drift_dt, vols.astype(dtype), log_spots
+
+    def segment_shocks(self, weights: typing.NDArray) -> Iterator[typing.NDArray]:
+        # one read of the shocks: (m - 1, n_steps) x (n, n_steps, s) -> correlated (n, m - 1, d)
+        model = self.model
+        for Z in model.Paths.iter_chunks(self.chunk_size):
+            shocks = np.matmul(weights, Z)
+            if model.correlation is not None:
+                shocks = model.correlation.apply(shocks)
+            yield shocks
+
+    def reduced_paths(self, plan: dict) -> Iterator[typing.NDArray]:
+        """
+        Basket paths (chunk, n_dates) on the plan calendar
+        """
+        model = self.model
+        indices = plan["indices"]
+        dtype = model.dtype
+        weights, drift_dt, vols, log_spots = self.segments(plan)
+        params = list(model.underlyings.values())
+
+        basket = BasketModel(config=model, n_underlyings=len(params), basket_method=plan["basket_method"], paths=np.empty((0,)))
+
+        for shocks in self.segment_shocks(weights):
+            n = shocks.shape[0]
+            log_paths = np.empty((n, len(indices), len(params)), dtype=dtype)
+            log_paths[:, 0] = log_spots
+            np.multiply(shocks, vols, out=log_paths[:, 1:])
+            log_paths[:, 1:] += drift_dt
+            np.cumsum(log_paths, axis=1, out=log_paths)
+            np.exp(log_paths, out=log_paths)
+
+            yield basket.reduce(model.round_output(log_paths))
+
+    def kernel_allowed(self, plan: dict) -> bool:
+        # stages the compiled loop covers, the others keep the NumPy stages
+        if self.model.kernel_backend == 'numpy':
+            return False
+        if not backend_available(self.model.kernel_backend):
+            print(f"Warning: kernel backend '{self.model.kernel_backend}' not installed, the NumPy backend is used.")
+            return False
+        barrier = self.stages.get('barrier')
+        return (self.stages['payoff']['option'].option_type == 'EU' and plan["basket_method"] in basket_codes
+                and (barrier is None or barrier['barrier_feature'].monitoring == 'discrete'))
+
+    def kernel_arguments(self, plan: dict, spot: float) -> dict:
+        # option and barrier as the scalars / index arrays of fused_payoffs, same rules as Vanilla_Barrier_Model.payoff
+        # option scalars in the path dtype, as the NumPy payoff computes on float32 paths
+        option = self.stages['payoff']['option']
+        calendar = plan["calendar"]
+        scale = spot if option.value_method == 'relative' else 1.0
+        real = np.dtype(self.model.dtype).type
+        kind = {Option_Call: 'call', Option_Put: 'put', Digital_Call: 'digital_call', Digital_Put: 'digital_put'}[type(option)]
+
+        arguments = {
+            "strikes": calendar.index_of(plan["strikes_dates"]).astype(np.int64),
+            "payoff_code": payoff_codes[kind],
+            "strike_value": real(option.strike_price * scale),
+            "levier": real(getattr(option, 'levier', 1.0)),
+            "payout": real(getattr(option, 'payout', 0.0) * scale),
+            "rebate": real(option.rebate * scale),
+            "observed": np.zeros(len(plan["indices"]), dtype=np.bool_),
+            "level": 0.0, "up": True, "knock_in": True, "observe_code": observe_codes[None],
+            "rebate_if_not_activated": True,
+        }
+
+        if 'barrier' in self.stages:
+            stage = self.stages['barrier']
+            barrier = stage['barrier_feature']
+            if barrier.calendar is None or barrier.observation_dates is None:
+                arguments["observed"][-1] = True
+            else:
+                arguments["observed"][calendar.index_of(barrier.observation_dates)] = True
+            arguments.update({
+                "level": Barrier_Model(barrier, self.model, np.empty((0, 0))).levels(),
+                "up": barrier.barrier_mecanism in ['U&I', 'U&O'],
+                "knock_in": barrier.barrier_mecanism in ['U&I', 'D&I'],
+                "observe_code": observe_codes[stage['barrier_method']],
+                "rebate_if_not_activated": stage['rebate_if_not_activated'],
+            })
+        return arguments
+
+    def price_kernel(self, plan: dict, spot: float = 1.0) -> dict:
+        model = self.model
+        config = model.on_calendar(plan["calendar"])
+        kernel = fused_kernel(model.kernel_parallel)
+        arguments = self.kernel_arguments(plan, spot)
+        weights, drift_dt, vols, log_spots = self.segments(plan)
+        scale = np.dtype(model.dtype).type(0.0 if model.rounding is None else 10.0 ** model.rounding)
+        m, k = len(plan["indices"]), len(plan["strikes_dates"])
+
+        stats = new_stats(config)
+        trace = new_trace(config)
+        start = 0
+        for shocks in self.segment_shocks(weights):
+            n = shocks.shape[0]
+            payoffs = kernel(
+                shocks, vols, drift_dt, log_spots, scale, basket_codes[plan["basket_method"]],
+                arguments["observed"], arguments["level"], arguments["up"], arguments["knock_in"], arguments["observe_code"],
+                arguments["strikes"], arguments["payoff_code"], arguments["strike_value"], arguments["levier"], arguments["payout"], arguments["rebate"], arguments["rebate_if_not_activated"],
+                np.empty((n, len(vols)), dtype=model.dtype), np.empty((n, m), dtype=model.dtype), np.empty((n, k)),
+            )
+            stats.update(payoffs, start)
+            start += n
+            if trace is not None and trace.update(stats):
+                break
+
+        if stats.count == 0:
+            raise ValueError("Path stream is empty or already consumed.")
+
+        return pricing_results(config, stats, list(plan["strikes_dates"]), end_trace(config, trace, stats))
+
+    def price(self, spot: float = 1.0) -> dict:
+        plan = self.plan()
+        if self.kernel_allowed(plan):
+            return self.price_kernel(plan, spot)
+
+        config = self.model.on_calendar(plan["calendar"])
+        paths = self.reduced_paths(plan)
+
+        if 'barrier' in self.stages:
+            stage = self.stages['barrier']
+            pricer = Vanilla_Barrier_Model(
+                option=self.stages['payoff']['option'],
+                barrier_feature=stage['barrier_feature'],
+                config=config,
+                paths=paths,
+                strikes_dates=list(plan["strikes_dates"]),
+                barrier_method=stage['barrier_method'],
+                rebate_if_not_activated=stage['rebate_if_not_activated'],
+                bridge_model=self.model
+            )
+            return pricer.price_streaming(spot)
+
+        return Vanilla_Model(option=self.stages['payoff']['option'], config=config, paths=paths, strikes_dates=list(plan["strikes_dates"])).price_streaming(spot)
@@ -0,0 +1,127 @@
+from typing import Union, Literal, Optional
+from datetime import date
+
+import numpy as np
+from numpy import typing, float64
+
+from C_Vanilla_V1.Option import Option_Call, Option_Put, Digital_Call, Digital_Put
+from C_Vanilla_V1.Barrier import Barrier_Feature
+from C_Vanilla_V1.Model import Vanilla_Model, Vanilla_Barrier_Model, Barrier_Model, new_stats
+from B_Model_V1.base import BasketModel
+from B_Model_V1.bs_model import BS_Model
+from B_Model_V1.accumulator import ReplicatedStats
+
+class Scenario_Ladder:
+    """
+    Prices over a spot x vol grid on the shocks of one model (common random numbers).
+    spot bumps are multiplicative (1.05 = +5%), vol bumps additive (0.01 = +1 vol point), applied to `isins` (all by default).
+    Scenarios are an extra axis through the GBM construction, the basket and the payoff,
+    memory is capped by scenario_chunk scenarios x chunk_size paths at a time.
+    """
+    def __init__(self, model: BS_Model, spot_bumps: list[float] = [1.0], vol_bumps: list[float] = [0.0], isins: Optional[list[str]] = None, scenario_chunk: int = 8, chunk_size: Optional[int] = None):
+
+        if len(spot_bumps) == 0 or len(vol_bumps) == 0:
+            raise ValueError("spot_bumps and vol_bumps must not be empty.")
+        if any(bump <= 0 for bump in spot_bumps):
+            raise ValueError("spot_bumps are multiplicative and must be positive.")
+        if scenario_chunk <= 0:
+            raise ValueError("scenario_chunk must be a positive integer.")
+
+        self.model = model
+        self.spot_bumps = np.asarray(spot_bumps, dtype=float64)
+        self.vol_bumps = np.asarray(vol_bumps, dtype=float64)
+        self.scenario_chunk = scenario_chunk
+        self.chunk_size = chunk_size or model.chunk_size
+
+        all_isins = list(model.underlyings.keys())
+        isins = all_isins if isins is None else isins
+        for isin in isins:
+            if isin not in model.underlyings:
+                raise ValueError(f"{isin} is not an underlying of the model.")
+        self.bumped = np.array([isin in isins for isin in all_isins])
+
+        self.spot_factors, self.vols = self.scenarios()
+        if np.any(self.vols < 0):
+            raise ValueError("Vol bumps lead to negative volatilities.")
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.spot_bumps), len(self.vol_bumps)
+
+    def scenarios(self) -> tuple[typing.NDArray[float64], typing.NDArray[float64]]:
+        # flattened spot x vol grid (spot major): spot factors and vols (n_scenarios, d)
+        vols = np.array([params.vol for params in self.model.underlyings.values()])
+        spot_factors = np.where(self.bumped, self.spot_bumps[:, None, None], 1.0) * np.ones(self.shape + (len(vols),))
+        scenario_vols = vols + np.where(self.bumped, self.vol_bumps[None, :, None], 0.0) * np.ones(self.shape + (len(vols),))
+        return spot_factors.reshape(-1, len(vols)), scenario_vols.reshape(-1, len(vols))
+
+    def price(self, option: Union[Option_Call, Option_Put, Digital_Call, Digital_Put], strikes_dates: list[date], basket_method: Literal['uniform', 'worst-of', 'best-of'] = 'uniform', path_method: Literal['value', 'percentage'] = 'value', barrier_feature: Union[Barrier_Feature, None] = None, barrier_method: Optional[Literal["Best", "Worst", "Last", "First", "Above_Mean"]] = None, rebate_if_not_activated: bool = True, spot: float = 1.0) -> dict:
+        """
+        price, std and std_error arrays of shape (n_spot_bumps, n_vol_bumps, n_dates)
+        """
+        if barrier_feature is not None and barrier_method is None:
+            raise ValueError("barrier_method must be provided with a barrier_feature.")
+        if path_method not in ['value', 'percentage']:
+            raise ValueError("path_method must be 'value' or 'percentage'.")
+
+        model = self.model
+        strikes_dates = model.calendar.nearest_dates(strikes_dates)
+        date_indices = model.calendar.index_of(strikes_dates)
+        n_scenarios, n_dates = len(self.vols), len(strikes_dates)
+
+        basket = BasketModel(config=model, n_underlyings=len(model.underlyings), basket_method=basket_method, paths=np.empty((0,)))
+        barrier_model = None
+        if barrier_feature is not None:
+            barrier_model = Vanilla_Barrier_Model(
+                option=option,
+                barrier_feature=barrier_feature,
+                config=model,
+                paths=np.empty((0, model.calendar.n_steps)), #type: ignore
+                strikes_dates=list(strikes_dates),
+                barrier_method=barrier_method, #type: ignore
+                rebate_if_not_activated=rebate_if_not_activated
+            )
+
+        variances = [None] * n_scenarios
+        if barrier_model is not None and barrier_model.bridge_variance is not None:
+            # continuous monitoring (single underlying): the bridge variance follows the vol of each scenario
+            bridge = Barrier_Model(barrier_feature, model, np.empty((0, model.calendar.n_steps))) #type: ignore
+            variances = [bridge.bridge_variance(vol) for vol in self.vols[:, 0]]
+
+        stats = new_stats(model)
+        start = 0
+        for Z in model.Paths.iter_chunks(self.chunk_size):
+            n = Z.shape[0]
+            payoffs = np.empty((n, n_scenarios, n_dates), dtype=float64)
+
+            for lo in range(0, n_scenarios, self.scenario_chunk):
+                hi = min(lo + self.scenario_chunk, n_scenarios)
+                paths = model.apply_bs_scenarios(Z, self.spot_factors[lo:hi], self.vols[lo:hi], percentage=path_method == 'percentage')
+
+                # scenarios folded into the path axis: (c * n, n_steps) for the basket / payoff code
+                basket_paths = basket.reduce(paths).reshape((hi - lo) * n, -1)
+                if barrier_model is None:
+                    payoff = Vanilla_Model.payoff(basket_paths[:, date_indices], option, spot)
+                else:
+                    # activation per scenario: the crossing uniforms are keyed by the path index, common to the scenarios
+                    blocks = basket_paths.reshape(hi - lo, n, -1)
+                    activation = np.concatenate([barrier_model.get_path_barrier(block, start, variances[lo + k]) for k, block in enumerate(blocks)])
+                    payoff = barrier_model.payoff(barrier_model.get_path_option(basket_paths), activation, spot)
+
+                payoffs[:, lo:hi] = payoff.reshape(hi - lo, n, n_dates).transpose(1, 0, 2)
+
+            stats.update(payoffs.reshape(n, -1), start)
+            start += n
+
+        total = stats.total if isinstance(stats, ReplicatedStats) else stats
+        std_error = stats.std_error if model.generator == 'sobol' else total.std_error
+        shape = self.shape + (n_dates,)
+
+        return {
+            "spot_bumps": self.spot_bumps,
+            "vol_bumps": self.vol_bumps,
+            "dates": strikes_dates,
+            "price": total.mean.reshape(shape), #type: ignore
+            "std": total.std.reshape(shape),
+            "std_error": std_error.reshape(shape),
+        }
@@ -0,0 +1,62 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from B_Model_V1.bs_model import BS_Model, UnderlyingParams
+from B_Model_V1.timegrid import Calendar
+from C_Vanilla_V1.Model import Vanilla_Model
+from C_Vanilla_V1.Option import Option_Call
+from C_Vanilla_V1.Parallel import Parallel_Pricer
+
+start, end = date(2024, 1, 1), date(2025, 1, 1)
+calendar = Calendar(start_date=start, end_date=end, n_steps=12, trading_days=366.0)
+dates = [calendar.get_dates[6], end]
+call = Option_Call(start, end, 'EU', 100.0, 'absolute', [], 'uniform', rebate=0.5)
+
+def bs_model(**kwargs) -> BS_Model:
+    return BS_Model(calendar=calendar, underlyings={"A": UnderlyingParams("A", 100.0, 0.25, 0.03, 0.0)}, n_paths=400_000, seed=10, stream_size=4096, **kwargs)
+
+def adaptive_price(streamed: bool, **kwargs) -> dict:
+    model = bs_model(chunk_size=1000 if streamed else None, **kwargs)
+    paths = (chunk[..., 0] for chunk in model.iter_bs_value()) if streamed else model.apply_bs_value()[..., 0]
+    return Vanilla_Model(call, model, paths, list(dates), analytic=False).price()
+
+@pytest.mark.parametrize("streamed", [False, True])
+def test_stops_at_the_target(streamed):
+    result = adaptive_price(streamed, target_std_error=0.05)
+    n_paths = result[end]["n_paths"]
+    # in memory paths stop on a stream block, streamed chunks on the first chunk past one
+    assert n_paths < 400_000
+    assert n_paths % 1000 == 0 and n_paths % 4096 < 1000 if streamed else n_paths % 4096 == 0
+
+    trace = result[end]["trace"]
+    assert trace["n_paths"][-1] == n_paths and np.all(np.diff(trace["n_paths"]) > 0)
+    std_errors = np.array([result[d]["trace"]["std_error"] for d in dates])
+    # every date meets the target at the last check, some date missed it at the one before
+    assert np.all(std_errors[:, -1] <= 0.05) and np.any(std_errors[:, -2] > 0.05)
+    for row in result.values():
+        assert row["converged"] and row["std_error"] <= 0.05
+
+    # the price is the plain price of the first n_paths paths
+    prefix = bs_model().apply_bs_value()[:n_paths, :, 0]
+    reference = Vanilla_Model(call, bs_model(), prefix, list(dates), analytic=False).price()
+    for strike_date in dates:
+        assert result[strike_date]["price"] == pytest.approx(reference[strike_date]["price"], rel=1e-12)
+
+def test_relative_target():
+    result = adaptive_price(False, target_std_error=0.01, target_relative=True)
+    for row in result.values():
+        assert row["std_error"] <= 0.01 * row["price"]
+
+def test_budget_reached(capsys):
+    result = adaptive_price(True, target_std_error=1e-4)
+    assert result[end]["n_paths"] == 400_000
+    assert not result[end]["converged"]
+    assert "not reached" in capsys.readouterr().out
+
+def test_adaptive_needs_pseudo_random_paths_in_one_process():
+    with pytest.raises(ValueError, match="pseudo random"):
+        bs_model(target_std_error=0.05, generator='sobol')
+    with pytest.raises(ValueError, match="single process"):
+        Parallel_Pricer(bs_model(target_std_error=0.05), call, dates)
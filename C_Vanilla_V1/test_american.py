@@ -0,0 +1,71 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from B_Model_V1.bs_model import BS_Model, UnderlyingParams
+from B_Model_V1.store import PathStore
+from B_Model_V1.timegrid import Calendar
+from C_Vanilla_V1.American import Longstaff_Schwartz
+from C_Vanilla_V1.Book import Book_Pricer
+from C_Vanilla_V1.Model import Vanilla_Model
+from C_Vanilla_V1.Option import Option_Put, Digital_Call
+
+start, end = date(2024, 1, 1), date(2025, 1, 1)
+calendar = Calendar(start_date=start, end_date=end, n_steps=25, trading_days=365.0)
+put = Option_Put(start, end, 'US', 100.0, 'absolute', [], 'worst-of')
+
+def bs_model(n_underlyings: int = 1, **kwargs) -> BS_Model:
+    underlyings = {name: UnderlyingParams(name, 100.0, 0.3, 0.05, 0.0) for name in "AB"[:n_underlyings]}
+    correlation = np.array([[1.0, 0.4], [0.4, 1.0]]) if n_underlyings == 2 else None
+    return BS_Model(calendar=calendar, underlyings=underlyings, correlation=correlation, n_paths=20_000, seed=9, **kwargs)
+
+class DateReads(np.ndarray):
+    # records the indices read, to check that the paths are only read one date at a time
+    reads: list = []
+
+    def __getitem__(self, key):
+        DateReads.reads.append(key)
+        return np.asarray(self)[key]
+
+def test_book_reads_the_memory_map_one_date_at_a_time(tmp_path):
+    model = bs_model(2)
+    stored = PathStore(tmp_path / "paths").write(model)
+    reference = Longstaff_Schwartz(model, put, [end], stored.min(axis=-1)).price()[end]
+
+    DateReads.reads = []
+    paths = stored.view(DateReads)
+    row = Book_Pricer([put], model, paths, [end]).price()[0]
+    assert row["price"] == reference["price"]
+    assert row["std_error"] == reference["std_error"]
+    assert DateReads.reads and all(key[0] == slice(None) and np.ndim(key[1]) == 0 for key in DateReads.reads)
+
+def test_underlying_paths_are_the_basket_paths():
+    model = bs_model(2)
+    paths = model.apply_bs_value()
+    dates = [calendar.get_dates[12], end]
+    on_basket = Vanilla_Model(put, model, paths.min(axis=-1), dates).price()
+    on_underlyings = Vanilla_Model(put, model, paths, dates).price()
+    for strike_date in dates:
+        assert on_underlyings[strike_date]["price"] == on_basket[strike_date]["price"]
+
+def test_performance_basket_reads_the_first_date():
+    option = Digital_Call(start, end, 'US', 1.1, 'absolute', [], 'performance', payout=1.0)
+    model = bs_model(2)
+    paths = model.apply_bs_value()
+    reference = Longstaff_Schwartz(model, option, [end], (paths / paths[:, :1]).mean(axis=-1)).price()[end]
+    assert Longstaff_Schwartz(model, option, [end], paths).price()[end]["price"] == pytest.approx(reference["price"], rel=1e-12)
+
+@pytest.mark.parametrize("bit_generator", ['PCG64', 'Philox'])
+def test_bridge_agrees_with_the_stored_paths(bit_generator):
+    model = bs_model(bit_generator=bit_generator)
+    stored = Longstaff_Schwartz(model, put, [end], model.apply_bs_value()[..., 0]).price()[end]
+    bridged = Longstaff_Schwartz(model, put, [end]).price()[end]
+    assert bridged["price"] == pytest.approx(stored["price"], abs=4 * np.hypot(stored["std_error"], bridged["std_error"]))
+
+def test_bridge_draws_from_the_model_bit_generator():
+    # same seed: the bridge stream follows bit_generator and rng, as the path blocks do
+    pcg, philox = (Longstaff_Schwartz(bs_model(bit_generator=name), put, [end]).price()[end]["price"] for name in ['PCG64', 'Philox'])
+    assert pcg != philox
+    from_rng = bs_model(rng=np.random.Generator(np.random.Philox(np.random.SeedSequence(9))))
+    assert Longstaff_Schwartz(from_rng, put, [end]).price()[end]["price"] == philox
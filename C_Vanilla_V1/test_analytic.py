@@ -0,0 +1,85 @@
+from datetime import date
+
+import numpy as np
+import pytest
+from scipy.stats import norm
+
+from B_Model_V1.bs_model import BS_Model, UnderlyingParams
+from B_Model_V1.timegrid import Calendar
+from C_Vanilla_V1.Analytic import vanilla_price, barrier_price
+from C_Vanilla_V1.Barrier import Barrier_Feature
+from C_Vanilla_V1.Model import Vanilla_Model, Vanilla_Barrier_Model
+from C_Vanilla_V1.Option import Option_Call, Option_Put, Digital_Call, Digital_Put
+
+S0, vol, rate, div, T = 100.0, 0.25, 0.03, 0.01, 1.0
+forward = S0 * np.exp((rate - div) * T)
+start, end = date(2020, 1, 1), date(2021, 1, 1)
+
+def european(kind, strike: float, **kwargs):
+    return kind(start, end, 'EU', strike, 'absolute', [], 'uniform', **kwargs)
+
+def black(strike: float) -> float:
+    # undiscounted call on the forward, as priced by the Monte Carlo mean
+    d1 = (np.log(forward / strike) + 0.5 * vol ** 2 * T) / (vol * np.sqrt(T))
+    return forward * norm.cdf(d1) - strike * norm.cdf(d1 - vol * np.sqrt(T))
+
+@pytest.mark.parametrize("strike", [60.0, 100.0, 140.0])
+def test_call_is_the_black_formula_and_puts_follow_parity(strike):
+    call = vanilla_price(european(Option_Call, strike), S0, vol, rate, div, T)["price"]
+    put = vanilla_price(european(Option_Put, strike), S0, vol, rate, div, T)["price"]
+    assert call == pytest.approx(black(strike), rel=1e-10)
+    assert call - put == pytest.approx(forward - strike, rel=1e-10, abs=1e-10)
+
+def test_digitals_split_the_payout():
+    up = vanilla_price(european(Digital_Call, 105.0, payout=10.0), S0, vol, rate, div, T)
+    down = vanilla_price(european(Digital_Put, 105.0, payout=10.0), S0, vol, rate, div, T)
+    assert up["price"] + down["price"] == pytest.approx(10.0)
+    # a digital is a scaled Bernoulli: std = payout * sqrt(p (1 - p))
+    p = up["price"] / 10.0
+    assert up["std"] == pytest.approx(10.0 * np.sqrt(p * (1.0 - p)))
+
+def test_relative_strikes_scale_with_the_value_spot():
+    relative = Option_Call(start, end, 'EU', 1.1, 'relative', [], 'uniform', rebate=0.05)
+    absolute = european(Option_Call, 110.0, rebate=5.0)
+    assert vanilla_price(relative, S0, vol, rate, div, T, value_spot=100.0)["price"] == pytest.approx(vanilla_price(absolute, S0, vol, rate, div, T)["price"])
+
+@pytest.mark.parametrize("mecanism", ['U&I', 'D&I'])
+@pytest.mark.parametrize("t_obs", [None, 0.5])
+def test_knock_in_and_knock_out_add_up_to_the_vanilla(mecanism, t_obs):
+    call = european(Option_Call, 100.0)
+    level = 120.0 if mecanism == 'U&I' else 85.0
+    knock_in = barrier_price(call, S0, vol, rate, div, T, mecanism, level, t_obs, rebate_if_not_activated=False)["price"]
+    knock_out = barrier_price(call, S0, vol, rate, div, T, mecanism.replace('I', 'O'), level, t_obs, rebate_if_not_activated=False)["price"]
+    assert knock_in + knock_out == pytest.approx(black(100.0), rel=1e-8)
+
+class TestMonteCarlo:
+    calendar = Calendar(start_date=start, end_date=end, n_steps=120, trading_days=365.0)
+    model = BS_Model(calendar=calendar, underlyings={"A": UnderlyingParams("A", S0, vol, rate, div)}, n_paths=100_000, seed=17)
+    paths = model.apply_bs_value()[..., 0]
+    dates = [calendar.get_dates[60], end]
+
+    @pytest.mark.parametrize("option", [
+        european(Option_Call, 95.0, levier=2.0),
+        european(Option_Put, 100.0, rebate=1.0),
+        european(Digital_Call, 110.0, payout=10.0, rebate=0.5),
+    ])
+    def test_vanilla_within_the_monte_carlo_error(self, option):
+        simulated = Vanilla_Model(option, self.model, self.paths, self.dates, analytic=False).price()
+        dispatched = Vanilla_Model(option, self.model, self.paths, self.dates)
+        assert dispatched.analytic_allowed()
+        closed = dispatched.price()
+        for strike_date in self.dates:
+            std_error = simulated[strike_date]["std"] / np.sqrt(self.model.n_paths)
+            assert closed[strike_date]["price"] == pytest.approx(simulated[strike_date]["price"], abs=4 * std_error)
+            assert closed[strike_date]["std"] == pytest.approx(simulated[strike_date]["std"], rel=2e-2)
+
+    @pytest.mark.parametrize("mecanism, level, method", [('D&O', 85.0, 'Worst'), ('U&I', 125.0, 'Best')])
+    def test_continuous_barrier_within_the_monte_carlo_error(self, mecanism, level, method):
+        # the Brownian bridge removes the discrete monitoring bias, the closed form is the continuous barrier
+        option = european(Option_Call, 100.0, rebate=2.0)
+        barrier = Barrier_Feature(start, end, mecanism, 'US', level, S0, 'absolute', list(self.calendar.get_dates), self.calendar, monitoring='continuous')
+        simulated = Vanilla_Barrier_Model(option, barrier, self.model, self.paths, [end], method, True, analytic=False).price()[end]
+        dispatched = Vanilla_Barrier_Model(option, barrier, self.model, self.paths, [end], method, True)
+        assert dispatched.analytic_allowed()
+        closed = dispatched.price()[end]
+        assert closed["price"] == pytest.approx(simulated["price"], abs=4 * simulated["std"] / np.sqrt(self.model.n_paths))
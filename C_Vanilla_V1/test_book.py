@@ -0,0 +1,58 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from B_Model_V1.bs_model import BS_Model, UnderlyingParams
+from B_Model_V1.timegrid import Calendar
+from C_Vanilla_V1.Book import Book_Pricer
+from C_Vanilla_V1.Model import Vanilla_Model
+from C_Vanilla_V1.Option import Option_Call, Option_Put, Digital_Call, Digital_Put
+
+start, end = date(2024, 1, 1), date(2025, 1, 1)
+calendar = Calendar(start_date=start, end_date=end, n_steps=36, trading_days=365.0)
+dates = [calendar.get_dates[12], calendar.get_dates[24], end]
+underlyings = {"A": UnderlyingParams("A", 100.0, 0.25, 0.03, 0.0), "B": UnderlyingParams("B", 95.0, 0.35, 0.03, 0.01)}
+
+def bs_model(**kwargs) -> BS_Model:
+    return BS_Model(calendar=calendar, underlyings=underlyings, correlation=np.array([[1.0, 0.4], [0.4, 1.0]]), n_paths=4001, seed=13, **kwargs)
+
+book = [
+    Option_Call(start, end, 'EU', 100.0, 'absolute', [], 'uniform', rebate=1.0, levier=2.0),
+    Option_Put(start, end, 'EU', 1.05, 'relative', [], 'worst-of'),
+    Digital_Call(start, end, 'EU', 110.0, 'absolute', [], 'best-of', payout=5.0, rebate=0.5),
+    Digital_Put(start, end, 'EU', 0.9, 'relative', [], 'uniform', payout=3.0),
+    Option_Call(start, end, 'EU', 95.0, 'absolute', [], 'worst-of'),
+]
+
+def per_trade(paths: np.typing.NDArray, spot: float) -> list[dict]:
+    reductions = {'uniform': paths.mean(axis=-1), 'worst-of': paths.min(axis=-1), 'best-of': paths.max(axis=-1)}
+    return [Vanilla_Model(option, bs_model(), reductions[option.basket_method], list(dates), analytic=False).price(spot) for option in book]
+
+@pytest.mark.parametrize("chunk_size, block_elements", [(None, 2 ** 24), (1500, 1000)])
+def test_rows_are_the_per_trade_prices(chunk_size, block_elements):
+    model = bs_model(chunk_size=chunk_size)
+    paths = model.apply_bs_value()
+    table = Book_Pricer(book, model, paths if chunk_size is None else model.iter_bs_value(), dates, block_elements=block_elements).price(100.0)
+
+    assert list(table['trade']) == list(np.repeat(np.arange(len(book)), len(dates)))
+    assert list(table['type'][::len(dates)]) == ['call', 'put', 'digital_call', 'digital_put', 'call']
+    for trade, reference in enumerate(per_trade(bs_model().apply_bs_value(), 100.0)):
+        rows = table[table['trade'] == trade]
+        for row, strike_date in zip(rows, dates):
+            assert row['date'] == np.datetime64(strike_date)
+            assert row['price'] == pytest.approx(reference[strike_date]['price'], rel=1e-12, abs=1e-12)
+            assert row['std'] == pytest.approx(reference[strike_date]['std'], rel=1e-12, abs=1e-12)
+
+def test_basket_paths_price_every_trade_on_the_same_basket():
+    paths = bs_model().apply_bs_value().mean(axis=-1)
+    table = Book_Pricer(book[:1] + book[3:4], bs_model(), paths, dates).price(100.0)
+    for trade, option in enumerate(book[:1] + book[3:4]):
+        reference = Vanilla_Model(option, bs_model(), paths, list(dates), analytic=False).price(100.0)
+        np.testing.assert_allclose(table[table['trade'] == trade]['price'], [reference[d]['price'] for d in dates], rtol=1e-12)
+
+def test_invalid_book():
+    with pytest.raises(ValueError, match="empty"):
+        Book_Pricer([], bs_model(), np.empty((0, 37)), dates)
+    with pytest.raises(ValueError, match="strike dates"):
+        Book_Pricer(book, bs_model(), np.empty((0, 37)), [])
@@ -0,0 +1,67 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from B_Model_V1.bs_model import BS_Model, UnderlyingParams
+from B_Model_V1.timegrid import Calendar
+from C_Vanilla_V1.Analytic import vanilla_price
+from C_Vanilla_V1.Barrier import Barrier_Feature
+from C_Vanilla_V1.Model import Vanilla_Model, Vanilla_Barrier_Model
+from C_Vanilla_V1.Option import Option_Call, Digital_Put
+
+start, end = date(2024, 1, 1), date(2025, 1, 1)
+calendar = Calendar(start_date=start, end_date=end, n_steps=12, trading_days=366.0)
+dates = [calendar.get_dates[6], end]
+basket_underlyings = {"A": UnderlyingParams("A", 100.0, 0.25, 0.03, 0.0), "B": UnderlyingParams("B", 100.0, 0.3, 0.03, 0.01)}
+single = {"A": UnderlyingParams("A", 100.0, 0.25, 0.03, 0.01)}
+
+def bs_model(underlyings: dict, seed: int = 4, n_paths: int = 20_000) -> BS_Model:
+    correlation = np.array([[1.0, 0.7], [0.7, 1.0]]) if len(underlyings) == 2 else None
+    return BS_Model(calendar=calendar, underlyings=underlyings, correlation=correlation, n_paths=n_paths, seed=seed)
+
+def controlled(option, model: BS_Model, control) -> dict:
+    paths = model.apply_bs_value()
+    return Vanilla_Model(option, model, paths.mean(axis=-1), list(dates), analytic=False).price(control=control, underlying_paths=paths)
+
+@pytest.mark.parametrize("control", ['geometric', 'spot', ['geometric', 'spot']])
+def test_controlled_price_is_the_plain_price_with_less_variance(control):
+    option = Option_Call(start, end, 'EU', 100.0, 'absolute', [], 'uniform')
+    for row in controlled(option, bs_model(basket_underlyings), control).values():
+        assert row["price"] == pytest.approx(row["plain_price"], abs=3 * row["plain_std_error"])
+        assert row["variance_reduction"] > 1.0
+        assert row["std_error"] < row["plain_std_error"]
+
+def test_single_underlying_is_the_closed_form():
+    option = Option_Call(start, end, 'EU', 105.0, 'absolute', [], 'uniform')
+    result = controlled(option, bs_model(single), 'spot')
+    times = np.cumsum(calendar.get_time_dt)[calendar.index_of(dates)]
+    exact = vanilla_price(option, 100.0, 0.25, 0.03, 0.01, times)["price"]
+    for k, strike_date in enumerate(dates):
+        assert result[strike_date]["price"] == pytest.approx(exact[k], abs=3 * result[strike_date]["std_error"])
+
+def test_std_error_is_the_spread_over_seeds():
+    # the reported error of one run against the dispersion of independent runs
+    option = Option_Call(start, end, 'EU', 100.0, 'absolute', [], 'uniform')
+    runs = [controlled(option, bs_model(basket_underlyings, seed, 4000), 'geometric')[end] for seed in range(30)]
+    spread = np.std([run["price"] for run in runs], ddof=1)
+    assert 0.6 < np.mean([run["std_error"] for run in runs]) / spread < 1.6
+
+def test_barrier_with_the_vanilla_control():
+    option = Digital_Put(start, end, 'EU', 95.0, 'absolute', [], 'uniform', payout=10.0)
+    barrier = Barrier_Feature(start, end, 'D&O', 'EU', 80.0, 100.0, 'absolute', [calendar.get_dates[6], end], calendar)
+    model = bs_model(single)
+    paths = model.apply_bs_value()
+    result = Vanilla_Barrier_Model(option, barrier, model, paths[..., 0], list(dates), 'Worst', analytic=False).price(control='vanilla', underlying_paths=paths)
+    for row in result.values():
+        assert row["price"] == pytest.approx(row["plain_price"], abs=3 * row["plain_std_error"])
+        assert row["variance_reduction"] > 1.0
+
+def test_invalid_controls():
+    option = Option_Call(start, end, 'EU', 100.0, 'absolute', [], 'uniform')
+    with pytest.raises(ValueError, match="payoff itself"):
+        controlled(option, bs_model(single), 'vanilla')
+    with pytest.raises(ValueError, match="Invalid control"):
+        controlled(option, bs_model(single), 'delta')
+    with pytest.raises(ValueError, match="single underlying"):
+        controlled(option, bs_model(basket_underlyings), ['spot', 'vanilla'])
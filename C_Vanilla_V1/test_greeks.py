@@ -0,0 +1,77 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from B_Model_V1.bs_model import BS_Model, UnderlyingParams
+from B_Model_V1.timegrid import Calendar
+from C_Vanilla_V1.Analytic import vanilla_price, barrier_price
+from C_Vanilla_V1.Barrier import Barrier_Feature
+from C_Vanilla_V1.Model import Vanilla_Model, Vanilla_Barrier_Model
+from C_Vanilla_V1.Option import Option_Call, Option_Put, Digital_Call
+
+S0, vol, rate, div, T = 100.0, 0.25, 0.03, 0.01, 1.0
+start, end = date(2020, 1, 1), date(2021, 1, 1)
+bump = 1e-4
+
+def bumped(price, spot: float = S0, sigma: float = vol) -> tuple[float, float]:
+    # closed form delta and vega by central differences
+    delta = (price(spot + bump, sigma) - price(spot - bump, sigma)) / (2 * bump)
+    vega = (price(spot, sigma + bump) - price(spot, sigma - bump)) / (2 * bump)
+    return delta, vega
+
+class TestVanilla:
+    calendar = Calendar(start_date=start, end_date=end, n_steps=12, trading_days=366.0)
+    model = BS_Model(calendar=calendar, underlyings={"A": UnderlyingParams("A", S0, vol, rate, div)}, n_paths=200_000, seed=2)
+    paths = model.apply_bs_value()
+
+    @pytest.mark.parametrize("option, method", [
+        (Option_Call(start, end, 'EU', 100.0, 'absolute', [], 'uniform'), 'pathwise'),
+        (Option_Put(start, end, 'EU', 90.0, 'absolute', [], 'uniform', levier=2.0), 'pathwise'),
+        (Option_Call(start, end, 'EU', 100.0, 'absolute', [], 'uniform', rebate=2.0), 'likelihood_ratio'),
+        (Digital_Call(start, end, 'EU', 110.0, 'absolute', [], 'uniform', payout=10.0), 'likelihood_ratio'),
+    ])
+    def test_greeks_are_the_black_scholes_greeks(self, option, method):
+        middle = self.calendar.get_dates[6]
+        result = Vanilla_Model(option, self.model, self.paths[..., 0], [middle, end], analytic=False).price(greeks=True, underlying_paths=self.paths)
+
+        for strike_date in [middle, end]:
+            row = result[strike_date]
+            assert row["greek_method"] == method
+            t = np.cumsum(self.calendar.get_time_dt)[self.calendar.index_of(strike_date)]
+            price = lambda spot, sigma: vanilla_price(option, spot, sigma, rate, div, np.array([t]))["price"][0]
+            delta, vega = bumped(price)
+            assert row["delta"]["A"] == pytest.approx(delta, abs=4 * row["delta_std_error"]["A"])
+            assert row["vega"]["A"] == pytest.approx(vega, abs=4 * row["vega_std_error"]["A"])
+
+    def test_greeks_come_with_the_plain_price(self):
+        call = Option_Call(start, end, 'EU', 100.0, 'absolute', [], 'uniform', rebate=2.0)
+        plain = Vanilla_Model(call, self.model, self.paths[..., 0], [end], analytic=False).price()[end]
+        row = Vanilla_Model(call, self.model, self.paths[..., 0], [end], analytic=False).price(greeks=True, underlying_paths=self.paths)[end]
+        assert row["price"] == pytest.approx(plain["price"], rel=1e-12)
+        assert row["std"] == pytest.approx(plain["std"], rel=1e-12)
+
+class TestContinuousBarrier:
+    # few steps: the bridge makes the monitoring continuous, and the likelihood ratio weights stay small
+    calendar = Calendar(start_date=start, end_date=end, n_steps=24, trading_days=366.0)
+    model = BS_Model(calendar=calendar, underlyings={"A": UnderlyingParams("A", S0, vol, rate, div)}, n_paths=200_000, seed=3)
+    paths = model.apply_bs_value()
+    call = Option_Call(start, end, 'EU', 100.0, 'absolute', [], 'uniform')
+
+    def barrier(self, mecanism: str, level: float) -> Barrier_Feature:
+        return Barrier_Feature(start, end, mecanism, 'US', level, S0, 'absolute', list(self.calendar.get_dates), self.calendar, monitoring='continuous')
+
+    @pytest.mark.parametrize("mecanism, level, method", [('D&O', 85.0, 'Worst'), ('U&O', 130.0, 'Worst'), ('U&I', 125.0, 'Best')])
+    def test_greeks_are_the_reflection_closed_form(self, mecanism, level, method):
+        model = Vanilla_Barrier_Model(self.call, self.barrier(mecanism, level), self.model, self.paths[..., 0], [end], method, False, analytic=False)
+        result = model.price(greeks=True, underlying_paths=self.paths)[end]
+
+        price = lambda spot, sigma: barrier_price(self.call, spot, sigma, rate, div, np.array([T]), mecanism, level, None, rebate_if_not_activated=False)["price"][0]
+        delta, vega = bumped(price)
+        assert result["delta"]["A"] == pytest.approx(delta, abs=4 * result["delta_std_error"]["A"])
+        assert result["vega"]["A"] == pytest.approx(vega, abs=4 * result["vega_std_error"]["A"])
+
+    def test_drawn_hits_have_no_greeks(self):
+        model = Vanilla_Barrier_Model(self.call, self.barrier('D&O', 85.0), self.model, self.paths[..., 0], [end], 'Worst', False, analytic=False, bridge_method='uniform')
+        with pytest.raises(ValueError, match="probability"):
+            model.price(greeks=True, underlying_paths=self.paths)
@@ -0,0 +1,54 @@
+import pickle
+from datetime import date
+
+import numpy as np
+import pytest
+
+import A_Underlying_V1.underlying_class as underlying_module
+from A_Underlying_V1.underlying_class import Underlying
+from B_Model_V1.bs_model import BS_Model, UnderlyingParams
+from B_Model_V1.timegrid import Calendar
+from C_Vanilla_V1.Barrier import Barrier_Feature
+from C_Vanilla_V1.Model import Vanilla_Model, Vanilla_Barrier_Model
+from C_Vanilla_V1.Option import Option_Call
+from C_Vanilla_V1.Parallel import Parallel_Pricer
+
+start, end = date(2024, 1, 1), date(2025, 1, 1)
+calendar = Calendar(start_date=start, end_date=end, n_steps=30, trading_days=365.0)
+dates = [calendar.get_dates[15], end]
+call = Option_Call(start, end, 'EU', 100.0, 'absolute', [], 'worst-of', rebate=1.0)
+
+def bs_model() -> BS_Model:
+    underlyings = {"A": UnderlyingParams("A", 100.0, 0.25, 0.03, 0.0), "B": UnderlyingParams("B", 105.0, 0.3, 0.03, 0.01)}
+    return BS_Model(calendar=calendar, underlyings=underlyings, correlation=np.array([[1.0, 0.3], [0.3, 1.0]]), n_paths=5001, seed=8, stream_size=1024)
+
+def assert_same_prices(result: dict, reference: dict):
+    # merged block statistics against a single pass: equal up to the summation order
+    for strike_date, row in reference.items():
+        assert result[strike_date]["price"] == pytest.approx(row["price"], rel=1e-12)
+        assert result[strike_date]["std"] == pytest.approx(row["std"], rel=1e-12)
+
+def test_two_workers_are_the_single_process_price():
+    basket = bs_model().apply_bs_value().min(axis=-1)
+    reference = Vanilla_Model(call, bs_model(), basket, list(dates), analytic=False).price()
+
+    pricer = Parallel_Pricer(bs_model(), call, dates, basket_method='worst-of', n_workers=2, chunk_size=700)
+    assert len(pricer.slices()) == 2
+    assert_same_prices(pricer.price(), reference)
+
+def test_two_workers_with_a_barrier():
+    barrier = Barrier_Feature(start, end, 'D&O', 'EU', 80.0, 100.0, 'absolute', [calendar.get_dates[10], end], calendar)
+    basket = bs_model().apply_bs_value().min(axis=-1)
+    reference = Vanilla_Barrier_Model(call, barrier, bs_model(), basket, list(dates), 'Worst', analytic=False).price()
+
+    pricer = Parallel_Pricer(bs_model(), call, dates, basket_method='worst-of', barrier_feature=barrier, barrier_method='Worst', n_workers=2)
+    assert_same_prices(pricer.price(), reference)
+
+def test_underlying_pickles_without_a_lookup(monkeypatch):
+    underlying = Underlying(name="total", symbol="tte", exchange="XPAR", isin="FR0000120271", type="EQUITY", description="", id="id-1")
+    # the workers rebuild it from its fields: the description is never fetched again
+    monkeypatch.setattr(underlying_module, "Ticker", lambda isin: pytest.fail("yfinance was called"))
+
+    copy = pickle.loads(pickle.dumps(underlying))
+    assert isinstance(copy, Underlying)
+    assert copy.__dict__() == underlying.__dict__()
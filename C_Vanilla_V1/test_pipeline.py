@@ -0,0 +1,52 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from B_Model_V1.bs_model import BS_Model, UnderlyingParams
+from B_Model_V1.timegrid import Calendar
+from C_Vanilla_V1.Barrier import Barrier_Feature
+from C_Vanilla_V1.Model import Vanilla_Model, Vanilla_Barrier_Model
+from C_Vanilla_V1.Option import Option_Call, Digital_Put
+from C_Vanilla_V1.Pipeline import Pricing_Pipeline
+
+start, end = date(2024, 1, 1), date(2025, 1, 1)
+calendar = Calendar(start_date=start, end_date=end, n_steps=48, trading_days=365.0)
+dates = [calendar.get_dates[16], end]
+underlyings = {"A": UnderlyingParams("A", 100.0, 0.25, 0.03, 0.0), "B": UnderlyingParams("B", 90.0, 0.3, 0.02, 0.01)}
+reductions = {'uniform': lambda paths: paths.mean(axis=-1), 'worst-of': lambda paths: paths.min(axis=-1), 'best-of': lambda paths: paths.max(axis=-1)}
+
+def bs_model(**kwargs) -> BS_Model:
+    return BS_Model(calendar=calendar, underlyings=underlyings, correlation=np.array([[1.0, 0.6], [0.6, 1.0]]), n_paths=4001, seed=19, **kwargs)
+
+def assert_same_prices(result: dict, reference: dict):
+    # interval sums of the shocks against the step by step cumulation: the levels differ by rounding only
+    for strike_date, row in reference.items():
+        assert result[strike_date]["price"] == pytest.approx(row["price"], rel=1e-8)
+        assert result[strike_date]["std"] == pytest.approx(row["std"], rel=1e-8)
+
+@pytest.mark.parametrize("basket_method", ['uniform', 'worst-of', 'best-of'])
+@pytest.mark.parametrize("path_method", ['value', 'percentage'])
+@pytest.mark.parametrize("chunk_size", [None, 900])
+def test_pipeline_is_the_materialized_price(basket_method, path_method, chunk_size):
+    option = Option_Call(start, end, 'EU', 95.0 if path_method == 'value' else 0.95, 'absolute', [], basket_method, rebate=0.5)
+    paths = bs_model().apply_bs_value() if path_method == 'value' else bs_model().apply_bs_percentage()
+    reference = Vanilla_Model(option, bs_model(), reductions[basket_method](paths), list(dates), analytic=False).price()
+
+    pipeline = Pricing_Pipeline(bs_model(), chunk_size=chunk_size).simulate(path_method).basket(basket_method).payoff(option, dates)
+    assert_same_prices(pipeline.price(), reference)
+
+@pytest.mark.parametrize("mecanism, level, method", [('D&O', 80.0, 'Worst'), ('U&I', 110.0, 'Best'), ('D&I', 85.0, 'Above_Mean')])
+def test_pipeline_with_a_barrier(mecanism, level, method):
+    option = Digital_Put(start, end, 'EU', 100.0, 'absolute', [], 'worst-of', payout=10.0, rebate=1.0)
+    barrier = Barrier_Feature(start, end, mecanism, 'EU', level, 90.0, 'absolute', [calendar.get_dates[8], calendar.get_dates[30], end], calendar)
+    basket = bs_model().apply_bs_value().min(axis=-1)
+    reference = Vanilla_Barrier_Model(option, barrier, bs_model(), basket, list(dates), method, analytic=False).price()
+
+    pipeline = Pricing_Pipeline(bs_model()).simulate('value').basket('worst-of').barrier(barrier, method).payoff(option, dates)
+    assert len(pipeline.plan()["indices"]) == 5 # start, observations and strike dates only
+    assert_same_prices(pipeline.price(), reference)
+
+def test_pipeline_needs_a_payoff():
+    with pytest.raises(ValueError, match="payoff"):
+        Pricing_Pipeline(bs_model()).simulate().basket().price()
@@ -0,0 +1,66 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from B_Model_V1.bs_model import BS_Model, UnderlyingParams
+from B_Model_V1.timegrid import Calendar
+from C_Vanilla_V1.Barrier import Barrier_Feature
+from C_Vanilla_V1.Model import Vanilla_Model, Vanilla_Barrier_Model
+from C_Vanilla_V1.Option import Option_Call
+from C_Vanilla_V1.Scenario import Scenario_Ladder
+
+start, end = date(2024, 1, 1), date(2025, 1, 1)
+calendar = Calendar(start_date=start, end_date=end, n_steps=40, trading_days=365.0)
+call = Option_Call(start, end, 'EU', 100.0, 'absolute', [], 'uniform', rebate=1.0)
+
+def bs_model(spot: float = 100.0, vol: float = 0.25, **kwargs) -> BS_Model:
+    return BS_Model(calendar=calendar, underlyings={"A": UnderlyingParams("A", spot, vol, 0.03, 0.01)}, n_paths=4000, seed=12, **kwargs)
+
+def test_continuous_barrier_follows_the_scenario_vol():
+    # the crossing probabilities of each row use the bridge variance of its own vol
+    barrier = Barrier_Feature(start, end, 'U&O', 'US', 130.0, 100.0, 'absolute', list(calendar.get_dates), calendar, monitoring='continuous')
+    ladder = Scenario_Ladder(bs_model(), spot_bumps=[0.95, 1.0], vol_bumps=[-0.05, 0.0, 0.1])
+    result = ladder.price(call, [end], barrier_feature=barrier, barrier_method='Worst')
+
+    for i, spot in enumerate([95.0, 100.0]):
+        for j, vol in enumerate([0.2, 0.25, 0.35]):
+            bumped = bs_model(spot, vol)
+            model = Vanilla_Barrier_Model(call, barrier, bumped, bumped.apply_bs_value()[..., 0], [end], 'Worst', analytic=False)
+            reference = model.price()[end]
+            assert result["price"][i, j, 0] == pytest.approx(reference["price"], rel=1e-10)
+
+class TestVanillaLadder:
+    underlyings = {"A": UnderlyingParams("A", 100.0, 0.25, 0.03, 0.0), "B": UnderlyingParams("B", 80.0, 0.3, 0.03, 0.02)}
+    correlation = np.array([[1.0, 0.5], [0.5, 1.0]])
+
+    def model(self, underlyings: dict, **kwargs) -> BS_Model:
+        return BS_Model(calendar=calendar, underlyings=underlyings, correlation=self.correlation, n_paths=3001, seed=2, **kwargs)
+
+    @pytest.mark.parametrize("isins", [None, ["B"]])
+    @pytest.mark.parametrize("chunk_size", [None, 1000])
+    def test_rows_are_the_bumped_models(self, isins, chunk_size):
+        dates = [calendar.get_dates[20], end]
+        option = Option_Call(start, end, 'EU', 0.9, 'relative', [], 'worst-of', rebate=0.1)
+        ladder = Scenario_Ladder(self.model(self.underlyings), spot_bumps=[0.9, 1.1], vol_bumps=[0.0, 0.05], isins=isins, scenario_chunk=3, chunk_size=chunk_size)
+        result = ladder.price(option, dates, basket_method='worst-of', path_method='percentage', spot=80.0)
+
+        for i, spot_bump in enumerate([0.9, 1.1]):
+            for j, vol_bump in enumerate([0.0, 0.05]):
+                bumped = {isin: UnderlyingParams(isin, p.spot * spot_bump, p.vol + vol_bump, p.rate, p.div) if isins is None or isin in isins else p
+                          for isin, p in self.underlyings.items()}
+                # percentage paths start at the spot factor of the scenario
+                factors = np.array([bumped[isin].spot / p.spot for isin, p in self.underlyings.items()])
+                basket = (self.model(bumped).apply_bs_percentage() * factors).min(axis=-1)
+                reference = Vanilla_Model(option, self.model(bumped), basket, list(dates), analytic=False).price(80.0)
+                for k, strike_date in enumerate(dates):
+                    assert result["price"][i, j, k] == pytest.approx(reference[strike_date]["price"], rel=1e-9)
+                    assert result["std"][i, j, k] == pytest.approx(reference[strike_date]["std"], rel=1e-9)
+
+    def test_invalid_bumps(self):
+        with pytest.raises(ValueError, match="negative"):
+            Scenario_Ladder(self.model(self.underlyings), vol_bumps=[-0.3])
+        with pytest.raises(ValueError, match="multiplicative"):
+            Scenario_Ladder(self.model(self.underlyings), spot_bumps=[0.0])
+        with pytest.raises(ValueError, match="not an underlying"):
+            Scenario_Ladder(self.model(self.underlyings), isins=["C"])
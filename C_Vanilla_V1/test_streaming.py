@@ -0,0 +1,54 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from B_Model_V1.bs_model import BS_Model, UnderlyingParams
+from B_Model_V1.timegrid import Calendar
+from C_Vanilla_V1.Model import Vanilla_Model
+from C_Vanilla_V1.Option import Option_Call, Digital_Put
+
+start, end = date(2024, 1, 1), date(2025, 1, 1)
+calendar = Calendar(start_date=start, end_date=end, n_steps=60, trading_days=365.0)
+middle = calendar.get_dates[30]
+underlyings = {"A": UnderlyingParams("A", 100.0, 0.25, 0.02, 0.01), "B": UnderlyingParams("B", 50.0, 0.4, 0.02, 0.0)}
+correlation = np.array([[1.0, 0.6], [0.6, 1.0]])
+
+def bs_model(**kwargs) -> BS_Model:
+    return BS_Model(calendar=calendar, underlyings=underlyings, correlation=correlation, n_paths=5001, seed=11, **kwargs)
+
+@pytest.mark.parametrize("chunk_size", [1, 999, 5001, 10_000])
+def test_chunks_are_the_materialized_paths(chunk_size):
+    # odd n_paths: the unpaired antithetic path falls in the last chunk
+    materialized = bs_model().apply_bs_value()
+    streamed = list(bs_model(chunk_size=chunk_size).iter_bs_value())
+
+    assert max(chunk.shape[0] for chunk in streamed) <= chunk_size
+    np.testing.assert_array_equal(np.concatenate(streamed), materialized)
+
+def test_a_path_range_is_a_slice_of_the_paths():
+    materialized = bs_model().apply_bs_percentage()
+    window = np.concatenate(list(bs_model(chunk_size=700).iter_bs_percentage(start=1234, stop=3456)))
+    np.testing.assert_array_equal(window, materialized[1234:3456])
+
+@pytest.mark.parametrize("option", [
+    Option_Call(start, end, 'EU', 1.0, 'relative', [], 'worst-of', rebate=0.0, levier=2.0),
+    Digital_Put(start, end, 'EU', 70.0, 'absolute', [], 'worst-of', payout=5.0, rebate=0.5),
+])
+def test_streamed_price_is_the_materialized_price(option):
+    dates = [middle, end]
+    basket = bs_model().apply_bs_value().min(axis=-1)
+    reference = Vanilla_Model(option, bs_model(), basket, dates, analytic=False).price(80.0)
+
+    stream = (chunk.min(axis=-1) for chunk in bs_model(chunk_size=777).iter_bs_value())
+    streamed = Vanilla_Model(option, bs_model(chunk_size=777), stream, dates, analytic=False).price(80.0)
+
+    for strike_date in reference:
+        assert streamed[strike_date]["price"] == pytest.approx(reference[strike_date]["price"], rel=1e-12)
+        assert streamed[strike_date]["std"] == pytest.approx(reference[strike_date]["std"], rel=1e-12)
+
+def test_a_consumed_stream_is_an_error():
+    option = Option_Call(start, end, 'EU', 100.0, 'absolute', [], 'uniform')
+    stream = iter([])
+    with pytest.raises(ValueError, match="consumed"):
+        Vanilla_Model(option, bs_model(chunk_size=500), stream, [end], analytic=False).price()